@@ -1,20 +1,31 @@
 # Load up all libraries for this project
-import random
-import copy
+# Note: numpy, pyfiglet, tabulate and geopy are slow to import, so they are only
+# imported inside the functions that use them. This keeps `import air_ontario` fast and lets the
+# first board be drawn without waiting for libraries that are only needed later on.
+import os
 import re
-import pyfiglet
-import pandas as pd
 from datetime import datetime
 from datetime import timedelta
-from tabulate import tabulate
-from randomtimestamp import random_time
-from geopy.distance import geodesic as GD
+
+# Timers and counters (off unless turned on, see metrics.py)
+import metrics
 
 # Load up all files for this project
-airline_codes_file = pd.read_csv('canadian_airline_codes.txt', sep=";", header=None)
+# Note: the path is relative to this file so the project also works when launched from another folder
+AIRLINE_CODES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'canadian_airline_codes.txt')
+_airline_registry = None
+
+# Returns the airline registry, reading the airline codes file only the first time it is needed
+def get_airline_registry():
+    global _airline_registry
+    if _airline_registry is None:
+        from airlines import AirlineRegistry
+        with metrics.timer("airline_registry"):
+            _airline_registry = AirlineRegistry.from_file(AIRLINE_CODES_PATH)
+    return _airline_registry
 
 # Allows us to color customization
-    # Note: To write this function, I used the following: https://stackoverflow.com/questions/287871/how-do-i-print-colored-text-to-the-terminal    
+    # Note: To write this function, I used the following: https://stackoverflow.com/questions/287871/how-do-i-print-colored-text-to-the-terminal
 class color:
     # Arrived
     GREEN = '\033[92m'
@@ -27,42 +38,54 @@ class color:
     # Bold
     BOLD = '\033[1m'
     END = '\033[0m'
-    
+
+# Returns the airline codes used as flight number prefixes
+def airline_code_list():
+    return get_airline_registry().sample_codes
+
+# Note: the per-row generators below are thin wrappers around the column generators in
+# flight_board, which fill whole board columns at once. They all draw from the shared generator,
+# which can be seeded (see randomness.py)
+
 # Returns random canadian airline codes
 def random_airline_code_generator():
-    airline_code = random.choice(list(airline_codes_file[1]))
-    flight_num = random.randrange(3000, 5999)
+    import flight_board
+    airline_codes = airline_code_list()
+    airline_code = airline_codes[flight_board.random_airlines(1, len(airline_codes))[0]]
+    flight_num = flight_board.random_flight_numbers(1)[0]
     return f'{airline_code}{flight_num}'
 
 # Returns random ETD (Expected Time of Departure) & ETA (Expected Time of Arrival)
-def random_time_generator():    
-    return random_time(text=True, pattern="%H:%M")
+def random_time_generator():
+    import flight_board
+    return flight_board.format_time(int(flight_board.random_times(1)[0]))
 
 # Return random airport terminal
 def random_terminal_generator():
-    terminal = random.randint(1, 3)
-    return f'T{terminal}'
+    import flight_board
+    return flight_board.TERMINALS[flight_board.random_terminals(1)[0]]
 
 # Return random carousel
 def random_carousel_generator():
-    return random.randint(1, 13)
+    import flight_board
+    return int(flight_board.random_carousels(1)[0])
 
 # Return random gate
 def random_gate_generator():
-    gate_alpha = random.choice(list(map(chr, range(65, 91))))
-    gate_num = random.randint(1, 99)
-    return f'{gate_alpha}{gate_num}'
+    import flight_board
+    return flight_board.format_gate(int(flight_board.random_gates(1)[0]))
 
 # Return random airplane status
 def random_status_generator():
-    status = ["Arrived", "Delayed", "Ontime", "Canceled"]
-    return random.choice(status)
+    import flight_board
+    return flight_board.STATUSES[flight_board.random_statuses(1)[0]]
 
 # Return random airplane seat
 def random_seat_generator():
+    from randomness import get_rng
     seat = ['A', 'B', 'C', 'D', 'E', 'F']
-    num = list(range(1, 31))
-    return f"{random.choice(num)}{random.choice(seat)}"
+    rng = get_rng()
+    return f"{rng.integers(1, 31)}{seat[rng.integers(0, len(seat))]}"
 
 # Returns all labels bolded
 def bold(labels):
@@ -72,7 +95,7 @@ def bold(labels):
 def color_code(cities):
     for i in range(len(cities)):
         city = cities[i]
-        if city[-1] == "Arrived":
+        if city[-1] == "Arrived" or city[-1] == "Departed":
             cities[i] = [color.BLUE + str(elem) + color.END for elem in city]
         elif city[-1] == "Ontime":
             cities[i] = [color.GREEN + str(elem) + color.END for elem in city]
@@ -82,415 +105,343 @@ def color_code(cities):
             cities[i] = [color.RED + str(elem) + color.END for elem in city]
     return cities
 
+# Returns a horizontal line
+def horizontal_line_text():
+    return "-"*82
+
 # Draws a horizontal line
 def horizontal_line():
-    print("-"*82)
+    print(horizontal_line_text())
+
+# Returns a unique title
+def line_title_text(prompt):
+    diff = int((82 - len(prompt) - 2) / 2)
+    return "-" * diff + f" {prompt} " + "-" * diff
 
 # Creates a unique title
 def line_title(prompt):
-    diff = int((82 - len(prompt) - 2) / 2)
-    print("-" * diff + f" {prompt} " + "-" * diff)
+    print(line_title_text(prompt))
 
 # Service cities
 cities = [
-    ["Regina", "YQR"], 
-    ["Thunder Bay", "YQT"], 
-    ["Winnipeg", "YWG"], 
-    ["Ottawa", "YOW"], 
-    ["Yellowknife", "YZF"], 
-    ["PEI", "YYG"], 
-    ["Halifax", "YHZ"], 
-    ["Edmonton", "YEG"], 
-    ["Hamilton", "YHM"], 
-    ["Montreal", "YUL"], 
-    ["Vancouver", "YVR"], 
+    ["Regina", "YQR"],
+    ["Thunder Bay", "YQT"],
+    ["Winnipeg", "YWG"],
+    ["Ottawa", "YOW"],
+    ["Yellowknife", "YZF"],
+    ["PEI", "YYG"],
+    ["Halifax", "YHZ"],
+    ["Edmonton", "YEG"],
+    ["Hamilton", "YHM"],
+    ["Montreal", "YUL"],
+    ["Vancouver", "YVR"],
     ["Calgary", "YYC"]
     ]
 # List of valid cities
 valid_service_cities = [city[0] for city in cities]
 
+# Other names customers use for the service cities, by airport ID (see get_city_resolver)
+CITY_ALIASES = {
+    "PEI": ["Prince Edward Island", "P.E.I.", "Charlottetown"],
+    "MONTREAL": ["Montréal", "Montreal Trudeau"],
+    "OTTAWA": ["Ottawa Macdonald-Cartier"],
+    "VANCOUVER": ["Vancouver International"],
+}
+
+# Location of each airport; uppercase to accomodate for all cases
+cities_location = {"REGINA": (50.4337, -104.6560),
+                "THUNDER BAY": (48.3720, -89.3121),
+                "WINNIPEG": (49.9097, -97.2364),
+                "OTTAWA": (45.3178, -75.6659),
+                "YELLOWKNIFE": (62.4712, -114.4381),
+                "PEI": (46.2858, -63.1313),
+                "HALIFAX": (44.8875, -63.5075),
+                "EDMONTON": (53.3062, -113.5828),
+                "HAMILTON": (43.1728, -79.9317),
+                "MONTREAL": (45.4657, -73.7455),
+                "VANCOUVER": (49.1934, -123.1751),
+                "CALGARY": (51.1182, -114.0032)}
+
+_city_resolver = None
+
+# Returns the index resolving city names, IATA codes, aliases and typos to airport IDs (the keys of
+# cities_location and of the fare matrix, e.g. "THUNDER BAY"), building it the first time
+def get_city_resolver():
+    global _city_resolver
+    if _city_resolver is None:
+        from city_resolver import Airport, CityResolver
+        _city_resolver = CityResolver([Airport(name.upper(), name, code) for name, code in cities], CITY_ALIASES)
+    return _city_resolver
+
+_fare_matrix = None
+
+# Returns the distance/fare matrix of the service cities, computing (or loading) it the first time
+def get_fare_matrix():
+    global _fare_matrix
+    if _fare_matrix is None:
+        import fare_matrix
+        with metrics.timer("fare_matrix"):
+            _fare_matrix = fare_matrix.FareMatrix.load(cities_location)
+    return _fare_matrix
+
+# Returns the connecting-route graph of the service cities, built the first time
+def get_route_graph():
+    import routes
+    return routes.route_graph(get_fare_matrix())
+
+_seat_inventory = None
+
+# Returns the seat inventory shared by every booking in this process
+def get_seat_inventory():
+    global _seat_inventory
+    if _seat_inventory is None:
+        from seat_inventory import SeatInventory
+        _seat_inventory = SeatInventory()
+    return _seat_inventory
+
+_ledger = None
+
+# Returns the booking ledger of this process, opening it the first time (it is closed at exit, after
+# the queued bookings are written)
+def get_ledger():
+    global _ledger
+    if _ledger is None:
+        import atexit
+        from ledger import BookingLedger
+        _ledger = BookingLedger()
+        atexit.register(_ledger.close)
+    return _ledger
+
+################################################################################
+
 # Air Ontario Display
-print("\n")
-print(pyfiglet.Figlet(font="slant").renderText(" "*6 + "Air Ontario"))
-print(" "*27 + f"{datetime.now()}\n")
-
-# ARRIVALS
-arrivals_header = bold(["Destination", "Code", "Flight", "ETA", "Terminal", "Carousel", "Status"])
-arrival_cities = copy.deepcopy(cities)
-for city in arrival_cities:
-    city.extend([
-        random_airline_code_generator(),
-        random_time_generator(),
-        random_terminal_generator(),
-        random_carousel_generator(),
-        random_status_generator()
-    ])
-line_title("ARRIVALS")
-color_code(arrival_cities)
-print(tabulate(arrival_cities, headers=arrivals_header, tablefmt="fancy_grid", 
-               numalign="center", stralign="center"))
-
-# DEPARTURE
-departure_header = bold(["Destination", "Code", "Flight", "ETD", "Terminal", "Gate No.", "Status"])
-departure_cities = copy.deepcopy(cities)
-for city in departure_cities:
-    city.extend([
-        random_airline_code_generator(),
-        random_time_generator(),
-        random_terminal_generator(),
-        random_gate_generator(),
-        random_status_generator()
-    ])
-line_title("DEPARTURES")
-color_code(departure_cities)
-print(tabulate(departure_cities, headers=departure_header, tablefmt="fancy_grid", 
-               numalign="center", stralign="center"))
-print()
-line_title("Thank you for choosing Air Ontario")
+def display_banner():
+    import pyfiglet
+    print("\n")
+    with metrics.timer("banner"):
+        banner = pyfiglet.Figlet(font="slant").renderText(" "*6 + "Air Ontario")
+    print(banner)
+    print(" "*27 + f"{datetime.now()}\n")
+
+# Returns the arrivals board as a columnar FlightBoard, sorted by ETA
+    # Note: by default there is one row per service city; pass size to sample that many flights
+def generate_arrivals_board(size=None, rng=None):
+    import flight_board
+    board = flight_board.generate_board(flight_board.ARRIVALS, cities, airline_code_list(), size=size, rng=rng)
+    return board.sorted_by_time()
+
+# Returns the departures board as a columnar FlightBoard, sorted by ETD
+def generate_departures_board(size=None, rng=None):
+    import flight_board
+    board = flight_board.generate_board(flight_board.DEPARTURES, cities, airline_code_list(), size=size, rng=rng)
+    return board.sorted_by_time()
+
+# Returns the arrivals (or departures) of the service cities over several days, indexed by time
+    # start_date: a date, datetime or "MM/DD/YY" string (as checked by check_date)
+    # per_day: flights per day (default: one per service city)
+def generate_schedule(kind, start_date, days=1, per_day=None, rng=None):
+    import schedule
+    return schedule.generate_schedule(kind, cities, airline_code_list(), start_date, days=days,
+                                      per_day=per_day, rng=rng)
+
+# Returns the arrivals board as a list of rows (one row per service city)
+def generate_arrivals(size=None, rng=None):
+    return list(generate_arrivals_board(size, rng).rows())
+
+# Returns the departures board as a list of rows (one row per service city)
+def generate_departures(size=None, rng=None):
+    return list(generate_departures_board(size, rng).rows())
+
+# Displays the arrivals and departures boards
+    # renderer: a renderers.RENDERERS name ("fancy" is the color coded kiosk table)
+    # Note: the machine formats (csv, jsonl) write the rows of both boards only, without titles
+def display_boards(renderer="fancy", out=None, size=None):
+    import sys
+    import renderers
+    render = renderers.get_renderer(renderer)
+    machine = renderer in renderers.MACHINE_FORMATS
+    out = sys.stdout if out is None else out
+
+    for title, generate in (("ARRIVALS", generate_arrivals_board), ("DEPARTURES", generate_departures_board)):
+        with metrics.timer("board_generation"):
+            board = generate(size)
+        if not machine:
+            out.write(line_title_text(title) + "\n")
+        with metrics.timer("rendering"):
+            # Machine formats write their header line once, before the first board
+            render(board, out, header=not machine or title == "ARRIVALS")
+    if not machine:
+        out.write("\n" + line_title_text("Thank you for choosing Air Ontario") + "\n")
 
 ################################################################################
 
-# Validates date input
-def validate_date(prompt, starting_date=datetime.now()):
+# Note: each check_* function below checks a single answer and returns (value, None) if it is valid,
+# otherwise (None, error message). The validate_* functions keep asking until an answer is valid;
+# the booking session (booking.py) uses the check_* functions directly, one answer at a time.
+
+# Checks a date answer
+def check_date(user_input, starting_date=None, now=None):
     # Note that since this was out of my scope of knowledge, I used the Datetime documentation & common resources
-        # Idea of normalizing: https://stackoverflow.com/questions/61798474/how-to-replace-the-day-in-a-date-with-another-date     
+        # Idea of normalizing: https://stackoverflow.com/questions/61798474/how-to-replace-the-day-in-a-date-with-another-date
         # Formatting dates using regex: https://docs.python.org/3/howto/regex.html
         # Strptime: https://www.programiz.com/python-programming/datetime/strptime
-        # Datetime documentation: https://docs.python.org/3/library/datetime.html 
-        
+        # Datetime documentation: https://docs.python.org/3/library/datetime.html
+
+    # Note: the defaults are evaluated on each call, not once at import time
+    if now is None:
+        now = datetime.now()
+    if starting_date is None:
+        starting_date = now
     starting_date = starting_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    while True:
-        user_input = input(prompt)
-        if re.match(r'^\d{2}/\d{2}/\d{2}$', user_input):
-            try:
-                # Normalization (aka remove the hours, minutes, seconds and microseconds) to ensure they can be compared equally
-                input_date = datetime.strptime(user_input, '%m/%d/%y').replace(hour=0, minute=0, second=0, microsecond=0)
-                tomorrow = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-                
-                if input_date < tomorrow:
-                    print(color.RED + "You cannot depart before or during the same day as the booking. Please try again." + color.END)
-                elif input_date <= starting_date:
-                    print(color.RED + "You cannot arrive before or during the same day as the departure date. Please try again."+ color.END)
-                else:
-                    return user_input
-            except ValueError:
-                print(color.RED + "The date is not valid. Try again and use the MM/DD/YY format." + color.END)
+    if re.match(r'^\d{2}/\d{2}/\d{2}$', user_input):
+        try:
+            # Normalization (aka remove the hours, minutes, seconds and microseconds) to ensure they can be compared equally
+            input_date = datetime.strptime(user_input, '%m/%d/%y').replace(hour=0, minute=0, second=0, microsecond=0)
+            tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+            if input_date < tomorrow:
+                return None, color.RED + "You cannot depart before or during the same day as the booking. Please try again." + color.END
+            elif input_date <= starting_date:
+                return None, color.RED + "You cannot arrive before or during the same day as the departure date. Please try again."+ color.END
+            else:
+                return user_input, None
+        except ValueError:
+            return None, color.RED + "The date is not valid. Try again and use the MM/DD/YY format." + color.END
+    else:
+        return None, color.RED + "Invalid input. Try again and use the MM/DD/YY format." + color.END
+
+# Checks a radio-like option answer
+def check_option(user_input, min_option, max_option):
+    try:
+        user_input = int(user_input)
+        if user_input in range(min_option, max_option + 1):
+            return user_input, None
         else:
-            print(color.RED + "Invalid input. Try again and use the MM/DD/YY format." + color.END)
+            return None, color.RED + f"\nInput must be between {min_option} and {max_option} (inclusive). Please try again." + color.END
+    except ValueError:
+        return None, color.RED + "Invalid input. Try again and input a valid number." + color.END
+
+# Checks a city answer (a name, an IATA code, an alias or a close spelling of one of them)
+    # Returns the airport ID of the service city (e.g. "PEI" for "Prince Edward Island")
+    # duplicate: a city the answer must not be (e.g. the origin, when asking for the destination)
+def check_city(user_input, duplicate = None):
+    resolver = get_city_resolver()
+    airport = resolver.resolve(user_input)
+    if airport is None:
+        return None, color.RED + "\nInvalid input. Try again and input a service city." + color.END
+    if duplicate is not None and airport == resolver.resolve(duplicate):
+        return None, color.RED + "\nInvalid input. The destination must be a different city." + color.END
+    return airport.id, None
+
+# Checks whether an answer is Yes or No; returns 'Y' or 'N'
+def check_Y_N(user_input):
+    if user_input.upper() in ['Y', 'YES']:
+        return 'Y', None
+    elif user_input.upper() in ['N', 'NO']:
+        return 'N', None
+    else:
+        return None, color.RED + "\nInvalid input. Try again and input either Y or N." + color.END
+
+# Where the answers come from: a function that shows a prompt and returns the answer, like input()
+    # Note: replay.py sets one that answers from recorded transcripts
+_input_provider = None
+
+# Returns the input provider (input() unless another one was set)
+def get_input_provider():
+    return _input_provider or input
+
+# Sets the input provider; None goes back to input()
+def set_input_provider(provider):
+    global _input_provider
+    _input_provider = provider
+
+# Keeps asking until check(answer) accepts the answer, then returns the checked value
+def ask(prompt, check, *args, **kwargs):
+    read = get_input_provider()
+    while True:
+        value, error = check(read(prompt), *args, **kwargs)
+        if error is None:
+            return value
+        metrics.count("reprompts", check=check.__name__)
+        print(error)
+
+# Validates date input
+def validate_date(prompt, starting_date=None):
+    return ask(prompt, check_date, starting_date)
 
 # Validates radio-like options input
 def validate_option(prompt, min_option, max_option):
-    while True:
-        try:
-            user_input = int(input(prompt))
-            if user_input in range(min_option, max_option + 1):
-                return user_input
-            else:
-                print(color.RED + f"\nInput must be between {min_option} and {max_option} (inclusive). Please try again." + color.END)
-        except ValueError:
-            print(color.RED + "Invalid input. Try again and input a valid number." + color.END)
+    return ask(prompt, check_option, min_option, max_option)
 
 # Validates city name by comparing to valid service cities
 def validate_city(prompt, duplicate = None):
-    while True:
-        user_input = input(prompt)
-        if user_input.title() in valid_service_cities and user_input != duplicate:
-            return user_input
-        # Special case for PEI
-        elif user_input.title() == 'Pei' or user_input.title() == "Prince Edward Island" and user_input != duplicate:
-            return user_input
-        else:
-            print(color.RED + "\nInvalid input. Try again and input a service city." + color.END)
+    return ask(prompt, check_city, duplicate)
 
 # Validates whether input is Yes or No
 def validate_Y_N(prompt):
-    while True:
-        user_input = input(prompt)
-        if user_input.upper() in ['Y', 'YES', 'N', 'NO']:
-            return 'Y'
-        else:
-            print(color.RED + "\nInvalid input. Try again and input either Y or N." + color.END)
-
-# Booking display
-print()
-horizontal_line()
-line_title("Book your flight")
-horizontal_line()
-
-# Retrieves user name
-first_name = input("\nWhat is your first name? ")
-last_name = input("\nWhat is your last name? ")
-
-# Retrieves type of trip
-print("\nWhich type of trip would you like?")
-print("\n 1. Round Trip\n 2. One-way")
-trip_type = validate_option("\nPlease type 1 or 2: ", 1, 2)
-
-# While loop to reprompt options if the user is not satisfied
-option_selected = False
-while option_selected == False:
-    # -- Provides information on service cities --
-    horizontal_line()
-    print("\nNote that currently, Air Ontario only operates from the following cities:\n")
-    # Prints out all cities for user to see
-    for i in range(len(valid_service_cities)):
-        print(valid_service_cities[i], end=", ")
-        if i == 5:
-            print()
-    
-    # Booking Menu Display
-    print("\n")
-    line_title("BOOKING MENU")
-    
-    # -- Gather information from user --
-    # Retrieves original city and destination
-    origin = validate_city("\nWhere are you headed from? ").upper()
-    destination = validate_city("\nWhere are you headed to? ", duplicate = origin).upper()
-    
-    # Retrieves date of departure and return day (latter is if round-trip is selected)
-    departure_date = validate_date("\nWhen would you like to depart? (MM/DD/YY): ")    
-    if trip_type == 1:
-        departure_date_modified = datetime.strptime(departure_date, '%m/%d/%y')
-        return_date = validate_date("\nWhen would you like to return? (MM/DD/YY): ", starting_date = departure_date_modified)
-
-    # -- Calculate cost of trip using distance --
-    # Location of each airport; uppercase to accomodate for all cases
-    cities_location = {"REGINA": (50.4337, -104.6560),
-                    "THUNDER BAY": (48.3720, -89.3121),
-                    "WINNIPEG": (49.9097, -97.2364),
-                    "OTTAWA": (45.3178, -75.6659),
-                    "YELLOWKNIFE": (62.4712, -114.4381),
-                    "PEI": (46.2858, -63.1313),
-                    "HALIFAX": (44.8875, -63.5075),
-                    "EDMONTON": (53.3062, -113.5828),
-                    "HAMILTON": (43.1728, -79.9317),
-                    "MONTREAL": (45.4657, -73.7455),
-                    "VANCOUVER": (49.1934, -123.1751),
-                    "CALGARY": (51.1182, -114.0032)}
-
-    # Calculates distance and multiplies by a certain factor
-        # Note: I used the Geopy documentation to develop this method
-            # I found the method here: https://www.webscale.com/engineering-education/how-to-calculate-distance-between-two-points-using-geopy-in-python/
-            # Geopy documentation: https://geopy.readthedocs.io/en/stable/
-    economy_ticket_price = format(float(GD(cities_location[origin], cities_location[destination]).km) / 6, ".2f")
-    business_ticket_price = format(float(economy_ticket_price) * 3, ".2f")
-    first_ticket_price = format(float(economy_ticket_price) * 9, ".2f")
-    
-    connecting_economy_ticket_price = format(float(economy_ticket_price) * 0.8, ".2f")
-    connecting_business_ticket_price = format(float(first_ticket_price) * 0.85, ".2f")
-    connecting_first_ticket_price = format(float(first_ticket_price) * 0.9, ".2f")
-    
-    # -- Organizes and displays data based on trip type -- 
-    if trip_type == 1:
-        # Since it's a roundtrip, assuming simplest scenario, price stays the same
-        economy_ticket_price *= 2
-        business_ticket_price *= 2
-        first_ticket_price *= 2
-        
-        # Roundtrip data
-        print()
-        horizontal_line()
-        print(f'\nFor a round trip from {origin} to {destination}:')
-        flight_pricing_information = [[origin, "Direct", destination, "Economy", economy_ticket_price],
-                    [origin, "Connecting", destination, "Economy", connecting_economy_ticket_price],
-                    [origin, "Direct", destination, "Business", business_ticket_price],
-                    [origin, "Connecting", destination, "Business", connecting_business_ticket_price],
-                    [origin, "Direct", destination, "First", first_ticket_price],
-                    [origin, "Connecting", destination, "First", connecting_first_ticket_price]]
-    else:  
-        # Oneway data
-        print("\n")
-        horizontal_line()
-        print(f'For a oneway trip from {origin} to {destination}:')
-        flight_pricing_information = [[origin, "Direct", destination, "Economy", economy_ticket_price],
-                    [origin, "Connecting", destination, "Economy", connecting_economy_ticket_price],
-                    [origin, "Direct", destination, "Business", business_ticket_price],
-                    [origin, "Connecting", destination, "Business", connecting_business_ticket_price],
-                    [origin, "Direct", destination, "First", first_ticket_price],
-                    [origin, "Connecting", destination, "First", connecting_first_ticket_price]]
-    
-    # Displays table of costs
-    print(tabulate(flight_pricing_information, 
-                headers=["Origin", "Type of Stop", "Destination", "Class", "Total Cost"], 
-                tablefmt="fancy_grid", numalign="center", stralign="center"))
-
-    # -- Select options to continue to restart --
-    print("Select one of the options below:")
-    print("\n 1. Purchase ticket\n 2. Return to Menu")
-    decision = validate_option("\nPlease type 1 or 2: ", 1, 2)
-    
-    # -- If user decides to purchase ticket, go through checkout otherwise return menu --
-    if decision == 1:
-        # -- Gather user information for checkout --
-        # Select type of flight package
-        print()
-        line_title("Select Package")
-        print("\nWhich package would you like to select? ")
-        print("\n 1. Economy class, direct")
-        print(" 2. Economy class, Connecting")
-        print(" 3. Business class, direct")
-        print(" 4. Business class, Connecting")
-        print(" 5. First class, direct")
-        print(" 6. First class, Connecting")
-        ticket_option = validate_option("\nSelect a number from 1 to 6: ", 1, 6)
-        
-        # Retrieve chosen class (useful for boarding pass)
-        ticket_class = "Economy"
-        if ticket_option == 3 or ticket_option == 4:
-            ticket_class = "Business"
-        elif ticket_option == 5 or ticket_option == 6:
-            ticket_class = "First"
-        
-        # Retrieve chose type of package  (useful for boarding pass)
-        package = "Direct"
-        if ticket_option == 2 or ticket_option == 4 or ticket_option == 6:
-            package = "Connecting"
-        
-        # Select passenger count
-        passenger_count = validate_option("\nHow many passengers are boarding this trip? ", 1, 9)
-        
-        # Baggage Checking Styling
-        print()
-        line_title("Baggage Checking")
-        
-        # -- Bagging Checking section --
-        print("\nNote: Certain restrictions on carry-on luggages apply, click below for more information: ")
-        print("https://www.aircanada.com/ca/en/aco/home/plan/baggage/carry-on.html ")
-
-        # Choose rewards program
-        print("\nList of Rewards programs: Being a rewards program gives you benefits on pricing!")
-        print(" 1. Bronze Loyalty Program")
-        print(" 2. Silver Loyalty Program")
-        print(" 3. Gold Loyalty Program")
-        program_choice = validate_option("\nAre you a part of any of the programs listed above? If not, enter 0: ", 0, 3)
-        
-        # Set of prices based on rewards program chosen & class of flight
-        prices = {
-            # Loyalty program #: Economy (1st bag, 2nd bag, extra), Business (...), First (...)
-            0: [[50, 70, 100, 140], [40, 60, 90, 140], [35, 55, 85, 140]],
-            1: [[40, 60, 90, 120], ["Free", 50, 80, 120], ["Free", "Free", 70, 120]],
-            2: [["Free", 50, 70, 100], ["Free", "Free", 60, 80], ["Free", "Free", "Free", 70]],
-            3: [["Free", "Free", 50, 70], ["Free", "Free", "Free", 70], ["Free", "Free", "Free", "Free"]],
-        }
-
-        # -- Calculates & Displays luggage fee --
-        # Cost of economy class tickets
-        if ticket_class == "Economy":
-            luggage_fee = prices[program_choice][0]
-        # Cost of business class tickets
-        elif ticket_class == "Business":
-            luggage_fee = prices[program_choice][1]
-        # Cost of first class tickets
-        else:
-            luggage_fee = prices[program_choice][2]
-            
-        # Displays luggage cost 
-        luggage_header = ["Luggage", "Price"]
-        luggage_price = [
-            ["1st bag", f"${luggage_fee[0]}"],
-            ["2nd bag", f"${luggage_fee[1]}"],
-            ["3rd bag", f"${luggage_fee[2]}"],
-            ["Extra bags", f"${luggage_fee[3]}"]
-        ]
-        print()
-        print(tabulate(luggage_price, luggage_header, tablefmt="fancy_grid", numalign="center", stralign="center"))
-        
-        # -- Luggage count and verification --
-        # Counts the number of luggage
-        luggage_count = validate_option("\nHow many bags are you planning to check in? ", 0, 9)
-        # Provides information on the restrictions for luggages + associated costs
-        print()
-        line_title("Luggage Verification")
-        print("\nNote, that the max weight per bag is 23kg (50lbs) & max size limit is 158cm (62in).")
-        print("\nIf the bag exceeds the weight by up to 32kg (70lbs) and/or exceeds the max height \nby up to 292cm (115in), a $120 fee will be charged for each penalty on top of the \noriginal cost. Any heavier than this, and the bag will not be allowed on board.\n")
-        horizontal_line()
-
-        # Retrieve weight and dimension for checking, then decide the price otherwise reprompt if too much
-        luggage_cost = 0 
-        for i in range(luggage_count):
-            # Do not add anything if "Free" ($0)
-            if luggage_count > 3:
-                if luggage_fee[3] != "Free":
-                    luggage_cost += luggage_fee[3]
-            elif luggage_fee[i] != "Free":
-                luggage_cost += luggage_fee[i]
-            
-            # Verify proper input
-            luggage_weight = validate_option(f"\nLuggage {i + 1} weight (kg): ", 5, 32)
-            luggage_dimensions = validate_option(f"\nLuggage {i + 1} dimensions (cm): ", 50, 292)
-            
-            # Add additional fee if bag is overweight or oversized
-            if luggage_weight > 23:
-                luggage_cost += 120
-            if luggage_dimensions > 292:
-                luggage_cost += 120
-            print()
-
-        # -- Calculates cost of flight (grand total) --
-        # Calculates all associated costs
-        plane_ticket_cost = format(float(flight_pricing_information[ticket_option][-1]) * passenger_count, ".2f")
-        carrier_surcharges = 534.02
-        subtotal = format(float(plane_ticket_cost) + luggage_cost + carrier_surcharges, ".2f")
-        luggage_cost = format(luggage_cost, ".2f")
-        
-        # Additional taxes and charges
-        hst = format(0.13 * float(subtotal), ".2f")
-        security_fee = 25.64
-        passenger_service_fee = 3.13
-        airport_improvement_fee = 35.42
-        user_development_fee = 3.27
-        grand_total = format(float(subtotal) + float(hst) + security_fee + passenger_service_fee + \
-            airport_improvement_fee + user_development_fee, ".2f")
-       
-        # Change appearance of luggage in table
-        if luggage_cost == 0:
-            luggage_cost = "None!"
-            
-        # Displays final cost
-        line_title("CHECKOUT")
-        checkout_table = [
-            ["Base Fare - {passenger_count} passengers", plane_ticket_cost],
-            ["Luggage Cost", luggage_cost],
-            ["Carrier surcharges", carrier_surcharges],
-            ["Aviation Security Fee", security_fee],
-            ["Harmonized Sales Tax (HST)", hst],
-            ["Passenger Service fee", passenger_service_fee],
-            ["Airport Improvement Fee", airport_improvement_fee],
-            ["User Development Fee", user_development_fee],
-            ["Grand total", grand_total]
-        ]
-        print(tabulate(checkout_table, tablefmt="fancy_grid", numalign="center"))
-        
-        # Confirmation to checkout
-        checkout_confirmation = validate_Y_N("Would you like to checkout? If not, you will be taken back to the booking menu (Y/N): ")
-        
-        # Proceed with checkout if yes, otherwise loop again to menu
-        if checkout_confirmation == 'Y':
-            if trip_type == 1:
-                horizontal_line()
-                print(color.GREEN + "\nCongratulations!" + color.END + f"You have booked your flight. It is scheduled to depart at {departure_date} and return at {return_date}!")
-                option_selected = True
-            else:
-                horizontal_line()
-                print(color.GREEN + "\nCongratulations!" + color.END + f"You have booked your flight. It is scheduled to depart at {departure_date}!")
-                option_selected = True
-            
-            # -- Create a Boarding Pass --
-            # Assign random airplane
-            col_1 = list(airline_codes_file[0])
-            col_2 = list(airline_codes_file[1])
-            random_flight_code = random_airline_code_generator()
-            random_flight_name = col_1[col_2.index(random_flight_code[:2])]
-
-            # Organize boarding pass information with a header & then display
-            boarding_pass_info = [
-                [f"{first_name} {last_name}", f"Flight {random_flight_code}", f"Terminal {random_terminal_generator()}"],
-                [f"ETD > {random_time_generator()}", f"ETA > {random_time_generator()}", f"Gate {random_gate_generator()}"],
-                [f"Leaving {origin}", f"Arriving {destination}", f"Seat No. {random_seat_generator()}"],
-                [random_flight_name, "----------->", "||!!||!|||!|"]
-            ]
-            boarding_pass_headers = ["Boarding Pass", f"{ticket_class} class", f"{package}"]
-            print()
-            line_title("Boarding Pass")
-            print('\n' + tabulate(boarding_pass_info, headers=boarding_pass_headers, tablefmt="rst") + '\n')   
-            print(pyfiglet.Figlet(font="slant", width=100).renderText("Safe journey !"))
+    return ask(prompt, check_Y_N)
+
+# Runs the interactive booking flow, from the booking menu up to the boarding pass
+    # Note: the flow itself is the BookingSession state machine (booking.py); this only feeds it
+    # the answers of the input provider (typed at the console by default)
+    # input_provider: see get_input_provider(); output: file the last output is printed to (stdout by default)
+    # session_options: passed to BookingSession (e.g. ledger, now)
+def book_flight(input_provider=None, output=None, **session_options):
+    import sqlite3
+    from booking import BookingSession
+    read = input_provider or get_input_provider()
+    session_options.setdefault("fare_matrix", get_fare_matrix())
+    session = BookingSession(**session_options)
+    text = session.start()
+    while not session.done:
+        text = session.feed(read(text))
+    # The boarding pass is shown once the booking is on disk (there is none when no seats were left)
+    try:
+        if session.saved is not None:
+            session.saved.result()
+    except sqlite3.Error as error:
+        text = session.save_failed(error)
+    print(text, end="", file=output)
+    return session
+
+# Runs a live departures (or arrivals) board that repaints only the rows that change
+def display_live_board(kind="departures", size=None, interval=1.0):
+    import live_board
+    board = generate_arrivals_board(size) if kind == "arrivals" else generate_departures_board(size)
+    live_board.run(board, interval=interval)
+
+# Runs the whole program: banner and boards first, then the booking flow
+    # Note: with --live, a live board is shown instead (for gate displays)
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Air Ontario flight boards and booking")
+    parser.add_argument("--live", choices=["arrivals", "departures"], help="show a live board instead of booking")
+    parser.add_argument("--rows", type=int, help="flights per board (default: one per city)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between live board refreshes")
+    parser.add_argument("--renderer", choices=["fancy", "fixed", "csv", "jsonl"], default="fancy",
+                        help="board format; csv and jsonl print the boards only, for other programs")
+    parser.add_argument("--seed", type=int, help="seed of the random boards and flights (default: a new run each time)")
+    parser.add_argument("--metrics", choices=metrics.FORMATS, help="print stage timings and counters at exit")
+    parser.add_argument("--metrics-file", help="write the metrics to this file instead of stderr")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable(args.metrics, args.metrics_file)
+    if args.seed is not None:
+        import randomness
+        randomness.seed(args.seed)
+
+    if args.live:
+        display_live_board(args.live, args.rows, args.interval)
+        return
+    if args.renderer in ("csv", "jsonl"):
+        display_boards(args.renderer, size=args.rows)
+        return
+    display_banner()
+    display_boards(args.renderer, size=args.rows)
+    book_flight()
+
+if __name__ == "__main__":
+    # Run through the importable module, so that modules importing air_ontario share its state
+    import air_ontario
+    air_ontario.main()
@@ -0,0 +1,91 @@
+# Airline registry for Air Ontario
+# An immutable index of airlines, loaded once from a semicolon separated file
+# (name;IATA;ICAO;callsign;country), with constant-time lookups by IATA code, ICAO code and
+# callsign, and a prebuilt tuple of IATA codes for random sampling. Parsing is done with plain
+# string operations, so pandas is not needed.
+import csv
+from collections import namedtuple
+from types import MappingProxyType
+
+Airline = namedtuple("Airline", ["name", "iata", "icao", "callsign", "country"])
+
+# Values used for a missing code (the OpenFlights data uses \N and -)
+MISSING = {"", "-", "\\N", "N/A"}
+
+# Returns the value, or None if it stands for a missing code
+def clean_code(value):
+    value = value.strip()
+    return None if value in MISSING else value.upper()
+
+# An immutable, indexed list of airlines
+class AirlineRegistry:
+    __slots__ = ("airlines", "by_iata", "by_icao", "by_callsign", "sample_codes")
+
+    def __init__(self, airlines):
+        airlines = tuple(airlines)
+        by_iata, by_icao, by_callsign = {}, {}, {}
+        for airline in airlines:
+            # Codes are reused by defunct airlines; the first airline listed keeps the code
+            if airline.iata:
+                by_iata.setdefault(airline.iata, airline)
+            if airline.icao:
+                by_icao.setdefault(airline.icao, airline)
+            if airline.callsign:
+                by_callsign.setdefault(airline.callsign, airline)
+        object.__setattr__(self, "airlines", airlines)
+        object.__setattr__(self, "by_iata", MappingProxyType(by_iata))
+        object.__setattr__(self, "by_icao", MappingProxyType(by_icao))
+        object.__setattr__(self, "by_callsign", MappingProxyType(by_callsign))
+        # One entry per airline that can be used as a flight number prefix
+        object.__setattr__(self, "sample_codes", tuple(by_iata))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AirlineRegistry is immutable")
+
+    def __len__(self):
+        return len(self.airlines)
+
+    def __iter__(self):
+        return iter(self.airlines)
+
+    # Returns the airline with this IATA code (e.g. "AC"), or None
+    def iata(self, code):
+        return self.by_iata.get(code.upper())
+
+    # Returns the airline with this ICAO code (e.g. "ACA"), or None
+    def icao(self, code):
+        return self.by_icao.get(code.upper())
+
+    # Returns the airline with this callsign (e.g. "AIR CANADA"), or None
+    def callsign(self, callsign):
+        return self.by_callsign.get(callsign.strip().upper())
+
+    # Returns the airline operating a flight number such as "AC4321", or None
+    def for_flight(self, flight_code):
+        return self.by_iata.get(flight_code[:2].upper())
+
+    # Loads the registry from a semicolon separated file (name;IATA;ICAO;callsign;country)
+    @classmethod
+    def from_file(cls, path):
+        airlines = []
+        with open(path, encoding="utf-8") as file:
+            for line in file.read().splitlines():
+                fields = line.split(";")
+                if len(fields) < 5 or not fields[0].strip():
+                    continue
+                airlines.append(Airline(fields[0].strip(), clean_code(fields[1]), clean_code(fields[2]),
+                                        clean_code(fields[3]), fields[4].strip()))
+        return cls(airlines)
+
+    # Loads the registry from an OpenFlights airlines.dat file
+    # (id,name,alias,IATA,ICAO,callsign,country,active)
+    @classmethod
+    def from_openflights(cls, path, active_only=False):
+        airlines = []
+        with open(path, encoding="utf-8", newline="") as file:
+            for fields in csv.reader(file):
+                if len(fields) < 8 or (active_only and fields[7] != "Y"):
+                    continue
+                airlines.append(Airline(fields[1], clean_code(fields[3]), clean_code(fields[4]),
+                                        clean_code(fields[5]), fields[6]))
+        return cls(airlines)
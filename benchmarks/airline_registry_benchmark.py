@@ -0,0 +1,70 @@
+# Airline registry benchmark
+# Builds an OpenFlights-size airline file (about 6,000 rows) and times loading it into an
+# AirlineRegistry and looking airlines up, against the original approach of reading the file with
+# pandas and scanning its columns with list.index().
+#
+# Usage:
+#   python benchmarks/airline_registry_benchmark.py
+#   python benchmarks/airline_registry_benchmark.py --airlines 6000 --lookups 100000
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from airlines import AirlineRegistry
+
+# Writes `count` random airlines to a semicolon separated file and returns their IATA codes
+def write_airlines(path, count, rng):
+    codes = [a + b for a in string.ascii_uppercase + string.digits for b in string.ascii_uppercase + string.digits]
+    rng.shuffle(codes)
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(count):
+            icao = "".join(rng.choices(string.ascii_uppercase, k=3))
+            file.write(f"Airline {i};{codes[i % len(codes)]};{icao};CALLSIGN {i};Country {i % 200}\n")
+    return codes[:min(count, len(codes))]
+
+# Returns the time (in seconds) taken by func, and its result
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario airline registry benchmark")
+    parser.add_argument('--airlines', type=int, default=6000)
+    parser.add_argument('--lookups', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "airlines.txt")
+        codes = write_airlines(path, args.airlines, rng)
+        flights = [f"{rng.choice(codes)}{rng.randrange(3000, 5999)}" for _ in range(args.lookups)]
+
+        load, registry = timed(lambda: AirlineRegistry.from_file(path))
+        lookup, _ = timed(lambda: [registry.for_flight(flight).name for flight in flights])
+        sample, _ = timed(lambda: [rng.choice(registry.sample_codes) for _ in range(args.lookups)])
+        print(f"AirlineRegistry: load {load * 1000:.1f} ms, "
+              f"lookup {lookup / len(flights) * 1e6:.2f} us, sample {sample / len(flights) * 1e6:.2f} us")
+
+        try:
+            import pandas as pd
+        except ImportError:
+            print("pandas is not installed; skipping the original approach")
+            return
+        load, table = timed(lambda: pd.read_csv(path, sep=";", header=None, keep_default_na=False))
+        sample_flights = flights[:1000]
+        # The boarding pass rebuilt both columns and scanned them for every lookup
+        lookup, _ = timed(lambda: [list(table[0])[list(table[1]).index(flight[:2])] for flight in sample_flights])
+        sample, _ = timed(lambda: [rng.choice(list(table[1])) for _ in sample_flights])
+        print(f"pandas + list.index: load {load * 1000:.1f} ms, "
+              f"lookup {lookup / len(sample_flights) * 1e6:.2f} us, sample {sample / len(sample_flights) * 1e6:.2f} us")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# Board generation throughput benchmark
+# Compares the original per-cell loop (deep copy of the city rows, then one random_*_generator call
+# per cell) with the columnar generator in flight_board, at several board sizes.
+#
+# Usage:
+#   python benchmarks/board_benchmark.py
+#   python benchmarks/board_benchmark.py --sizes 12 1000 50000
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from randomtimestamp import random_time
+
+import air_ontario
+import flight_board
+
+# The original departures loop, kept here as the reference implementation
+def legacy_departures(size, airline_codes):
+    rows = copy.deepcopy([air_ontario.cities[i % len(air_ontario.cities)] for i in range(size)])
+    for city in rows:
+        city.extend([
+            f'{random.choice(list(airline_codes))}{random.randrange(3000, 5999)}',
+            random_time(text=True, pattern="%H:%M"),
+            f'T{random.randint(1, 3)}',
+            f'{random.choice(list(map(chr, range(65, 91))))}{random.randint(1, 99)}',
+            random.choice(["Arrived", "Delayed", "Ontime", "Canceled"]),
+        ])
+    return rows
+
+# Returns the best time (in seconds) of `repeat` runs of func
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario board generation benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[12, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    airline_codes = air_ontario.airline_code_list()
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+
+    print(f"{'rows':>8}{'loop rows/s':>16}{'columns rows/s':>18}{'+ rows() rows/s':>18}{'speedup':>10}")
+    for size in args.sizes:
+        loop = best_of(lambda: legacy_departures(size, airline_codes), args.repeat)
+        columns = best_of(lambda: flight_board.generate_board(
+            flight_board.DEPARTURES, air_ontario.cities, airline_codes, size=size, rng=rng), args.repeat)
+        with_rows = best_of(lambda: list(flight_board.generate_board(
+            flight_board.DEPARTURES, air_ontario.cities, airline_codes, size=size, rng=rng).rows()), args.repeat)
+        print(f"{size:>8}{size / loop:>16,.0f}{size / columns:>18,.0f}{size / with_rows:>18,.0f}{loop / columns:>9.0f}x")
+
+if __name__ == '__main__':
+    main()
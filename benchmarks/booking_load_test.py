@@ -0,0 +1,104 @@
+# Booking server load test
+# Starts a booking server in a separate process (or connects to one with --connect) and runs many
+# complete bookings over concurrent connections. Reports completed sessions per second and the
+# latency of each step (answer sent -> reply received), including p99.
+#
+# Usage:
+#   python benchmarks/booking_load_test.py
+#   python benchmarks/booking_load_test.py --sessions 5000 --concurrency 1000
+#   python benchmarks/booking_load_test.py --connect 127.0.0.1:8787
+import argparse
+import asyncio
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from booking_server import END_OF_REPLY
+from replay import percentile, random_transcript
+
+# Runs one booking and appends the latency of each step to `latencies`
+async def run_session(host, port, answers, latencies):
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    try:
+        await reader.readuntil(END_OF_REPLY)
+        for answer in answers:
+            start = time.perf_counter()
+            writer.write(answer.encode() + b"\n")
+            await writer.drain()
+            await reader.readuntil(END_OF_REPLY)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+# Runs `sessions` bookings with at most `concurrency` open at the same time
+async def load_test(host, port, sessions, concurrency, seed):
+    rng = random.Random(seed)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one(answers):
+        nonlocal failures
+        async with semaphore:
+            try:
+                await run_session(host, port, answers, latencies)
+            except (OSError, asyncio.IncompleteReadError):
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(random_transcript(rng)) for _ in range(sessions)))
+    return time.perf_counter() - start, latencies, failures
+
+# Starts a booking server on a free port, writing bookings to `ledger_path`; returns the process and the port
+def start_server(ledger_path):
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "booking_server.py"), "--port", "0",
+                                "--ledger", ledger_path], stdout=subprocess.PIPE, text=True)
+    # "Air Ontario booking server listening on host:port"
+    port = int(process.stdout.readline().rsplit(":", 1)[1])
+    return process, port
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario booking server load test")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--connect", help="host:port of a running server (default: start one)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Every connection needs a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    process = None
+    ledger_dir = tempfile.TemporaryDirectory()
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        process, port = start_server(os.path.join(ledger_dir.name, "bookings.db"))
+        host = "127.0.0.1"
+    try:
+        elapsed, latencies, failures = asyncio.run(load_test(host, port, args.sessions, args.concurrency, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        ledger_dir.cleanup()
+
+    print(f"{args.sessions} sessions, {args.concurrency} concurrent, {len(latencies)} steps, {failures} failed")
+    print(f"sessions/s: {(args.sessions - failures) / elapsed:,.1f}")
+    if latencies:
+        print(f"step latency: p50 {statistics.median(latencies) * 1000:.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, max {max(latencies) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# City resolver benchmark
+# Builds the city resolver over thousands of made-up airports and times exact lookups (names and IATA
+# codes), fuzzy lookups (names with one or two typos) and prefix autocomplete, next to the original
+# check (`answer.title() in valid_service_cities`, a list scan, exact names only).
+#
+# Usage:
+#   python benchmarks/city_resolver_benchmark.py
+#   python benchmarks/city_resolver_benchmark.py --airports 12 1000 5000
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from city_resolver import Airport, CityResolver
+
+SYLLABLES = ["ba", "ca", "do", "el", "fi", "ga", "ha", "ka", "la", "ma", "na", "on", "pe", "ra", "sa",
+             "ta", "to", "va", "wi", "yo", "ri", "mon", "ton", "ville", "port", "bay", "field", "lake"]
+
+# Returns `count` airports with made-up names (one or two words) and distinct IATA-like codes
+def random_airports(count, rng):
+    names, codes = set(), set()
+    airports = []
+    while len(airports) < count:
+        words = [("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))).title()
+                 for _ in range(rng.choice([1, 1, 2]))]
+        name = " ".join(words)
+        code = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))
+        if name in names or code in codes:
+            continue
+        names.add(name)
+        codes.add(code)
+        airports.append(Airport(name.upper(), name, code))
+    return airports
+
+# Returns a name with `count` random typos (substitution, deletion, insertion or swap)
+def typo(name, count, rng):
+    for _ in range(count):
+        i = rng.randrange(1, len(name) - 1)
+        kind = rng.randrange(4)
+        letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        if kind == 0:
+            name = name[:i] + letter + name[i + 1:]
+        elif kind == 1:
+            name = name[:i] + name[i + 1:]
+        elif kind == 2:
+            name = name[:i] + letter + name[i:]
+        else:
+            name = name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return name
+
+# Returns microseconds per call of func over the queries, and the share of queries it answered
+def per_query(func, queries):
+    start = time.perf_counter()
+    answered = sum(bool(func(query)) for query in queries)
+    return (time.perf_counter() - start) / len(queries) * 1e6, answered / len(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario city resolver benchmark")
+    parser.add_argument('--airports', type=int, nargs='+', default=[12, 1000, 5000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'airports':>9}{'build ms':>10}{'list scan':>11}{'name':>8}{'IATA':>8}"
+          f"{'1 typo':>16}{'2 typos':>16}{'prefix':>8}   (us per query, share resolved)")
+    for count in args.airports:
+        airports = random_airports(count, rng)
+        start = time.perf_counter()
+        resolver = CityResolver(airports)
+        build = (time.perf_counter() - start) * 1000
+        sample = [rng.choice(airports) for _ in range(args.queries)]
+        valid_service_cities = [airport.name for airport in airports]
+
+        scan, _ = per_query(lambda name: name.title() in valid_service_cities, [a.name.lower() for a in sample])
+        name, _ = per_query(resolver.resolve, [a.name.lower() for a in sample])
+        iata, _ = per_query(resolver.resolve, [a.iata for a in sample])
+        one, one_share = per_query(resolver.resolve, [typo(a.name.lower(), 1, rng) for a in sample])
+        two, two_share = per_query(resolver.resolve, [typo(a.name.lower(), 2, rng) for a in sample])
+        prefix, _ = per_query(resolver.complete, [a.name[:3] for a in sample])
+        print(f"{count:>9}{build:>10.1f}{scan:>11.2f}{name:>8.2f}{iata:>8.2f}"
+              f"{one:>8.1f} ({one_share:>4.0%}){two:>8.1f} ({two_share:>4.0%}){prefix:>8.1f}")
+
+if __name__ == '__main__':
+    main()
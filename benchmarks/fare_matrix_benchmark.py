@@ -0,0 +1,62 @@
+# Fare matrix benchmark
+# Times building the all-pairs distance matrix for N random airports (cold, then from the on-disk
+# cache) and compares a fare lookup in the matrix with one geopy geodesic solve per quote.
+#
+# Usage:
+#   python benchmarks/fare_matrix_benchmark.py
+#   python benchmarks/fare_matrix_benchmark.py --airports 12 500 3000
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from geopy.distance import geodesic as GD
+
+import fare_matrix
+
+# Returns `count` random airport locations spread over Canada
+def random_airports(count, rng):
+    latitudes = rng.uniform(42.0, 70.0, count)
+    longitudes = rng.uniform(-140.0, -52.0, count)
+    return {f"AIRPORT {i}": (float(latitudes[i]), float(longitudes[i])) for i in range(count)}
+
+# Returns the time (in seconds) taken by func, and its result
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario fare matrix benchmark")
+    parser.add_argument('--airports', type=int, nargs='+', default=[12, 500, 2000])
+    parser.add_argument('--quotes', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'airports':>9}{'cold build':>14}{'cached load':>14}{'lookup/quote':>15}{'geopy/quote':>14}")
+    for count in args.airports:
+        locations = random_airports(count, rng)
+        names = list(locations)
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cold, _ = timed(lambda: fare_matrix.FareMatrix.load(locations, cache_dir=cache_dir))
+            cached, matrix = timed(lambda: fare_matrix.FareMatrix.load(locations, cache_dir=cache_dir))
+        finally:
+            shutil.rmtree(cache_dir)
+
+        pairs = [(names[i], names[j]) for i, j in rng.integers(0, count, (args.quotes, 2))]
+        lookup, _ = timed(lambda: [matrix.fares(origin, destination) for origin, destination in pairs])
+        sample = pairs[:min(len(pairs), 2000)]
+        geodesic, _ = timed(lambda: [GD(locations[origin], locations[destination]).km for origin, destination in sample])
+
+        print(f"{count:>9}{cold:>12.3f} s{cached * 1000:>11.2f} ms"
+              f"{lookup / len(pairs) * 1e6:>12.2f} us{geodesic / len(sample) * 1e6:>11.2f} us")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Booking ledger benchmark
+# Many threads check out at the same time, each waiting until its booking is committed, against
+# one transaction (and fsync) per booking. Also times lookups by PNR and by last name.
+#
+# Usage:
+#   python benchmarks/ledger_benchmark.py
+#   python benchmarks/ledger_benchmark.py --bookings 50000 --threads 1 16 64 --dir /var/tmp
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ledger
+from ledger import BookingLedger
+
+LAST_NAMES = ["Lovelace", "Hopper", "Turing", "Liskov", "Knuth", "Dijkstra", "Hamilton", "Ritchie"]
+
+# Returns a booking record like the ones written at checkout
+def sample_booking(rng):
+    passengers = rng.randint(1, 9)
+    return {
+        "first_name": "Ada", "last_name": rng.choice(LAST_NAMES), "origin": "HAMILTON",
+        "destination": "OTTAWA", "route": ["HAMILTON", "MONTREAL", "OTTAWA"], "trip_type": 2,
+        "departure_date": "01/05/27", "return_date": None, "ticket_option": 2, "ticket_class": "Economy",
+        "package": "Connecting", "passengers": passengers, "loyalty_program": 0,
+        "bags": [[20, 150]],
+        "legs": [{"origin": "HAMILTON", "destination": "MONTREAL", "flight": "AC3412",
+                  "seats": [f"{8 + i}A" for i in range(passengers)]},
+                 {"origin": "MONTREAL", "destination": "OTTAWA", "flight": "AC3418",
+                  "seats": [f"{8 + i}C" for i in range(passengers)]}],
+        "grand_total_cents": 88377, "line_items": {"base_fare": 18838, "grand_total": 88377},
+    }
+
+# Runs `count` checkouts spread over `threads` threads; returns checkouts per second
+def run_checkouts(record, count, threads, seed):
+    per_thread = count // threads
+
+    def work(index):
+        rng = random.Random(seed + index)
+        for _ in range(per_thread):
+            record(sample_booking(rng))
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+# One transaction per booking on a shared connection (no group commit)
+def commit_each(path):
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=FULL")
+    connection.execute(ledger.SCHEMA)
+    lock = threading.Lock()
+    sequence = iter(range(1 << 62))
+
+    def record(booking):
+        row = dict(booking, pnr=f"{next(sequence):06d}", created="")
+        values = tuple(str(row.get(column)) for column in ledger.COLUMNS)
+        with lock:
+            connection.execute("BEGIN")
+            connection.execute(ledger.INSERT, values)
+            connection.execute("COMMIT")
+    return record
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario booking ledger benchmark")
+    parser.add_argument("--bookings", type=int, default=20000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--dir", help="directory of the ledger files (default: a temporary directory)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        print(f"{'threads':>8}{'group commit/s':>17}{'bookings/commit':>17}{'commit each/s':>16}")
+        for threads in args.threads:
+            booking_ledger = BookingLedger(os.path.join(directory, f"group-{threads}.db"))
+            grouped = run_checkouts(booking_ledger.record, args.bookings, threads, args.seed)
+            per_commit = booking_ledger.bookings_written / max(1, booking_ledger.commits)
+            # The baseline is much slower; a tenth of the bookings is enough to measure it
+            single = run_checkouts(commit_each(os.path.join(directory, f"each-{threads}.db")),
+                                   max(threads, args.bookings // 10), threads, args.seed)
+            print(f"{threads:>8}{grouped:>17,.0f}{per_commit:>17.1f}{single:>16,.0f}")
+            booking_ledger.close()
+
+        # Lookups, after reopening (the index is rebuilt from the file)
+        start = time.perf_counter()
+        booking_ledger = BookingLedger(os.path.join(directory, f"group-{args.threads[-1]}.db"))
+        print(f"reopened {len(booking_ledger):,} bookings in {(time.perf_counter() - start) * 1000:.1f} ms")
+        pnrs = random.Random(args.seed).sample(list(booking_ledger.by_pnr), min(1000, len(booking_ledger)))
+        start = time.perf_counter()
+        for pnr in pnrs:
+            booking_ledger.get(pnr)
+        print(f"lookup by PNR: {(time.perf_counter() - start) / len(pnrs) * 1e6:.1f} us")
+        start = time.perf_counter()
+        matches = booking_ledger.find_by_last_name("lovelace")
+        print(f"lookup by last name: {len(matches):,} bookings in {(time.perf_counter() - start) * 1000:.1f} ms")
+        booking_ledger.close()
+
+if __name__ == "__main__":
+    main()
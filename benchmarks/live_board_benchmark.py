@@ -0,0 +1,70 @@
+# Live board benchmark
+# Measures frames per second of the live board (diff-based, cursor-addressed repaint) against
+# re-rendering the whole board with color_code + tabulate fancy_grid every frame. Output is written
+# to a null sink so only the rendering cost is measured.
+#
+# Usage:
+#   python benchmarks/live_board_benchmark.py
+#   python benchmarks/live_board_benchmark.py --rows 1000 --height 50 --frames 200
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from tabulate import tabulate
+
+import air_ontario
+import flight_board
+import live_board
+
+# Returns frames per second of func over `frames` calls
+def frames_per_second(func, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    return frames / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario live board benchmark")
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--height', type=int, default=50, help="terminal height in lines")
+    parser.add_argument('--chance', type=float, default=0.02, help="chance per frame that a flight changes status")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        board = air_ontario.generate_departures_board(args.rows, rng)
+        live = live_board.LiveBoard(board, out=sink, height=args.height)
+        live.render()
+
+        # A page change every 10 frames, like a display cycling through its pages
+        frame_numbers = itertools.count(1)
+
+        def live_frame():
+            live.advance(args.chance, rng)
+            if next(frame_numbers) % 10 == 0:
+                live.scroll()
+            live.render()
+
+        # The original rendering: colour every cell, then lay out the whole table
+        def full_frame():
+            flight_board.advance_statuses(board, args.chance, rng)
+            rows = air_ontario.color_code(list(board.rows()))
+            sink.write(tabulate(rows, headers=air_ontario.bold(board.headers()), tablefmt="fancy_grid",
+                                numalign="center", stralign="center"))
+
+        live_fps = frames_per_second(live_frame, args.frames)
+        full_fps = frames_per_second(full_frame, max(1, args.frames // 20))
+
+    print(f"{args.rows} rows, {live.page_size} rows per page, {args.chance:.0%} status changes per frame")
+    print(f"live board (diff repaint): {live_fps:10,.1f} frames/s")
+    print(f"full tabulate re-render:   {full_fps:10,.1f} frames/s")
+
+if __name__ == '__main__':
+    main()
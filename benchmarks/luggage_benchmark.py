@@ -0,0 +1,82 @@
+# Bag pricing benchmark
+# Prices the bags of whole flights with luggage.price_bags() and compares the throughput with the
+# booking menu's original rules (nested prices dict, "Free" strings, branches per class and per bag).
+#
+# Usage:
+#   python benchmarks/luggage_benchmark.py
+#   python benchmarks/luggage_benchmark.py --bags 400 100000 1000000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import luggage
+
+# Prices one passenger's bags the way the booking menu originally did (with its fixed rules: bags
+# after the 3rd pay the extra price and bags over 158 cm pay the oversize penalty)
+def original_price(program, ticket_class, bags):
+    luggage_fee = luggage.LUGGAGE_PRICES[program][ticket_class]
+    luggage_cost = 0
+    for i, (weight, dimensions) in enumerate(bags):
+        if i >= 3:
+            if luggage_fee[3] != "Free":
+                luggage_cost += luggage_fee[3]
+        elif luggage_fee[i] != "Free":
+            luggage_cost += luggage_fee[i]
+        if weight > 23:
+            luggage_cost += 120
+        if dimensions > 158:
+            luggage_cost += 120
+    return luggage_cost
+
+# Returns the bags dropped for a flight: about 1.3 bags per passenger, in drop order
+def random_flight(bags, rng):
+    passengers = max(1, int(bags / 1.3))
+    return {
+        "owners": rng.integers(0, passengers, bags),
+        "weights": rng.integers(5, 33, bags),
+        "dimensions": rng.integers(50, 293, bags),
+        "loyalty_programs": rng.integers(0, 4, passengers),
+        "classes": rng.integers(0, 3, passengers),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario bag pricing benchmark")
+    parser.add_argument('--bags', type=int, nargs='+', default=[400, 100000, 1000000])
+    parser.add_argument('--loop-sample', type=int, default=100000, help="most bags priced by the original rules")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'bags':>10}{'price_bags bags/s':>20}{'original bags/s':>18}{'totals match':>14}")
+    for count in args.bags:
+        flight = random_flight(count, rng)
+        start = time.perf_counter()
+        prices = luggage.price_bags(flight["owners"], flight["weights"], flight["dimensions"],
+                                    flight["loyalty_programs"], flight["classes"])
+        batch = time.perf_counter() - start
+
+        # The original rules price one passenger at a time, on a sample of the passengers
+        owners = flight["owners"].tolist()
+        bags_by_passenger = {}
+        for owner, weight, dimensions in zip(owners, flight["weights"].tolist(), flight["dimensions"].tolist()):
+            bags_by_passenger.setdefault(owner, []).append((weight, dimensions))
+        sample, priced = [], 0
+        for owner, bags in bags_by_passenger.items():
+            if priced >= args.loop_sample:
+                break
+            sample.append(owner)
+            priced += len(bags)
+        start = time.perf_counter()
+        totals = [original_price(int(flight["loyalty_programs"][owner]), int(flight["classes"][owner]),
+                                 bags_by_passenger[owner]) for owner in sample]
+        loop = time.perf_counter() - start
+        match = bool(np.array_equal(prices.totals[sample], np.array(totals, dtype=np.int64) * 100))
+        print(f"{count:>10}{count / batch:>20,.0f}{priced / loop:>18,.0f}{str(match):>14}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# Metrics overhead benchmark
+# Times an instrumented stage (a `with metrics.timer()` block and a @metrics.timed function) with
+# metrics off and on, against the same code without instrumentation.
+#
+# Usage:
+#   python benchmarks/metrics_benchmark.py
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+def stage():
+    return None
+
+@metrics.timed("benchmark")
+def timed_stage():
+    return None
+
+def with_timer():
+    with metrics.timer("benchmark"):
+        return None
+
+# Returns the average time (in nanoseconds) of a call
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario metrics overhead benchmark")
+    parser.add_argument("--calls", type=int, default=1000000)
+    args = parser.parse_args()
+
+    baseline = per_call(stage, args.calls)
+    print(f"{'':<22}{'off ns':>10}{'on ns':>10}")
+    print(f"{'no instrumentation':<22}{baseline:>10.0f}{'':>10}")
+    for name, func in (("with metrics.timer()", with_timer), ("@metrics.timed", timed_stage)):
+        metrics.disable()
+        off = per_call(func, args.calls)
+        metrics.enable()
+        on = per_call(func, args.calls)
+        print(f"{name:<22}{off:>10.0f}{on:>10.0f}")
+    metrics.disable()
+
+if __name__ == "__main__":
+    main()
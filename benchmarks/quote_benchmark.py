@@ -0,0 +1,67 @@
+# Batch quote benchmark
+# Prices N random itineraries with quotes.quote_batch() in one pass and compares the throughput
+# with pricing them one at a time through quotes.quote().
+#
+# Usage:
+#   python benchmarks/quote_benchmark.py
+#   python benchmarks/quote_benchmark.py --itineraries 1000 100000 1000000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import air_ontario
+import quotes
+
+# Returns a table of `count` random itineraries between the service cities
+def random_itineraries(count, rng):
+    names = np.array(list(air_ontario.cities_location))
+    origins = rng.integers(0, len(names), count)
+    # Never fly to the city of origin
+    destinations = (origins + rng.integers(1, len(names), count)) % len(names)
+    bag_counts = rng.integers(0, 5, count)
+    trip_types, options = rng.integers(1, 3, count), rng.integers(1, 7, count)
+    # Connecting options (even ones) are only sold when there is a connecting route
+    graph = air_ontario.get_route_graph()
+    unrouted = np.array([[graph.route(origin, destination) is None for destination in names] for origin in names])
+    options[(options % 2 == 0) & unrouted[origins, destinations]] -= 1
+    return {
+        "origin": names[origins],
+        "destination": names[destinations],
+        "trip_type": trip_types,
+        "ticket_option": options,
+        "passengers": rng.integers(1, 10, count),
+        "loyalty_program": rng.integers(0, 4, count),
+        "bags": [list(zip(rng.integers(5, 33, bags).tolist(), rng.integers(50, 293, bags).tolist()))
+                 for bags in bag_counts],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario batch quote benchmark")
+    parser.add_argument('--itineraries', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--scalar-sample', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    fare_matrix = air_ontario.get_fare_matrix()
+
+    print(f"{'itineraries':>12}{'quote_batch quotes/s':>24}{'quote() quotes/s':>20}")
+    for count in args.itineraries:
+        table = random_itineraries(count, rng)
+        start = time.perf_counter()
+        quotes.quote_batch(table, fare_matrix)
+        batch = time.perf_counter() - start
+
+        sample = min(count, args.scalar_sample)
+        start = time.perf_counter()
+        for i in range(sample):
+            quotes.quote(*(table[column][i] for column in quotes.ITINERARY_COLUMNS), fare_matrix=fare_matrix)
+        scalar = time.perf_counter() - start
+        print(f"{count:>12}{count / batch:>24,.0f}{sample / scalar:>20,.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Board render benchmark
+# Renders a large board with every renderer (fancy tabulate table, fixed-width columns, CSV and JSON
+# lines) to a sink that only counts characters, and reports rows per second. With --memory, a second
+# pass measures the peak memory allocated while rendering (tracemalloc), which shows the streaming
+# formats never hold the whole table.
+#
+# Usage:
+#   python benchmarks/render_benchmark.py
+#   python benchmarks/render_benchmark.py --rows 100000 --renderers fixed csv jsonl --memory
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import air_ontario
+import renderers
+
+# Counts what is written to it (and drops it)
+class CountingSink:
+    def __init__(self):
+        self.characters = 0
+
+    def write(self, text):
+        self.characters += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario board render benchmark")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--renderers', nargs='+', choices=list(renderers.RENDERERS), default=list(renderers.RENDERERS))
+    parser.add_argument('--memory', action='store_true', help="also measure the peak memory of each renderer")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    board = air_ontario.generate_departures_board(args.rows, np.random.default_rng(args.seed))
+
+    print(f"{args.rows:,} rows")
+    print(f"{'renderer':>10}{'seconds':>10}{'rows/s':>14}{'MB written':>12}" + (f"{'peak MB':>10}" if args.memory else ""))
+    for name in args.renderers:
+        render = renderers.get_renderer(name)
+        sink = CountingSink()
+        start = time.perf_counter()
+        render(board, sink)
+        elapsed = time.perf_counter() - start
+        line = f"{name:>10}{elapsed:>10.2f}{args.rows / elapsed:>14,.0f}{sink.characters / 1e6:>12.1f}"
+        if args.memory:
+            tracemalloc.start()
+            render(board, CountingSink())
+            line += f"{tracemalloc.get_traced_memory()[1] / 1e6:>10.1f}"
+            tracemalloc.stop()
+        print(line)
+
+if __name__ == '__main__':
+    main()
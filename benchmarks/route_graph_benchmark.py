@@ -0,0 +1,44 @@
+# Route graph benchmark
+# Builds the route graph of N random airports and times connecting-route queries: the first query
+# of each pair (computed) and a repeated query (from the cache), with and without a leg range limit.
+#
+# Usage:
+#   python benchmarks/route_graph_benchmark.py
+#   python benchmarks/route_graph_benchmark.py --airports 12 1000 5000 --max-leg 1500
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import fare_matrix
+from fare_matrix_benchmark import random_airports, timed
+from routes import RouteGraph
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario route graph benchmark")
+    parser.add_argument('--airports', type=int, nargs='+', default=[12, 1000, 3000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--routes', type=int, default=3, help="routes returned per query")
+    parser.add_argument('--max-leg', type=float, default=1500, help="leg range limit (km) of the second run")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'airports':>9}{'max leg':>9}{'matrix s':>10}{'graph ms':>10}{'query us':>10}{'cached us':>11}")
+    for count in args.airports:
+        airports = random_airports(count, rng)
+        matrix_time, matrix = timed(lambda: fare_matrix.FareMatrix.load(airports, cache_dir=None))
+        pairs = [tuple(rng.choice(matrix.names, 2, replace=False)) for _ in range(args.queries)]
+        for max_leg in (None, args.max_leg):
+            graph_time, graph = timed(lambda: RouteGraph(matrix, max_leg_km=max_leg, cache_size=None))
+            query_time, _ = timed(lambda: [graph.find_routes(o, d, args.routes, 2) for o, d in pairs])
+            [graph.routes(o, d, args.routes) for o, d in pairs]
+            cached_time, _ = timed(lambda: [graph.routes(o, d, args.routes) for o, d in pairs])
+            print(f"{count:>9}{max_leg or '-':>9}{matrix_time:>10.2f}{graph_time * 1e3:>10.2f}"
+                  f"{query_time / len(pairs) * 1e6:>10.1f}{cached_time / len(pairs) * 1e6:>11.2f}")
+
+if __name__ == "__main__":
+    main()
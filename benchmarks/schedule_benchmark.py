@@ -0,0 +1,71 @@
+# Schedule benchmark
+# Times window queries on the schedule of a large hub (1,500 movements a day over several days)
+# against scanning the board rows, where times are "%H:%M" strings.
+#
+# Usage:
+#   python benchmarks/schedule_benchmark.py
+#   python benchmarks/schedule_benchmark.py --per-day 1500 --days 7
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import air_ontario
+
+# Returns the average time (in microseconds) of a call
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1e6, result
+
+# Scans every row of every day, like the string boards required
+def scan(days, day, start, end, terminal=None, status=None):
+    found = []
+    for row in days[day]:
+        if start <= row[3] < end and (terminal is None or row[4] == terminal) and (status is None or row[6] == status):
+            found.append(row)
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario schedule benchmark")
+    parser.add_argument('--per-day', type=int, default=1500)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    first_day = datetime(2027, 1, 5)
+    build_time, schedule = timed(lambda: air_ontario.generate_schedule(
+        "departures", first_day, days=args.days, per_day=args.per_day, rng=rng), 1)
+    print(f"{len(schedule)} movements over {schedule.days} days, built in {build_time / 1000:.1f} ms")
+
+    # The same flights as lists of display rows, one list per day
+    days = [list(schedule.view(schedule.on(first_day + timedelta(days=d))).rows()) for d in range(schedule.days)]
+    now = first_day + timedelta(days=2, hours=12)
+    queries = [
+        ("departures next 90 min from T2",
+         lambda: schedule.next(now, 90, terminal="T2"),
+         lambda: scan(days, 2, "12:00", "13:30", terminal="T2")),
+        ("delayed after 18:00",
+         lambda: schedule.window(now.replace(hour=18), now.replace(hour=0) + timedelta(days=1), status="Delayed"),
+         lambda: scan(days, 2, "18:00", "24:00", status="Delayed")),
+        ("whole day",
+         lambda: schedule.on(now),
+         lambda: scan(days, 2, "00:00", "24:00")),
+    ]
+    print(f"{'query':<34}{'rows':>6}{'schedule us':>13}{'row scan us':>13}")
+    for name, query, baseline in queries:
+        query_time, rows = timed(query, args.repeat)
+        scan_time, scanned = timed(baseline, max(1, args.repeat // 20))
+        assert len(rows) == len(scanned)
+        print(f"{name:<34}{len(rows):>6}{query_time:>13.2f}{scan_time:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Seat inventory benchmark
+# Several threads book seats on the same few flights at once (allocating single seats and blocks
+# of adjacent seats, releasing them when a flight fills up). Reports allocations per second, checks
+# that no seat was ever handed out twice, and shows the memory used per flight (measured with
+# tracemalloc: the seat map, the flight key and the dict entry).
+#
+# Usage:
+#   python benchmarks/seat_inventory_benchmark.py
+#   python benchmarks/seat_inventory_benchmark.py --threads 1 4 16 --flights 4
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seat_inventory import CABINS, SeatInventory
+
+# Books seats for `duration` seconds; returns the number of allocations made
+def worker(inventory, flights, duration, seed, owners, errors):
+    rng = random.Random(seed)
+    cabins = list(CABINS)
+    count = 0
+    end = time.perf_counter() + duration
+    mine = {}
+    while time.perf_counter() < end:
+        flight = rng.choice(flights)
+        cabin = rng.choice(cabins)
+        party = rng.choice((1, 1, 2, 3, 4))
+        seats = inventory.allocate_block(flight, cabin, party)
+        if seats is None:
+            # Cabin full: give back what this worker holds on the flight
+            held = mine.pop(flight, [])
+            for seat in held:
+                owners.pop((flight, seat), None)
+            if held:
+                inventory.release(flight, *held)
+            continue
+        for seat in seats:
+            # setdefault is atomic, so two owners of one seat would be caught here
+            if owners.setdefault((flight, seat), seed) != seed:
+                errors.append((flight, seat))
+        mine.setdefault(flight, []).extend(seats)
+        count += len(seats)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario seat inventory benchmark")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--flights", type=int, default=4, help="flights shared by all threads (contention)")
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--season", type=int, default=100000, help="flights filled to measure memory")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8}{'allocations/s':>16}{'double bookings':>18}")
+    for thread_count in args.threads:
+        inventory = SeatInventory()
+        flights = [(f"AO{3000 + i}", "01/05/27") for i in range(args.flights)]
+        owners, errors, counts = {}, [], [0] * thread_count
+
+        def run(index):
+            counts[index] = worker(inventory, flights, args.duration, index, owners, errors)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(thread_count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        print(f"{thread_count:>8}{sum(counts) / elapsed:>16,.0f}{len(errors):>18}")
+
+    # Memory: a season of flights, each half full, keyed by (flight code, date) as the booking flow does
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    inventory = SeatInventory()
+    for i in range(args.season):
+        inventory.allocate_block((f"AO{i}", "01/05/27"), "Economy", 69)
+    total_bytes = (tracemalloc.get_traced_memory()[0] - before) / args.season
+    tracemalloc.stop()
+    bitmap_bytes = sum(sys.getsizeof(taken) for taken in inventory.taken.values()) / args.season
+    print(f"memory per flight: {total_bytes:.0f} bytes, of which {bitmap_bytes:.0f} for the seat map "
+          f"({args.season:,} flights)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# Simulator benchmark
+# Times a simulated week for several network sizes and numbers of worker processes.
+#
+# Usage:
+#   python benchmarks/simulator_benchmark.py
+#   python benchmarks/simulator_benchmark.py --flights 10000 1000000 --workers 1 4 8
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simulator
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario simulator benchmark")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--flights", type=int, nargs="+", default=[10000, 100000, 1000000], help="flights per day")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'flights/day':>12}{'workers':>9}{'seconds':>9}{'flights/s':>14}{'on time':>9}")
+    for daily_flights in args.flights:
+        for workers in dict.fromkeys(args.workers):
+            start = time.perf_counter()
+            simulation = simulator.simulate(args.days, daily_flights, args.seed, workers)
+            elapsed = time.perf_counter() - start
+            print(f"{daily_flights:>12,}{workers:>9}{elapsed:>9.2f}{len(simulation) / elapsed:>14,.0f}"
+                  f"{simulation.stats()['on_time_rate']:>9.1%}")
+
+if __name__ == "__main__":
+    main()
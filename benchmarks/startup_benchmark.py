@@ -0,0 +1,101 @@
+# Startup benchmark for Air Ontario
+# Measures how long `import air_ontario` takes and how long it takes for the first board (ARRIVALS)
+# to be fully drawn when the script is launched. Pass --baseline <git revision> to run the same
+# measurements against an older revision of the whole tree for a before/after comparison.
+#
+# Usage:
+#   python benchmarks/startup_benchmark.py
+#   python benchmarks/startup_benchmark.py --baseline HEAD~1 --repeat 10
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from io import BytesIO
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The bottom border of a fancy_grid table; the first one printed closes the ARRIVALS board
+FIRST_BOARD_MARKER = '╘'
+
+# Exports the whole tree at the given revision (modules and data files) into a temporary folder
+def checkout_revision(revision, target):
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision], cwd=REPO_ROOT,
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+# Returns the cumulative import time (in seconds) of `import air_ontario`, using -X importtime
+    # Note: returns None if the import fails, so a broken tree is never reported with a time
+def measure_import(folder):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import air_ontario'],
+                            cwd=folder, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    for line in result.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == 'air_ontario':
+            return int(parts[1]) / 1e6
+    return None
+
+# Returns the time (in seconds) between launching the script and the first board being drawn
+def measure_first_board(folder):
+    env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'air_ontario.py'], cwd=folder, env=env,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, encoding='utf-8')
+    elapsed = None
+    for line in process.stdout:
+        if line.startswith(FIRST_BOARD_MARKER):
+            elapsed = time.perf_counter() - start
+            break
+    process.kill()
+    process.wait()
+    return elapsed
+
+# Runs every measurement `repeat` times and returns the medians
+def run(folder, repeat):
+    # Warm up the OS file cache so the first sample is not an outlier
+    measure_import(folder)
+    imports = [measure_import(folder) for _ in range(repeat)]
+    boards = [measure_first_board(folder) for _ in range(repeat)]
+    imports = [value for value in imports if value is not None]
+    boards = [value for value in boards if value is not None]
+    return {
+        'import': statistics.median(imports) if imports else None,
+        'first_board': statistics.median(boards) if boards else None,
+    }
+
+# Formats seconds as milliseconds, or n/a if the measurement failed
+def as_ms(value):
+    return 'n/a' if value is None else f'{value * 1000:8.1f} ms'
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario startup benchmark")
+    parser.add_argument('--baseline', help='git revision of the tree to compare against')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {'current': run(REPO_ROOT, args.repeat)}
+    if args.baseline:
+        folder = tempfile.mkdtemp()
+        try:
+            checkout_revision(args.baseline, folder)
+            results[args.baseline] = run(folder, args.repeat)
+        finally:
+            shutil.rmtree(folder)
+
+    # Note: the old script runs everything at import time (including the boards), so its import
+    # time includes drawing both boards before it stops at the first input()
+    print(f"{'version':<12}{'import air_ontario':>22}{'time to first board':>22}")
+    for name, result in results.items():
+        print(f"{name:<12}{as_ms(result['import']):>22}{as_ms(result['first_board']):>22}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+# Benchmark suite for Air Ontario
+# Times every hot path on seeded workloads (the same seed gives the same boards, itineraries and
+# bookings on every run) at several sizes, and writes the results as JSON so that two releases can
+# be compared:
+#   startup              `import air_ontario`, and launching the script until the first board is drawn
+#   board_generation     generate_departures_board(size)
+#   color_code_tabulate  color_code + tabulate fancy_grid of a board of `size` flights
+#   pricing              fares of `size` origin/destination pairs (geodesic fare matrix + connecting routes)
+#   checkout             quotes.quote_batch over `size` itineraries (fare, luggage, fees and HST)
+#   boarding_pass        BookingSession.confirm for `size` bookings (flight, seats, ledger record, pass)
+#
+# The JSON goes to stdout (or --output) and a table to stderr. With --compare, every result is
+# checked against an earlier JSON file and the exit status is 1 if one got slower than --threshold.
+#
+# Usage:
+#   python benchmarks/suite.py --output results.json
+#   python benchmarks/suite.py --sizes 12 1000 --compare results.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+import air_ontario
+import randomness
+import renderers
+import startup_benchmark
+from replay import NullSink
+
+SIZES = [12, 1000, 100000]
+CASES = ["startup", "board_generation", "color_code_tabulate", "pricing", "checkout", "boarding_pass"]
+# Version of the JSON layout
+FORMAT_VERSION = 1
+
+# -- Cases --
+# Each one prepares a seeded workload of `size` items, times the hot path only and returns seconds
+
+def startup(size, seed):
+    return startup_benchmark.measure_import(REPO_ROOT)
+
+def first_board(size, seed):
+    return startup_benchmark.measure_first_board(REPO_ROOT)
+
+def board_generation(size, seed):
+    with randomness.seeded(seed):
+        start = time.perf_counter()
+        air_ontario.generate_departures_board(size)
+        return time.perf_counter() - start
+
+# The kiosk table: rows, color_code and tabulate fancy_grid (renderers.render_fancy)
+def color_code_tabulate(size, seed):
+    with randomness.seeded(seed):
+        board = air_ontario.generate_departures_board(size)
+    start = time.perf_counter()
+    renderers.render_fancy(board, NullSink())
+    return time.perf_counter() - start
+
+# Returns `size` random origin/destination airport positions (never the same airport twice)
+def random_pairs(size, airports, rng):
+    origins = rng.integers(0, airports, size)
+    destinations = (origins + rng.integers(1, airports, size)) % airports
+    return origins, destinations
+
+def pricing(size, seed):
+    from routes import route_graph
+    fare_matrix = air_ontario.get_fare_matrix()
+    origins, destinations = random_pairs(size, len(fare_matrix), np.random.default_rng(seed))
+    start = time.perf_counter()
+    route_graph(fare_matrix).fare_table(origins, destinations)
+    return time.perf_counter() - start
+
+def checkout(size, seed):
+    import quotes
+    from quote_benchmark import random_itineraries
+    itineraries = random_itineraries(size, np.random.default_rng(seed))
+    fare_matrix = air_ontario.get_fare_matrix()
+    start = time.perf_counter()
+    quotes.quote_batch(itineraries, fare_matrix)
+    return time.perf_counter() - start
+
+def boarding_pass(size, seed):
+    import quotes
+    from booking import TICKET_PACKAGES, BookingSession
+    from ledger import BookingLedger
+    from seat_inventory import SeatInventory
+    fare_matrix = air_ontario.get_fare_matrix()
+    graph = air_ontario.get_route_graph()
+    inventory = SeatInventory()
+    rng = np.random.default_rng(seed)
+    names = fare_matrix.names
+    origins, destinations = random_pairs(size, len(fare_matrix), rng)
+    options, passengers = rng.integers(1, 7, size), rng.integers(1, 10, size)
+    line_items = quotes.quote("HAMILTON", "OTTAWA", 2, 1, 1, fare_matrix=fare_matrix)
+
+    with tempfile.TemporaryDirectory() as folder:
+        # The ledger is not what is measured here: it commits in the background, without fsync
+        ledger = BookingLedger(os.path.join(folder, "bookings.db"), synchronous="OFF")
+        sessions = []
+        for origin, destination, option, count in zip(origins.tolist(), destinations.tolist(), options.tolist(),
+                                                      passengers.tolist()):
+            session = BookingSession(fare_matrix, seat_inventory=inventory, ledger=ledger)
+            session.first_name, session.last_name = "Ada", "Lovelace"
+            session.origin, session.destination = names[origin], names[destination]
+            session.route = graph.route(session.origin, session.destination)
+            if TICKET_PACKAGES[option - 1] == "Connecting" and session.route is None:
+                option -= 1
+            session.trip_type, session.departure_date = quotes.ONE_WAY, "01/05/27"
+            session.ticket_option, session.passenger_count, session.program_choice = option, count, 0
+            session.line_items = line_items
+            sessions.append(session)
+
+        with randomness.seeded(seed):
+            start = time.perf_counter()
+            for session in sessions:
+                session.confirm()
+            elapsed = time.perf_counter() - start
+        ledger.close()
+    return elapsed
+
+# Case name -> (function, whether it runs at every size)
+RUNNERS = {
+    "startup": [("import", startup, False), ("first_board", first_board, False)],
+    "board_generation": [("board_generation", board_generation, True)],
+    "color_code_tabulate": [("color_code_tabulate", color_code_tabulate, True)],
+    "pricing": [("pricing", pricing, True)],
+    "checkout": [("checkout", checkout, True)],
+    "boarding_pass": [("boarding_pass", boarding_pass, True)],
+}
+
+# Runs a case up to `repeat` times (fewer once `budget` seconds are spent); returns its result
+def measure(name, function, size, seed, repeat, budget):
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat and (not samples or time.perf_counter() - started < budget):
+        seconds = function(size, seed)
+        if seconds is not None:
+            samples.append(seconds)
+    if not samples:
+        return {"name": name, "size": size, "repeats": 0}
+    median = statistics.median(samples)
+    result = {"name": name, "size": size, "repeats": len(samples), "min_s": min(samples),
+              "median_s": median, "mean_s": statistics.fmean(samples)}
+    if size:
+        result["items_per_s"] = size / median if median else None
+    return result
+
+# Returns the git revision of the tree (or None outside a git checkout)
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Returns the results of `current` that are slower than in `baseline` by more than `threshold`,
+# as (result, baseline median, ratio)
+def regressions(current, baseline, threshold):
+    previous = {(result["name"], result["size"]): result for result in baseline["results"]}
+    slower = []
+    for result in current["results"]:
+        before = previous.get((result["name"], result["size"]))
+        if before and before.get("median_s") and result.get("median_s"):
+            ratio = result["median_s"] / before["median_s"]
+            if ratio > 1 + threshold:
+                slower.append((result, before["median_s"], ratio))
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="Air Ontario benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="flights (or itineraries) per case")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--repeat", type=int, default=5, help="most runs of each case and size")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds after which a case is not repeated")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown reported as a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+    # The script launched by the startup case draws the same boards on every run
+    os.environ["AIR_ONTARIO_SEED"] = str(args.seed)
+
+    results = []
+    print(f"{'case':<22}{'size':>8}{'runs':>6}{'median':>12}{'items/s':>14}", file=sys.stderr)
+    for case in args.cases:
+        for name, function, sized in RUNNERS[case]:
+            for size in (args.sizes if sized else [None]):
+                result = measure(name, function, size, args.seed, args.repeat, args.budget)
+                results.append(result)
+                median = f"{result['median_s'] * 1000:.3f} ms" if result.get("median_s") is not None else "n/a"
+                rate = f"{result['items_per_s']:,.0f}" if result.get("items_per_s") else ""
+                print(f"{name:<22}{size or '':>8}{result['repeats']:>6}{median:>12}{rate:>14}", file=sys.stderr)
+
+    report = {
+        "format_version": FORMAT_VERSION,
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text)
+
+    if args.compare:
+        with open(args.compare) as file:
+            slower = regressions(report, json.load(file), args.threshold)
+        for result, before, ratio in slower:
+            print(f"REGRESSION {result['name']} size={result['size']}: {before * 1000:.3f} ms -> "
+                  f"{result['median_s'] * 1000:.3f} ms ({ratio:.2f}x)", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
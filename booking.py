@@ -0,0 +1,514 @@
+# Booking session state machine for Air Ontario
+# The booking flow (name -> trip type -> cities -> dates -> quote -> package -> passengers ->
+# loyalty -> bags -> checkout -> boarding pass) as an explicit state machine. A session never
+# blocks on input(): it is fed one answer at a time and returns the text to show next, ending
+# with the next prompt. The same session drives the console (air_ontario.book_flight) and the
+# asyncio booking server (booking_server.py).
+from datetime import datetime
+from functools import lru_cache
+
+import air_ontario
+import luggage
+import metrics
+import quotes
+import routes
+from air_ontario import color, horizontal_line_text, line_title_text
+from money import format_cents
+from seat_inventory import format_seats
+
+# States of a session
+FIRST_NAME = "first_name"
+LAST_NAME = "last_name"
+TRIP_TYPE = "trip_type"
+ORIGIN = "origin"
+DESTINATION = "destination"
+DEPARTURE_DATE = "departure_date"
+RETURN_DATE = "return_date"
+DECISION = "decision"
+PACKAGE = "package"
+PASSENGERS = "passengers"
+LOYALTY = "loyalty"
+BAG_COUNT = "bag_count"
+BAG_WEIGHT = "bag_weight"
+BAG_DIMENSIONS = "bag_dimensions"
+CHECKOUT = "checkout"
+DONE = "done"
+
+ROUND_TRIP = quotes.ROUND_TRIP
+# Flights tried before giving up when the chosen cabin is full
+MAX_FLIGHT_ATTEMPTS = 20
+
+# Classes and packages of each ticket option (option 1 is index 0)
+TICKET_CLASSES = ["Economy", "Economy", "Business", "Business", "First", "First"]
+TICKET_PACKAGES = ["Direct", "Connecting", "Direct", "Connecting", "Direct", "Connecting"]
+
+# Raised when no flight has enough free seats in the chosen cabin for the whole party
+class NoSeatsError(RuntimeError):
+    pass
+
+# Returns the "Safe journey !" banner (rendering a figlet font is slow, so it is only done once)
+@lru_cache(maxsize=None)
+def safe_journey_banner():
+    import pyfiglet
+    return pyfiglet.Figlet(font="slant", width=100).renderText("Safe journey !")
+
+# One customer's booking, fed one answer at a time
+class BookingSession:
+    def __init__(self, fare_matrix=None, now=None, seat_inventory=None, ledger=None):
+        self.fare_matrix = fare_matrix if fare_matrix is not None else air_ontario.get_fare_matrix()
+        self.route_graph = routes.route_graph(self.fare_matrix)
+        self.seat_inventory = seat_inventory if seat_inventory is not None else air_ontario.get_seat_inventory()
+        self.ledger = ledger if ledger is not None else air_ontario.get_ledger()
+        # Returns the current time; used to validate dates
+        self.now = now or datetime.now
+        self.state = FIRST_NAME
+        self.prompt = ""
+        # Number of answers that were rejected and asked again
+        self.reprompts = 0
+        # Answers given so far
+        self.first_name = self.last_name = None
+        self.trip_type = self.origin = self.destination = None
+        self.departure_date = self.return_date = None
+        self.ticket_option = self.passenger_count = self.program_choice = None
+        # Shortest connecting route between the chosen cities (None if there is none)
+        self.route = None
+        self.luggage_count = 0
+        self.bags = []
+        self.pending_weight = None
+        self.line_items = None
+        # One (flight code, seat labels) pair and one boarding pass per leg of the route
+        self.flights = None
+        self.boarding_passes = None
+        # Record locator of the confirmed booking, and a future that is done once it is on disk
+        self.pnr = self.saved = None
+        # Error that stopped a confirmed booking (no free seats, or the ledger could not save it)
+        self.error = None
+        self.output = []
+
+    @property
+    def done(self):
+        return self.state == DONE
+
+    @property
+    def ticket_class(self):
+        return TICKET_CLASSES[self.ticket_option - 1]
+
+    @property
+    def package(self):
+        return TICKET_PACKAGES[self.ticket_option - 1]
+
+    # Returns the stops of the chosen package, e.g. ["HAMILTON", "MONTREAL", "OTTAWA"]
+    @property
+    def stops(self):
+        if self.package == "Connecting":
+            return list(self.route.stops)
+        return [self.origin, self.destination]
+
+    # Returns the legs of the chosen package, as (from, to) pairs of airports
+    @property
+    def legs(self):
+        stops = self.stops
+        return list(zip(stops, stops[1:]))
+
+    # Adds a line of text to the output (like print)
+    def emit(self, text=""):
+        self.output.append(f"{text}\n")
+
+    # Returns the pending output followed by the prompt, and clears the output
+    def flush(self):
+        text = "".join(self.output) + self.prompt
+        self.output = []
+        return text
+
+    # Moves to a state and sets the prompt to show for it
+    def ask(self, state, prompt):
+        self.state = state
+        self.prompt = prompt
+
+    # Returns the output that starts the session (the booking header and the first prompt)
+    def start(self):
+        metrics.count("bookings_started")
+        self.emit()
+        self.emit(horizontal_line_text())
+        self.emit(line_title_text("Book your flight"))
+        self.emit(horizontal_line_text())
+        self.ask(FIRST_NAME, "\nWhat is your first name? ")
+        return self.flush()
+
+    # Feeds one answer to the session and returns the text to show next
+    def feed(self, answer):
+        if self.done:
+            raise RuntimeError("The booking session is already finished")
+        getattr(self, f"answer_{self.state}")(answer)
+        return self.flush()
+
+    # Checks an answer with one of the air_ontario check_* functions; on error, asks again
+    def check(self, check, answer, *args, **kwargs):
+        value, error = check(answer, *args, **kwargs)
+        if error is not None:
+            self.emit(error)
+            self.reprompts += 1
+            metrics.count("reprompts", check=check.__name__)
+        return value, error
+
+    # -- Answers --
+
+    def answer_first_name(self, answer):
+        self.first_name = answer
+        self.ask(LAST_NAME, "\nWhat is your last name? ")
+
+    def answer_last_name(self, answer):
+        self.last_name = answer
+        # Retrieves type of trip
+        self.emit("\nWhich type of trip would you like?")
+        self.emit("\n 1. Round Trip\n 2. One-way")
+        self.ask(TRIP_TYPE, "\nPlease type 1 or 2: ")
+
+    def answer_trip_type(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 1, 2)
+        if error is None:
+            self.trip_type = value
+            self.show_menu()
+
+    def answer_origin(self, answer):
+        value, error = self.check(air_ontario.check_city, answer)
+        if error is None:
+            self.origin = value
+            self.ask(DESTINATION, "\nWhere are you headed to? ")
+
+    def answer_destination(self, answer):
+        value, error = self.check(air_ontario.check_city, answer, duplicate=self.origin)
+        if error is None:
+            self.destination = value
+            self.ask(DEPARTURE_DATE, "\nWhen would you like to depart? (MM/DD/YY): ")
+
+    def answer_departure_date(self, answer):
+        value, error = self.check(air_ontario.check_date, answer, now=self.now())
+        if error is None:
+            self.departure_date = value
+            if self.trip_type == ROUND_TRIP:
+                self.ask(RETURN_DATE, "\nWhen would you like to return? (MM/DD/YY): ")
+            else:
+                self.show_quote()
+
+    def answer_return_date(self, answer):
+        starting_date = datetime.strptime(self.departure_date, '%m/%d/%y')
+        value, error = self.check(air_ontario.check_date, answer, starting_date=starting_date, now=self.now())
+        if error is None:
+            self.return_date = value
+            self.show_quote()
+
+    def answer_decision(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 1, 2)
+        if error is None:
+            if value == 1:
+                self.show_packages()
+            else:
+                self.show_menu()
+
+    def answer_package(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 1, 6)
+        if error is None and TICKET_PACKAGES[value - 1] == "Connecting" and self.route is None:
+            self.emit(color.RED + "There is no connecting flight for this trip, please choose a direct package." + color.END)
+            self.reprompts += 1
+            metrics.count("reprompts", check="connecting_route")
+        elif error is None:
+            self.ticket_option = value
+            self.ask(PASSENGERS, "\nHow many passengers are boarding this trip? ")
+
+    def answer_passengers(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 1, 9)
+        if error is None:
+            self.passenger_count = value
+            self.show_loyalty_programs()
+
+    def answer_loyalty(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 0, 3)
+        if error is None:
+            self.program_choice = value
+            self.show_luggage_prices()
+
+    def answer_bag_count(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 0, 9)
+        if error is None:
+            self.luggage_count = value
+            self.bags = []
+            self.show_luggage_rules()
+            self.next_bag()
+
+    def answer_bag_weight(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 5, 32)
+        if error is None:
+            self.pending_weight = value
+            self.ask(BAG_DIMENSIONS, f"\nLuggage {len(self.bags) + 1} dimensions (cm): ")
+
+    def answer_bag_dimensions(self, answer):
+        value, error = self.check(air_ontario.check_option, answer, 50, 292)
+        if error is None:
+            self.bags.append((self.pending_weight, value))
+            self.emit()
+            self.next_bag()
+
+    def answer_checkout(self, answer):
+        value, error = self.check(air_ontario.check_Y_N, answer)
+        if error is None:
+            # Proceed with checkout if yes, otherwise back to the booking menu
+            if value == 'Y':
+                self.confirm()
+            else:
+                self.show_menu()
+
+    # -- Screens --
+
+    # Shows the service cities and the booking menu
+    def show_menu(self):
+        self.emit(horizontal_line_text())
+        self.emit("\nNote that currently, Air Ontario only operates from the following cities:\n")
+        cities = air_ontario.valid_service_cities
+        self.emit(", ".join(cities[:6]) + ", ")
+        self.emit(", ".join(cities[6:]) + ", ")
+        self.emit()
+        self.emit(line_title_text("BOOKING MENU"))
+        self.ask(ORIGIN, "\nWhere are you headed from? ")
+
+    # Shows the price of every package for the chosen cities
+    @metrics.timed("quoting")
+    def show_quote(self):
+        from tabulate import tabulate
+
+        # Economy/business/first, direct and connecting, in the order of the package menu
+            # Note: connecting fares are priced on the shortest connecting route (see routes.py)
+        self.route = self.route_graph.route(self.origin, self.destination)
+        fares = self.route_graph.fares(self.origin, self.destination)
+        if self.trip_type == ROUND_TRIP:
+            # Since it's a roundtrip, assuming simplest scenario, price stays the same
+            fares = [fare * 2 if fare != routes.NO_FARE else fare for fare in fares]
+            self.emit()
+            self.emit(horizontal_line_text())
+            self.emit(f'\nFor a round trip from {self.origin} to {self.destination}:')
+        else:
+            self.emit("\n")
+            self.emit(horizontal_line_text())
+            self.emit(f'For a oneway trip from {self.origin} to {self.destination}:')
+        connecting = "Connecting"
+        if self.route is not None:
+            connecting = f"Connecting via {', '.join(self.route.via)}"
+        flight_pricing_information = [
+            [self.origin, connecting if package == "Connecting" else package, self.destination, ticket_class,
+             "Unavailable" if fare == routes.NO_FARE else format_cents(fare)]
+            for package, ticket_class, fare in zip(TICKET_PACKAGES, TICKET_CLASSES, fares)]
+        # Note: number parsing is off, so the amounts are printed exactly as format_cents wrote them
+        self.emit(tabulate(flight_pricing_information,
+                           headers=["Origin", "Type of Stop", "Destination", "Class", "Total Cost"],
+                           tablefmt="fancy_grid", stralign="center", disable_numparse=True))
+
+        self.emit("Select one of the options below:")
+        self.emit("\n 1. Purchase ticket\n 2. Return to Menu")
+        self.ask(DECISION, "\nPlease type 1 or 2: ")
+
+    # Shows the package menu
+    def show_packages(self):
+        self.emit()
+        self.emit(line_title_text("Select Package"))
+        self.emit("\nWhich package would you like to select? ")
+        self.emit("\n 1. Economy class, direct")
+        self.emit(" 2. Economy class, Connecting")
+        self.emit(" 3. Business class, direct")
+        self.emit(" 4. Business class, Connecting")
+        self.emit(" 5. First class, direct")
+        self.emit(" 6. First class, Connecting")
+        self.ask(PACKAGE, "\nSelect a number from 1 to 6: ")
+
+    # Shows the baggage checking section and the rewards programs
+    def show_loyalty_programs(self):
+        self.emit()
+        self.emit(line_title_text("Baggage Checking"))
+        self.emit("\nNote: Certain restrictions on carry-on luggages apply, click below for more information: ")
+        self.emit("https://www.aircanada.com/ca/en/aco/home/plan/baggage/carry-on.html ")
+        self.emit("\nList of Rewards programs: Being a rewards program gives you benefits on pricing!")
+        self.emit(" 1. Bronze Loyalty Program")
+        self.emit(" 2. Silver Loyalty Program")
+        self.emit(" 3. Gold Loyalty Program")
+        self.ask(LOYALTY, "\nAre you a part of any of the programs listed above? If not, enter 0: ")
+
+    # Shows the luggage prices for the chosen program and class
+    @metrics.timed("luggage_menu")
+    def show_luggage_prices(self):
+        from tabulate import tabulate
+        luggage_fee = luggage.LUGGAGE_PRICES[self.program_choice][(self.ticket_option - 1) // 2]
+        luggage_price = [
+            ["1st bag", f"${luggage_fee[0]}"],
+            ["2nd bag", f"${luggage_fee[1]}"],
+            ["3rd bag", f"${luggage_fee[2]}"],
+            ["Extra bags", f"${luggage_fee[3]}"]
+        ]
+        self.emit()
+        self.emit(tabulate(luggage_price, ["Luggage", "Price"], tablefmt="fancy_grid", numalign="center", stralign="center"))
+        self.ask(BAG_COUNT, "\nHow many bags are you planning to check in? ")
+
+    # Shows the restrictions for luggages + associated costs
+    def show_luggage_rules(self):
+        self.emit()
+        self.emit(line_title_text("Luggage Verification"))
+        self.emit("\nNote, that the max weight per bag is 23kg (50lbs) & max size limit is 158cm (62in).")
+        self.emit("\nIf the bag exceeds the weight by up to 32kg (70lbs) and/or exceeds the max height \nby up to 292cm (115in), a $120 fee will be charged for each penalty on top of the \noriginal cost. Any heavier than this, and the bag will not be allowed on board.\n")
+        self.emit(horizontal_line_text())
+
+    # Asks for the next bag, or shows the checkout once every bag is known
+    def next_bag(self):
+        if len(self.bags) < self.luggage_count:
+            self.ask(BAG_WEIGHT, f"\nLuggage {len(self.bags) + 1} weight (kg): ")
+        else:
+            self.show_checkout()
+
+    # Shows the cost of the flight (grand total)
+    @metrics.timed("checkout")
+    def show_checkout(self):
+        from tabulate import tabulate
+        self.line_items = line_items = quotes.quote(
+            self.origin, self.destination, self.trip_type, self.ticket_option, self.passenger_count,
+            self.program_choice, self.bags, fare_matrix=self.fare_matrix)
+
+        # Amounts are in cents; they are only turned into text here
+        # Change appearance of luggage in table
+        luggage_cost = "None!" if line_items["luggage"] == 0 else format_cents(line_items["luggage"])
+        checkout_table = [
+            [f"Base Fare - {self.passenger_count} passengers", format_cents(line_items["base_fare"])],
+            ["Luggage Cost", luggage_cost],
+            ["Carrier surcharges", format_cents(line_items["carrier_surcharges"])],
+            ["Aviation Security Fee", format_cents(line_items["security_fee"])],
+            ["Harmonized Sales Tax (HST)", format_cents(line_items["hst"])],
+            ["Passenger Service fee", format_cents(line_items["passenger_service_fee"])],
+            ["Airport Improvement Fee", format_cents(line_items["airport_improvement_fee"])],
+            ["User Development Fee", format_cents(line_items["user_development_fee"])],
+            ["Grand total", format_cents(line_items["grand_total"])]
+        ]
+        self.emit(line_title_text("CHECKOUT"))
+        self.emit(tabulate(checkout_table, tablefmt="fancy_grid", colalign=("left", "center"), disable_numparse=True))
+        self.ask(CHECKOUT, "Would you like to checkout? If not, you will be taken back to the booking menu (Y/N): ")
+
+    # Picks a flight and takes adjacent seats for every passenger; returns (flight code, seat labels)
+        # exclude: flight codes that may not be picked (the other legs of the route)
+    def assign_flight(self, attempts=MAX_FLIGHT_ATTEMPTS, exclude=()):
+        for _ in range(attempts):
+            flight_code = air_ontario.random_airline_code_generator()
+            if flight_code in exclude:
+                continue
+            seats = self.seat_inventory.allocate_block((flight_code, self.departure_date), self.ticket_class,
+                                                       self.passenger_count)
+            if seats is not None:
+                return flight_code, seats
+        raise NoSeatsError(f"No flight with {self.passenger_count} free {self.ticket_class} seats")
+
+    # Assigns a flight and seats for every leg; returns a list of (flight code, seat labels)
+        # Note: if a leg cannot be seated, the seats already taken for the other legs are given back
+    def assign_flights(self):
+        flights = []
+        try:
+            for _ in self.legs:
+                flights.append(self.assign_flight(exclude={flight_code for flight_code, _ in flights}))
+        except NoSeatsError:
+            self.release_seats(flights)
+            raise
+        return flights
+
+    # Gives back the seats of a list of (flight code, seat labels)
+    def release_seats(self, flights):
+        for flight_code, seats in flights:
+            self.seat_inventory.release((flight_code, self.departure_date), *seats)
+
+    # Returns the confirmed booking as a ledger record
+    def booking_record(self):
+        return {
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "origin": self.origin,
+            "destination": self.destination,
+            "route": self.stops,
+            "trip_type": self.trip_type,
+            "departure_date": self.departure_date,
+            "return_date": self.return_date,
+            "ticket_option": self.ticket_option,
+            "ticket_class": self.ticket_class,
+            "package": self.package,
+            "passengers": self.passenger_count,
+            "loyalty_program": self.program_choice,
+            "bags": self.bags,
+            "legs": [{"origin": boarding_pass["origin"], "destination": boarding_pass["destination"],
+                      "flight": flight_code, "seats": seats}
+                     for boarding_pass, (flight_code, seats) in zip(self.boarding_passes, self.flights)],
+            "grand_total_cents": self.line_items["grand_total"],
+            "line_items": self.line_items,
+        }
+
+    # Called when the ledger could not save the booking: frees the party's seats and returns the text
+    # to show instead of the boarding pass
+    def save_failed(self, error):
+        self.release_seats(self.flights)
+        self.error = error
+        self.pnr = None
+        metrics.count("bookings_failed")
+        return ("\n" + color.RED + "Sorry, your booking could not be saved and you have not been charged. "
+                "Please try again." + color.END + "\n")
+
+    # Confirms the booking and shows the boarding pass
+    @metrics.timed("boarding_pass")
+    def confirm(self):
+        from tabulate import tabulate
+        self.emit(horizontal_line_text())
+
+        # Assign a random airplane per leg with enough free seats in the chosen class, seating the party together
+        try:
+            self.flights = self.assign_flights()
+        except NoSeatsError as error:
+            self.error = error
+            metrics.count("bookings_failed")
+            self.emit("\n" + color.RED + f"Sorry, there are no flights left with {self.passenger_count} free "
+                      f"{self.ticket_class} seats. You have not been charged." + color.END)
+            self.ask(DONE, "")
+            return
+
+        if self.trip_type == ROUND_TRIP:
+            self.emit(color.GREEN + "\nCongratulations!" + color.END + f"You have booked your flight. It is scheduled to depart at {self.departure_date} and return at {self.return_date}!")
+        else:
+            self.emit(color.GREEN + "\nCongratulations!" + color.END + f"You have booked your flight. It is scheduled to depart at {self.departure_date}!")
+
+        # -- Create the Boarding Passes --
+        registry = air_ontario.get_airline_registry()
+        # ETD and ETA of every leg, in order, so that each leg leaves after the previous one lands
+        times = iter(sorted(air_ontario.random_time_generator() for _ in range(2 * len(self.flights))))
+        self.boarding_passes = [{
+            "origin": leg_origin,
+            "destination": leg_destination,
+            "flight": flight_code,
+            "airline": registry.for_flight(flight_code).name,
+            "terminal": air_ontario.random_terminal_generator(),
+            "etd": next(times),
+            "eta": next(times),
+            "gate": air_ontario.random_gate_generator(),
+            "seat": format_seats(seats),
+        } for (leg_origin, leg_destination), (flight_code, seats) in zip(self.legs, self.flights)]
+
+        # Save the booking; the reference can be shown right away, the ledger writes it in the background
+        self.pnr, self.saved = self.ledger.append(self.booking_record())
+        self.emit(f"Your booking reference is {color.BOLD}{self.pnr}{color.END}.")
+
+        # Organize each boarding pass information with a header & then display
+        package = self.package
+        if package == "Connecting":
+            package = f"Connecting via {', '.join(self.stops[1:-1])}"
+        self.emit()
+        self.emit(line_title_text("Boarding Pass"))
+        for number, boarding_pass in enumerate(self.boarding_passes, 1):
+            boarding_pass_info = [
+                [f"{self.first_name} {self.last_name}", f"Flight {boarding_pass['flight']}", f"Terminal {boarding_pass['terminal']}"],
+                [f"ETD > {boarding_pass['etd']}", f"ETA > {boarding_pass['eta']}", f"Gate {boarding_pass['gate']}"],
+                [f"Leaving {boarding_pass['origin']}", f"Arriving {boarding_pass['destination']}", f"Seat No. {boarding_pass['seat']}"],
+                [boarding_pass["airline"], "----------->", "||!!||!|||!|"]
+            ]
+            title = "Boarding Pass" if len(self.boarding_passes) == 1 else f"Boarding Pass {number}/{len(self.boarding_passes)}"
+            boarding_pass_headers = [title, f"{self.ticket_class} class", package]
+            self.emit('\n' + tabulate(boarding_pass_info, headers=boarding_pass_headers, tablefmt="rst") + '\n')
+        self.emit(safe_journey_banner())
+        self.ask(DONE, "")
+        metrics.count("bookings_completed")
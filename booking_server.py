@@ -0,0 +1,145 @@
+# Asyncio booking server for Air Ontario
+# Serves the booking flow over a line-based TCP protocol, one BookingSession per connection, so a
+# single process can hold thousands of concurrent bookings. The client sends one answer per line;
+# the server replies with the text the console would show (ending with the next prompt) followed
+# by a NUL byte, so that scripted clients know where each reply ends. Terminals ignore the NUL,
+# so `nc localhost 8787` works for a person too.
+#
+# Usage:
+#   python booking_server.py --port 8787
+import argparse
+import asyncio
+import sqlite3
+import time
+
+import air_ontario
+import metrics
+from booking import BookingSession
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+END_OF_REPLY = b"\0"
+# Seconds a session may wait for the next answer, and seconds a whole booking may take
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_SESSION_TIMEOUT = 1800
+# Longest answer accepted (bytes)
+MAX_LINE = 1024
+
+# Serves booking sessions on a TCP socket
+class BookingServer:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 session_timeout=DEFAULT_SESSION_TIMEOUT, fare_matrix=None, ledger=None):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.session_timeout = session_timeout
+        # Loaded once and shared (read-only) by every session
+        self.fare_matrix = fare_matrix if fare_matrix is not None else air_ontario.get_fare_matrix()
+        # Confirmed bookings of every session, written by the ledger's group-commit thread
+        self.ledger = ledger if ledger is not None else air_ontario.get_ledger()
+        self.server = None
+        # Counters
+        self.active_sessions = 0
+        self.completed_sessions = 0
+        self.timed_out_sessions = 0
+        self.failed_sessions = 0
+
+    # Sends one reply
+    async def reply(self, writer, text):
+        writer.write(text.encode("utf-8") + END_OF_REPLY)
+        await writer.drain()
+
+    # Runs one booking session on a connection
+    async def handle(self, reader, writer):
+        self.active_sessions += 1
+        session = BookingSession(fare_matrix=self.fare_matrix, ledger=self.ledger)
+        deadline = time.monotonic() + self.session_timeout
+        try:
+            await self.reply(writer, session.start())
+            while not session.done:
+                timeout = min(self.idle_timeout, deadline - time.monotonic())
+                try:
+                    line = await asyncio.wait_for(reader.readline(), timeout=max(timeout, 0))
+                except asyncio.TimeoutError:
+                    self.timed_out_sessions += 1
+                    await self.reply(writer, "\n" + air_ontario.color.RED + "Your session has timed out." + air_ontario.color.END + "\n")
+                    return
+                if not line:
+                    # The client went away
+                    return
+                answer = line[:MAX_LINE].decode("utf-8", errors="replace").rstrip("\r\n")
+                with metrics.timer("session_step"):
+                    output = session.feed(answer)
+                if session.done and session.error is not None:
+                    # No flight had enough free seats: the session ends with the error
+                    self.failed_sessions += 1
+                    await self.reply(writer, output)
+                    return
+                if session.done:
+                    # The boarding pass is sent once the booking is on disk
+                    try:
+                        await asyncio.wrap_future(session.saved)
+                    except sqlite3.Error as error:
+                        self.failed_sessions += 1
+                        await self.reply(writer, session.save_failed(error))
+                        return
+                await self.reply(writer, output)
+            self.completed_sessions += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    # Starts listening; returns the asyncio server
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_LINE * 4,
+                                                 backlog=4096)
+        # Port 0 picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    # Serves until cancelled
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Air Ontario booking server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help="seconds a session may wait for the next answer")
+    parser.add_argument("--session-timeout", type=float, default=DEFAULT_SESSION_TIMEOUT,
+                        help="seconds a whole booking may take")
+    parser.add_argument("--ledger", help="booking ledger file (default: $AIR_ONTARIO_LEDGER or ~/.local/share/air_ontario/bookings.db)")
+    parser.add_argument("--metrics", choices=metrics.FORMATS, help="print stage timings and counters at exit")
+    parser.add_argument("--metrics-file", help="write the metrics to this file instead of stderr")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable(args.metrics, args.metrics_file)
+    ledger = None
+    if args.ledger:
+        from ledger import BookingLedger
+        ledger = BookingLedger(args.ledger)
+    server = BookingServer(args.host, args.port, args.idle_timeout, args.session_timeout, ledger=ledger)
+
+    async def run():
+        await server.start()
+        print(f"Air Ontario booking server listening on {server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
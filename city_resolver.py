@@ -0,0 +1,151 @@
+# City and airport resolver for Air Ontario
+# Resolves what a customer types ("ottawa", "YOW", "Prince Edward Island", "Thunderbay", "Vancuover")
+# to a canonical airport ID (the key of the airport in the fare matrix, e.g. "OTTAWA"). The index is
+# built once from the city table:
+#   - every name, IATA code and alias is normalized (case, accents, punctuation, spacing) and stored
+#     in a dict, with a spaceless spelling as well ("thunderbay"), so an exact answer is one lookup;
+#   - the same keys are kept sorted, so prefix autocomplete is a binary search and a slice;
+#   - fuzzy matching uses a deletion index (every key with up to MAX_EDITS characters removed): a
+#     query only looks up its own deletions, and only the few keys found there are checked with a
+#     bounded edit distance. The cost of a query does not grow with the number of airports.
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+
+Airport = namedtuple("Airport", ["id", "name", "iata"])
+
+# Most edits (insertions, deletions, substitutions, swaps of two neighbours) a fuzzy match may need
+MAX_EDITS = 2
+# Keys shorter than this are only matched exactly (a one-letter typo in a 3-letter code is another code)
+MIN_FUZZY_LENGTH = 4
+
+# Returns the normalized spelling of a name: lowercase, without accents or punctuation, single spaces
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    # "P.E.I." -> "pei", "St. John's" -> "st johns", "Thunder-Bay" -> "thunder bay"
+    text = text.replace(".", "").replace("'", "")
+    return " ".join("".join(char if char.isalnum() else " " for char in text).split())
+
+# Returns the edits allowed for a fuzzy match of a normalized query
+def allowed_edits(text):
+    if len(text) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(text) < 8 else MAX_EDITS
+
+# Returns every string obtained by removing up to `edits` characters from text (text included)
+def deletions(text, edits):
+    result = {text}
+    level = {text}
+    for _ in range(edits):
+        level = {word[:i] + word[i + 1:] for word in level if len(word) > 1 for i in range(len(word))}
+        result |= level
+    return result
+
+# Returns the edit distance (with swaps of neighbouring characters) between a and b, or limit + 1
+# as soon as it is known to be larger than limit
+    # Note: only the cells within `limit` of the diagonal can be within the limit, so only those are computed
+def edit_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous_previous = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous_previous, previous = previous, current
+    return min(previous[-1], over)
+
+# An index of airports by name, IATA code and alias
+class CityResolver:
+    # airports: Airport tuples; aliases: airport ID -> other names of the airport
+    def __init__(self, airports, aliases=None):
+        self.airports = tuple(airports)
+        self.by_id = {airport.id: airport for airport in self.airports}
+        self.by_iata = {airport.iata.upper(): airport for airport in self.airports if airport.iata}
+        aliases = aliases or {}
+
+        # Key -> airport; names and aliases come first, so they win over an IATA code spelled the same
+        self.exact = {}
+        for airport in self.airports:
+            for name in [airport.name, airport.id] + list(aliases.get(airport.id, ())):
+                key = normalize(name)
+                self.exact.setdefault(key, airport)
+                self.exact.setdefault(key.replace(" ", ""), airport)
+        for airport in self.airports:
+            if airport.iata:
+                self.exact.setdefault(normalize(airport.iata), airport)
+        self.exact.pop("", None)
+
+        # Sorted keys, for prefix search
+        self.keys = sorted(self.exact)
+        # Deletion index: deletion -> keys it comes from
+        self.deletion_index = {}
+        for key in self.keys:
+            if len(key) >= MIN_FUZZY_LENGTH:
+                for deletion in deletions(key, MAX_EDITS):
+                    self.deletion_index.setdefault(deletion, []).append(key)
+
+    def __len__(self):
+        return len(self.airports)
+
+    def __contains__(self, text):
+        return self.resolve(text) is not None
+
+    # Returns the airports whose name, code or alias starts with what was typed (at most `limit`),
+    # by name
+    def complete(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = {}
+        # Every key starting with the prefix sorts between the prefix and the prefix followed by the
+        # largest character
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+        for key in self.keys[start:end]:
+            airport = self.exact[key]
+            found[airport.id] = airport
+        return sorted(found.values(), key=lambda airport: airport.name)[:limit]
+
+    # Returns (edits, airport) pairs for the airports within the allowed edits of what was typed,
+    # closest first (at most `limit`)
+    def suggest(self, text, limit=5):
+        query = normalize(text)
+        if query in self.exact:
+            return [(0, self.exact[query])]
+        edits = allowed_edits(query)
+        if edits == 0:
+            return []
+        candidates = set()
+        for deletion in deletions(query, edits):
+            candidates.update(self.deletion_index.get(deletion, ()))
+        best = {}
+        for key in candidates:
+            distance = edit_distance(query, key, edits)
+            airport = self.exact[key]
+            if distance <= edits and distance < best.get(airport.id, (edits + 1,))[0]:
+                best[airport.id] = (distance, airport)
+        return sorted(best.values(), key=lambda match: (match[0], match[1].name))[:limit]
+
+    # Returns the airport meant by what was typed, or None if there is none or several are as close
+    def resolve(self, text):
+        airport = self.exact.get(normalize(text))
+        if airport is not None:
+            return airport
+        matches = self.suggest(text, limit=2)
+        if len(matches) == 1 or (len(matches) == 2 and matches[0][0] < matches[1][0]):
+            return matches[0][1]
+        return None
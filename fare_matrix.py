@@ -0,0 +1,210 @@
+# All-pairs distance and fare matrix for Air Ontario
+# The geodesic distance between every pair of airports is computed once, as an N x N NumPy array,
+# and cached on disk keyed by the coordinate table. Every class/package price for a pair is then a
+# constant-time lookup instead of a geodesic solve per quote.
+import hashlib
+import os
+
+import numpy as np
+
+from money import scale
+
+# WGS-84 ellipsoid (the default ellipsoid of geopy's geodesic)
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+# Bump when the distance computation changes, so old cache files are not reused
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AIR_ONTARIO_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "air_ontario"))
+
+# Pricing rules (fares are in cents, see money.py)
+    # The economy fare is the distance (km) divided by KM_PER_DOLLAR, rounded to a cent; the other
+    # fares are derived from it in the same order as the booking menu always used
+KM_PER_DOLLAR = 6
+BUSINESS_MULTIPLIER = 3
+FIRST_MULTIPLIER = 9
+# Connecting fares, in percent (rounded half to even, like the original float rounding)
+CONNECTING_ECONOMY_PERCENT = 80
+CONNECTING_BUSINESS_PERCENT = 85
+CONNECTING_FIRST_PERCENT = 90
+
+# Ticket options, in the order of the booking menu (option 1 is PACKAGES[0])
+PACKAGES = [
+    ("Direct", "Economy"),
+    ("Connecting", "Economy"),
+    ("Direct", "Business"),
+    ("Connecting", "Business"),
+    ("Direct", "First"),
+    ("Connecting", "First"),
+]
+
+# Rows of the distance matrix computed per block (bounds the memory used by the temporaries)
+BLOCK_ROWS = 256
+
+# Returns the geodesic distances (km) between each point of (lat1, lon1) and each point of (lat2, lon2)
+    # Note: this is Vincenty's inverse formula, vectorized with NumPy. Pairs that do not converge
+    # (nearly antipodal points, which never happen between Canadian airports) fall back to geopy
+def vincenty_km(lat1, lon1, lat2, lon2, max_iterations=200, tolerance=1e-12):
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(*(np.radians(np.asarray(value, dtype=float))
+                                                   for value in (lat1, lon1, lat2, lon2)))
+    L = lon2 - lon1
+    U1 = np.arctan((1 - WGS84_F) * np.tan(lat1))
+    U2 = np.arctan((1 - WGS84_F) * np.tan(lat2))
+    sin_U1, cos_U1 = np.sin(U1), np.cos(U1)
+    sin_U2, cos_U2 = np.sin(U2), np.cos(U2)
+
+    lam = L.copy()
+    converged = np.zeros(L.shape, dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(max_iterations):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(cos_U2 * sin_lam, cos_U1 * sin_U2 - sin_U1 * cos_U2 * cos_lam)
+            cos_sigma = sin_U1 * sin_U2 + cos_U1 * cos_U2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_U1 * cos_U2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # Points on the equator have cos2_alpha == 0
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_U1 * sin_U2 / cos2_alpha)
+            C = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            new_lam = L + (1 - C) * WGS84_F * sin_alpha * (
+                sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+            converged = np.abs(new_lam - lam) < tolerance
+            lam = new_lam
+            if converged.all():
+                break
+
+        u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+        B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+        delta_sigma = B * sin_sigma * (cos_2sigma_m + B / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)))
+        distances = WGS84_B * A * (sigma - delta_sigma) / 1000
+
+    # Identical points
+    distances = np.where(sin_sigma == 0, 0.0, distances)
+
+    failed = ~converged | ~np.isfinite(distances)
+    if failed.any():
+        from geopy.distance import geodesic as GD
+        degrees = [np.degrees(value) for value in (lat1, lon1, lat2, lon2)]
+        for index in zip(*np.nonzero(failed)):
+            distances[index] = GD((degrees[0][index], degrees[1][index]),
+                                  (degrees[2][index], degrees[3][index])).km
+    return distances
+
+# Returns the N x N distance matrix (km) for an (N, 2) array of (latitude, longitude) pairs
+def distance_matrix(coordinates):
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    count = len(coordinates)
+    distances = np.empty((count, count))
+    for start in range(0, count, BLOCK_ROWS):
+        block = coordinates[start:start + BLOCK_ROWS]
+        distances[start:start + BLOCK_ROWS] = vincenty_km(
+            block[:, 0, None], block[:, 1, None], coordinates[None, :, 0], coordinates[None, :, 1])
+    return distances
+
+# Returns the cache key of a coordinate table
+def cache_key(coordinates):
+    digest = hashlib.sha1(f"v{CACHE_VERSION}".encode())
+    digest.update(np.ascontiguousarray(coordinates, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+# Returns the distance matrix for the coordinates, reading it from the cache when possible
+def load_distance_matrix(coordinates, cache_dir=DEFAULT_CACHE_DIR):
+    coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if cache_dir is None:
+        return distance_matrix(coordinates)
+
+    path = os.path.join(cache_dir, f"distances-{cache_key(coordinates)}.npy")
+    try:
+        # Memory-mapped so that a large matrix costs nothing to open
+        return np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        pass
+
+    distances = distance_matrix(coordinates)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so a concurrent reader never sees a partial matrix
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            np.save(file, distances)
+        os.replace(temporary_path, path)
+    except OSError:
+        # The cache is only an optimization; a read-only home directory is not an error
+        pass
+    return distances
+
+# Returns the economy fare (cents) of one or many distances (km)
+    # Note: this is the only place where a float is rounded to cents
+def economy_cents(distance_km):
+    if np.ndim(distance_km) == 0:
+        return round(distance_km * 100 / KM_PER_DOLLAR)
+    return np.rint(np.asarray(distance_km, dtype=float) * 100 / KM_PER_DOLLAR).astype(np.int64)
+
+# Returns the fares (cents) of every ticket option, in PACKAGES order, from the economy fare(s)
+    # Note: each connecting fare is a share of the direct fare of the same class
+def fares_from_economy(economy):
+    business = economy * BUSINESS_MULTIPLIER
+    first = economy * FIRST_MULTIPLIER
+    return [
+        economy,
+        scale(economy, CONNECTING_ECONOMY_PERCENT, 100),
+        business,
+        scale(business, CONNECTING_BUSINESS_PERCENT, 100),
+        first,
+        scale(first, CONNECTING_FIRST_PERCENT, 100),
+    ]
+
+# Same as fares_from_distance for a single distance, without the NumPy overhead of tiny arrays
+def fares_from_scalar_distance(distance_km):
+    return fares_from_economy(economy_cents(float(distance_km)))
+
+# Returns the fares (cents) of every ticket option (in PACKAGES order) for one or many distances
+    # Note: the last axis of the result holds the 6 ticket options
+def fares_from_distance(distance_km):
+    if np.ndim(distance_km) == 0:
+        return np.array(fares_from_scalar_distance(distance_km), dtype=np.int64)
+    return np.stack(fares_from_economy(economy_cents(distance_km)), axis=-1)
+
+# Distances and fares between every pair of airports
+class FareMatrix:
+    def __init__(self, names, coordinates, distances):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        self.distances = distances
+        # Connecting routes over this matrix, built on first use by routes.route_graph()
+        self.route_graph = None
+
+    # Builds the matrix from a {name: (latitude, longitude)} mapping
+    @classmethod
+    def load(cls, locations, cache_dir=DEFAULT_CACHE_DIR):
+        names = list(locations)
+        coordinates = np.array([locations[name] for name in names], dtype=np.float64).reshape(-1, 2)
+        return cls(names, coordinates, load_distance_matrix(coordinates, cache_dir))
+
+    def __len__(self):
+        return len(self.names)
+
+    # Returns the position of an airport in the matrix
+    def position(self, name):
+        try:
+            return self.index[name]
+        except KeyError:
+            raise KeyError(f"Unknown airport: {name!r}") from None
+
+    # Returns the distance (km) between two airports
+    def distance(self, origin, destination):
+        return float(self.distances[self.position(origin), self.position(destination)])
+
+    # Returns the one-way fare (cents) of every ticket option (in PACKAGES order) between two airports
+    def fares(self, origin, destination):
+        return fares_from_scalar_distance(self.distance(origin, destination))
+
+    # Returns a (len(origins), 6) array of one-way fares (cents) for arrays of airport positions
+    def fare_table(self, origins, destinations):
+        return fares_from_distance(self.distances[np.asarray(origins), np.asarray(destinations)])
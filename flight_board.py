@@ -0,0 +1,224 @@
+# Columnar flight boards for Air Ontario
+# A board is stored as a struct-of-arrays: one NumPy array per column, with small integer codes
+# instead of strings (the status, terminal, airline and city columns are indexes into lookup tables).
+# Whole columns are filled at once from a NumPy Generator, so building a board with tens of
+# thousands of rows costs a handful of array operations instead of one Python call per cell.
+import numpy as np
+
+# The generator used when none is passed in is the shared, seedable one (see randomness.py)
+from randomness import get_rng
+
+ARRIVALS = "arrivals"
+DEPARTURES = "departures"
+
+# Lookup tables for the coded columns
+    # Note: "Departed" is only reached through a status change, it is never generated at random
+STATUSES = ("Arrived", "Delayed", "Ontime", "Canceled", "Departed")
+GENERATED_STATUSES = 4
+ARRIVED, DELAYED, ONTIME, CANCELED, DEPARTED = range(len(STATUSES))
+TERMINALS = ("T1", "T2", "T3")
+GATE_LETTERS = tuple(map(chr, range(65, 91)))
+
+# Value ranges (the upper bounds are exclusive, like random.randrange)
+FLIGHT_NUMBERS = (3000, 5999)
+CAROUSELS = (1, 14)
+GATE_NUMBERS = (1, 100)
+MINUTES_PER_DAY = 24 * 60
+
+# Columns of a board, in the order of the FlightBoard arguments
+COLUMNS = ("city", "airline", "flight_number", "time", "terminal", "bay", "status")
+
+# Headers of each board, in the order of the rows returned by FlightBoard.rows()
+HEADERS = {
+    ARRIVALS: ["Destination", "Code", "Flight", "ETA", "Terminal", "Carousel", "Status"],
+    DEPARTURES: ["Destination", "Code", "Flight", "ETD", "Terminal", "Gate No.", "Status"],
+}
+
+# -- Column generators --
+# Each one returns `size` random values for one column of the board
+
+# Returns airline indexes into a table of `airline_count` airlines
+def random_airlines(size, airline_count, rng=None):
+    return get_rng(rng).integers(0, airline_count, size, dtype=np.int16)
+
+# Returns flight numbers
+def random_flight_numbers(size, rng=None):
+    return get_rng(rng).integers(*FLIGHT_NUMBERS, size, dtype=np.int16)
+
+# Returns ETA/ETD times as minutes since midnight
+def random_times(size, rng=None):
+    return get_rng(rng).integers(0, MINUTES_PER_DAY, size, dtype=np.int16)
+
+# Returns terminal codes (indexes into TERMINALS)
+def random_terminals(size, rng=None):
+    return get_rng(rng).integers(0, len(TERMINALS), size, dtype=np.int8)
+
+# Returns carousel numbers
+def random_carousels(size, rng=None):
+    return get_rng(rng).integers(*CAROUSELS, size, dtype=np.int16)
+
+# Returns gate codes; a gate is stored as letter index * 100 + gate number (e.g. C12 -> 212)
+def random_gates(size, rng=None):
+    rng = get_rng(rng)
+    letters = rng.integers(0, len(GATE_LETTERS), size, dtype=np.int16)
+    numbers = rng.integers(*GATE_NUMBERS, size, dtype=np.int16)
+    return letters * 100 + numbers
+
+# Returns status codes (indexes into STATUSES)
+def random_statuses(size, rng=None):
+    return get_rng(rng).integers(0, GENERATED_STATUSES, size, dtype=np.int8)
+
+# -- Formatting helpers --
+
+# Formats minutes since midnight as "%H:%M"
+def format_time(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+# Formats a gate code as letter + number
+def format_gate(gate):
+    return f'{GATE_LETTERS[gate // 100]}{gate % 100}'
+
+# A flight board stored column by column
+class FlightBoard:
+    __slots__ = ("kind", "city_names", "city_codes", "airline_codes",
+                 "city", "airline", "flight_number", "time", "terminal", "bay", "status")
+
+    def __init__(self, kind, city_names, city_codes, airline_codes,
+                 city, airline, flight_number, time, terminal, bay, status):
+        # Lookup tables
+        self.kind = kind
+        self.city_names = city_names
+        self.city_codes = city_codes
+        self.airline_codes = airline_codes
+        # Columns; `bay` is the carousel for arrivals and the gate code for departures
+        self.city = city
+        self.airline = airline
+        self.flight_number = flight_number
+        self.time = time
+        self.terminal = terminal
+        self.bay = bay
+        self.status = status
+
+    def __len__(self):
+        return len(self.city)
+
+    # Returns the headers for this board
+    def headers(self):
+        return HEADERS[self.kind]
+
+    # Returns the width of each column: the longest header or value the column can hold
+        # Note: the widths come from the lookup tables and value ranges, so no row is scanned
+    def column_widths(self):
+        if self.kind == ARRIVALS:
+            bay_width = len(str(CAROUSELS[1] - 1))
+        else:
+            bay_width = 1 + len(str(GATE_NUMBERS[1] - 1))
+        values = [
+            max(map(len, self.city_names), default=0),
+            max(map(len, self.city_codes), default=0),
+            max(map(len, self.airline_codes), default=0) + len(str(FLIGHT_NUMBERS[1] - 1)),
+            len(format_time(0)),
+            max(map(len, TERMINALS)),
+            bay_width,
+            max(map(len, STATUSES)),
+        ]
+        return [max(len(header), width) for header, width in zip(self.headers(), values)]
+
+    # Returns row i as a list of display values (same layout as the original boards)
+    def row(self, i):
+        bay = int(self.bay[i])
+        return [
+            self.city_names[self.city[i]],
+            self.city_codes[self.city[i]],
+            f'{self.airline_codes[self.airline[i]]}{self.flight_number[i]}',
+            format_time(int(self.time[i])),
+            TERMINALS[self.terminal[i]],
+            bay if self.kind == ARRIVALS else format_gate(bay),
+            STATUSES[self.status[i]],
+        ]
+
+    # Returns a new board with the given rows, in the given order (the lookup tables are shared)
+    def take(self, indexes):
+        return FlightBoard(self.kind, self.city_names, self.city_codes, self.airline_codes,
+                           *(getattr(self, column)[indexes] for column in COLUMNS))
+
+    # Returns a new board sorted by ETA/ETD
+    def sorted_by_time(self):
+        return self.take(np.argsort(self.time, kind="stable"))
+
+    # Yields every row as a list of display values
+    def rows(self):
+        # Convert the columns to Python lists once instead of indexing NumPy scalars per cell
+        names = [self.city_names[c] for c in self.city.tolist()]
+        codes = [self.city_codes[c] for c in self.city.tolist()]
+        airlines = [self.airline_codes[a] for a in self.airline.tolist()]
+        columns = zip(names, codes, airlines, self.flight_number.tolist(), self.time.tolist(),
+                      self.terminal.tolist(), self.bay.tolist(), self.status.tolist())
+        arrivals = self.kind == ARRIVALS
+        for name, code, airline, number, time, terminal, bay, status in columns:
+            yield [name, code, f'{airline}{number}', format_time(time), TERMINALS[terminal],
+                   bay if arrivals else format_gate(bay), STATUSES[status]]
+
+# Generates a whole board at once
+    # destinations: list of [city name, airport code] pairs
+    # airline_codes: sequence of airline codes used as flight prefixes
+    # size: number of rows; by default one row per destination, otherwise destinations are sampled
+def generate_board(kind, destinations, airline_codes, size=None, rng=None):
+    if kind not in HEADERS:
+        raise ValueError(f"Unknown board kind: {kind!r}")
+    rng = get_rng(rng)
+    if size is None:
+        size = len(destinations)
+        city = np.arange(size, dtype=np.int16)
+    else:
+        city = rng.integers(0, len(destinations), size, dtype=np.int16)
+
+    if kind == ARRIVALS:
+        bay = random_carousels(size, rng)
+    else:
+        bay = random_gates(size, rng)
+
+    return FlightBoard(
+        kind,
+        city_names=[destination[0] for destination in destinations],
+        city_codes=[destination[1] for destination in destinations],
+        airline_codes=list(airline_codes),
+        city=city,
+        airline=random_airlines(size, len(airline_codes), rng),
+        flight_number=random_flight_numbers(size, rng),
+        time=random_times(size, rng),
+        terminal=random_terminals(size, rng),
+        bay=bay,
+        status=random_statuses(size, rng),
+    )
+
+# -- Status lifecycle --
+# Ontime -> Delayed -> Departed/Arrived, or Canceled. Departed, Arrived and Canceled are final.
+
+# Chances of each change when a flight changes status (the final status depends on the board)
+ONTIME_CHANGES = {DELAYED: 0.3, "final": 0.6, CANCELED: 0.1}
+DELAYED_CHANGES = {"final": 0.85, CANCELED: 0.15}
+
+# Returns the final status of flights on a board of this kind
+def final_status(kind):
+    return ARRIVED if kind == ARRIVALS else DEPARTED
+
+# Returns whether each status code is final
+def is_final(statuses):
+    return (statuses == ARRIVED) | (statuses == DEPARTED) | (statuses == CANCELED)
+
+# Picks the next status of each flight from a {status or "final": chance} table
+def next_statuses(changes, size, kind, rng):
+    options = np.array([final_status(kind) if status == "final" else status for status in changes], dtype=np.int8)
+    return options[rng.choice(len(options), size, p=list(changes.values()))]
+
+# Moves each flight that is not final to its next status with the given chance
+    # Returns the indexes of the flights whose status changed
+def advance_statuses(board, chance, rng=None):
+    rng = get_rng(rng)
+    changing = np.flatnonzero((rng.random(len(board)) < chance) & ~is_final(board.status))
+    current = board.status[changing]
+    for status, changes in ((ONTIME, ONTIME_CHANGES), (DELAYED, DELAYED_CHANGES)):
+        selected = changing[current == status]
+        board.status[selected] = next_statuses(changes, len(selected), board.kind, rng)
+    return changing
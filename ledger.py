@@ -0,0 +1,209 @@
+# Booking ledger for Air Ontario
+# Confirmed bookings are appended to a SQLite database in WAL mode. A single writer thread commits
+# them in groups: every booking queued while the previous transaction was being written goes into
+# the next one, so a burst of checkouts costs one fsync instead of one each. Each booking gets a
+# record locator (PNR), and an in-memory index maps PNRs and last names to rows, so a lookup is a
+# dict access followed by a primary-key read.
+#
+# Note: the index is kept by the process that owns the ledger; use one writing process per file.
+import json
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+DEFAULT_LEDGER_PATH = os.environ.get(
+    "AIR_ONTARIO_LEDGER", os.path.join(os.path.expanduser("~"), ".local", "share", "air_ontario", "bookings.db"))
+
+# Record locators: 6 characters, without the easily confused 0/O and 1/I
+PNR_ALPHABET = "23456789ABCDEFGHJKLMNPQRSTUVWXYZ"
+PNR_LENGTH = 6
+# Largest number of bookings written in one transaction
+MAX_GROUP = 1024
+
+# Columns of the bookings table, in order (bags, legs, route and line_items are stored as JSON;
+# amounts are in cents). legs: one {"origin", "destination", "flight", "seats"} entry per flight flown
+COLUMNS = ["pnr", "created", "first_name", "last_name", "origin", "destination", "route", "trip_type",
+           "departure_date", "return_date", "ticket_option", "ticket_class", "package", "passengers",
+           "loyalty_program", "bags", "legs", "grand_total_cents", "line_items"]
+JSON_COLUMNS = {"route", "bags", "legs", "line_items"}
+PNR, LAST_NAME = COLUMNS.index("pnr"), COLUMNS.index("last_name")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY,
+    pnr TEXT UNIQUE NOT NULL,
+    created TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    origin TEXT,
+    destination TEXT,
+    route TEXT,
+    trip_type INTEGER,
+    departure_date TEXT,
+    return_date TEXT,
+    ticket_option INTEGER,
+    ticket_class TEXT,
+    package TEXT,
+    passengers INTEGER,
+    loyalty_program INTEGER,
+    bags TEXT,
+    legs TEXT,
+    grand_total_cents INTEGER,
+    line_items TEXT
+)
+"""
+# Version of the file layout, kept in PRAGMA user_version
+SCHEMA_VERSION = 1
+INSERT = f"INSERT INTO bookings ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+SELECT = f"SELECT {', '.join(COLUMNS)} FROM bookings WHERE id = ?"
+
+# Returns a random record locator
+def new_pnr():
+    return "".join(secrets.choice(PNR_ALPHABET) for _ in range(PNR_LENGTH))
+
+# Stamps a new ledger file with SCHEMA_VERSION; raises ValueError for a file written by a newer version
+def check_version(connection):
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0:
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    elif version > SCHEMA_VERSION:
+        raise ValueError(f"Booking ledger version {version} is newer than this program (version {SCHEMA_VERSION})")
+
+# Returns the key used to index a last name
+def name_key(last_name):
+    return " ".join(last_name.split()).casefold()
+
+# Bookings appended to a SQLite file by a group-committing writer thread
+class BookingLedger:
+    # synchronous: SQLite synchronous mode; "FULL" makes every commit durable, even on power loss
+    def __init__(self, path=DEFAULT_LEDGER_PATH, synchronous="FULL"):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # The writer thread has its own connection; in WAL mode, reads never wait for a commit
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={synchronous}")
+        self.connection.execute(SCHEMA)
+        check_version(self.connection)
+        self.reader = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Guards the index; read_lock guards the reading connection
+        self.lock = threading.Lock()
+        self.read_lock = threading.Lock()
+        # Index: PNR -> row id, last name -> PNRs
+        self.by_pnr = {}
+        self.by_last_name = {}
+        # PNRs handed out but not yet committed
+        self.pending_pnrs = set()
+        for row_id, pnr, last_name in self.connection.execute("SELECT id, pnr, last_name FROM bookings"):
+            self.index(row_id, pnr, last_name)
+        # Counters
+        self.commits = 0
+        self.bookings_written = 0
+        self.queue = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self.write_loop, name="booking-ledger", daemon=True)
+        self.writer.start()
+
+    def __len__(self):
+        return len(self.by_pnr)
+
+    # Adds a committed booking to the index
+    def index(self, row_id, pnr, last_name):
+        self.by_pnr[pnr] = row_id
+        self.by_last_name.setdefault(name_key(last_name), []).append(pnr)
+
+    # Returns a record locator not used by any booking
+    def reserve_pnr(self):
+        with self.lock:
+            pnr = new_pnr()
+            while pnr in self.by_pnr or pnr in self.pending_pnrs:
+                pnr = new_pnr()
+            self.pending_pnrs.add(pnr)
+        return pnr
+
+    # Queues a booking (a dict with the COLUMNS keys, except pnr and created)
+        # Returns (pnr, future); the future is done (with the PNR) once the booking is committed
+    def append(self, booking):
+        pnr = self.reserve_pnr()
+        record = dict(booking, pnr=pnr, created=datetime.now().isoformat(timespec="seconds"))
+        row = tuple(json.dumps(record.get(column)) if column in JSON_COLUMNS else record.get(column)
+                    for column in COLUMNS)
+        future = Future()
+        self.queue.put((row, future))
+        return pnr, future
+
+    # Appends a booking and waits until it is committed; returns its PNR
+    def record(self, booking):
+        return self.append(booking)[1].result()
+
+    # Writes queued bookings, one transaction per group, until close() is called
+    def write_loop(self):
+        while True:
+            group = [self.queue.get()]
+            # Everything queued while the last group was written goes into this transaction
+            while len(group) < MAX_GROUP:
+                try:
+                    group.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is None for item in group)
+            group = [item for item in group if item is not None]
+            if group:
+                self.write_group(group)
+            if stop:
+                return
+
+    # Commits a group of bookings and completes their futures
+    def write_group(self, group):
+        rows = [row for row, _ in group]
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN")
+            row_ids = []
+            for row in rows:
+                cursor.execute(INSERT, row)
+                row_ids.append(cursor.lastrowid)
+            cursor.execute("COMMIT")
+        except sqlite3.Error as error:
+            if self.connection.in_transaction:
+                self.connection.execute("ROLLBACK")
+            with self.lock:
+                self.pending_pnrs.difference_update(row[PNR] for row in rows)
+            for _, future in group:
+                future.set_exception(error)
+            return
+        with self.lock:
+            for row_id, row in zip(row_ids, rows):
+                self.index(row_id, row[PNR], row[LAST_NAME])
+                self.pending_pnrs.discard(row[PNR])
+        self.commits += 1
+        self.bookings_written += len(group)
+        for row, future in group:
+            future.set_result(row[PNR])
+
+    # Returns the booking with a record locator, or None
+    def get(self, pnr):
+        row_id = self.by_pnr.get(pnr.strip().upper())
+        if row_id is None:
+            return None
+        with self.read_lock:
+            row = self.reader.execute(SELECT, (row_id,)).fetchone()
+        return {column: json.loads(value) if column in JSON_COLUMNS else value
+                for column, value in zip(COLUMNS, row)}
+
+    # Returns the bookings of a passenger (by last name, ignoring case), oldest first
+    def find_by_last_name(self, last_name):
+        with self.lock:
+            pnrs = list(self.by_last_name.get(name_key(last_name), ()))
+        return [self.get(pnr) for pnr in pnrs]
+
+    # Writes the queued bookings and closes the database
+    def close(self):
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        self.connection.close()
+        self.reader.close()
@@ -0,0 +1,162 @@
+# Live terminal flight board for Air Ontario
+# The board is laid out once with fixed column widths. After the first frame, only the rows whose
+# status changed (or that moved because of paging) are repainted, with cursor-addressed writes that
+# are sent to the terminal as a single write per frame.
+import shutil
+import sys
+import time
+
+import flight_board
+from flight_board import ARRIVED, CANCELED, DELAYED, DEPARTED, ONTIME
+
+# ANSI escape codes
+ESC = "\033["
+CLEAR_SCREEN = ESC + "2J"
+HIDE_CURSOR = ESC + "?25l"
+SHOW_CURSOR = ESC + "?25h"
+BOLD = ESC + "1m"
+END = ESC + "0m"
+
+# Colour of each status (same colours as air_ontario.color_code)
+STATUS_COLORS = {
+    ARRIVED: ESC + "94m",
+    DEPARTED: ESC + "94m",
+    ONTIME: ESC + "92m",
+    DELAYED: ESC + "0;33m",
+    CANCELED: ESC + "91m",
+}
+
+SEPARATOR = " │ "
+# Screen lines used above the rows (title, header, rule) and below them (page footer)
+HEADER_LINES = 3
+FOOTER_LINES = 1
+
+# Returns the escape sequence moving the cursor to a screen line (1-based) and clearing it
+def move_to(line):
+    return f"{ESC}{line};1H{ESC}2K"
+
+# A flight board drawn on a terminal and kept up to date by repainting only what changed
+class LiveBoard:
+    def __init__(self, board, out=None, height=None, title=None):
+        self.board = board
+        self.out = sys.stdout if out is None else out
+        self.title = title or board.kind.upper()
+        if height is None:
+            height = shutil.get_terminal_size().lines
+        # Rows of the board shown per page
+        self.page_size = max(1, height - HEADER_LINES - FOOTER_LINES)
+        self.page = 0
+        # Text last written on each row line of the screen (None when it must be repainted)
+        self.screen = [None] * self.page_size
+        self.dirty = set()
+        self.needs_full_frame = True
+        self.widths = board.column_widths()
+
+    # Returns the number of pages
+    def page_count(self):
+        return max(1, -(-len(self.board) // self.page_size))
+
+    # Returns the range of board rows shown on the current page
+    def visible_rows(self):
+        start = self.page * self.page_size
+        return range(start, min(start + self.page_size, len(self.board)))
+
+    # Returns the text of a row, padded to the column widths and coloured by status
+    def format_row(self, index):
+        cells = self.board.row(index)
+        text = SEPARATOR.join(str(cell).ljust(width) for cell, width in zip(cells, self.widths))
+        return STATUS_COLORS[int(self.board.status[index])] + text + END
+
+    # Changes the status of a flight
+    def set_status(self, index, status):
+        if self.board.status[index] != status:
+            self.board.status[index] = status
+            self.dirty.add(index)
+
+    # Marks rows as changed (e.g. after the board columns were updated directly)
+    def mark_dirty(self, indexes):
+        self.dirty.update(int(index) for index in indexes)
+
+    # Moves every flight that is not final to its next status with the given chance
+    def advance(self, chance, rng=None):
+        changed = flight_board.advance_statuses(self.board, chance, rng)
+        self.mark_dirty(changed)
+        return changed
+
+    # Shows another page (wrapping around)
+    def scroll(self, pages=1):
+        self.page = (self.page + pages) % self.page_count()
+        # Every row line may change; unchanged lines are still skipped when the frame is built
+        self.dirty.add(None)
+
+    # Returns the header lines
+    def header(self):
+        headers = SEPARATOR.join(header.ljust(width) for header, width in zip(self.board.headers(), self.widths))
+        rule = "─" * len(headers)
+        return [BOLD + self.title + END, BOLD + headers + END, rule]
+
+    # Returns the footer line
+    def footer(self):
+        return f"Page {self.page + 1}/{self.page_count()} - {len(self.board)} flights"
+
+    # Returns the escape sequences that bring the screen up to date, and resets the changes
+    def frame(self):
+        parts = []
+        if self.needs_full_frame:
+            parts.append(HIDE_CURSOR + CLEAR_SCREEN)
+            for line, text in enumerate(self.header(), start=1):
+                parts.append(move_to(line) + text)
+            self.screen = [None] * self.page_size
+            self.dirty.add(None)
+            self.needs_full_frame = False
+
+        visible = self.visible_rows()
+        if None in self.dirty:
+            # After a full frame or a page change, every row line is checked
+            slots = range(self.page_size)
+        else:
+            slots = sorted(index - visible.start for index in self.dirty if index in visible)
+        for slot in slots:
+            index = visible.start + slot
+            text = self.format_row(index) if index in visible else ""
+            if text != self.screen[slot]:
+                parts.append(move_to(HEADER_LINES + 1 + slot) + text)
+                self.screen[slot] = text
+
+        # The footer only changes when the page does
+        if None in self.dirty:
+            parts.append(move_to(HEADER_LINES + self.page_size + 1) + self.footer())
+        self.dirty.clear()
+        return "".join(parts)
+
+    # Writes the changes to the terminal in a single write
+    def render(self):
+        frame = self.frame()
+        if frame:
+            self.out.write(frame)
+            self.out.flush()
+        return len(frame)
+
+    # Restores the terminal after the last frame
+    def close(self):
+        self.out.write(move_to(HEADER_LINES + self.page_size + 2) + SHOW_CURSOR)
+        self.out.flush()
+
+# Runs a live board until interrupted (or for `frames` frames)
+    # interval: seconds between frames; chance: chance per frame that a flight changes status
+    # page_every: frames between page changes, for boards taller than the screen
+def run(board, interval=1.0, chance=0.02, page_every=5, frames=None, rng=None, out=None):
+    live = LiveBoard(board, out=out)
+    frame = 0
+    try:
+        while frames is None or frame < frames:
+            live.render()
+            time.sleep(interval)
+            frame += 1
+            live.advance(chance, rng)
+            if live.page_count() > 1 and frame % page_every == 0:
+                live.scroll()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        live.close()
@@ -0,0 +1,98 @@
+# Checked luggage fees for Air Ontario
+# The fee rules are compiled once into a dense (loyalty program, cabin class, bag ordinal) array of
+# cents, and the overweight/oversize penalties are data (PENALTIES), so pricing any number of bags is
+# a few array operations with no branches. price_bags() prices the bags of many passengers at once,
+# e.g. every bag dropped at the kiosks for a whole flight.
+from collections import namedtuple
+
+import numpy as np
+
+from money import cents
+
+# Luggage prices based on rewards program chosen & class of flight (dollars, as shown in the booking menu)
+LUGGAGE_PRICES = {
+    # Loyalty program #: Economy (1st bag, 2nd bag, 3rd bag, extra), Business (...), First (...)
+    0: [[50, 70, 100, 140], [40, 60, 90, 140], [35, 55, 85, 140]],
+    1: [[40, 60, 90, 120], ["Free", 50, 80, 120], ["Free", "Free", 70, 120]],
+    2: [["Free", 50, 70, 100], ["Free", "Free", 60, 80], ["Free", "Free", "Free", 70]],
+    3: [["Free", "Free", 50, 70], ["Free", "Free", "Free", 70], ["Free", "Free", "Free", "Free"]],
+}
+# Bags after the 3rd of a passenger pay the extra bag price
+EXTRA_BAG = 3
+# Most bags a passenger can check
+MAX_BAGS = 9
+# Lightest (kg) and smallest (cm) bag accepted at checkout
+MIN_WEIGHT = 5
+MIN_DIMENSIONS = 50
+
+# A penalty added to a bag when one of its measures is over a limit
+    # measure: "weight" (kg) or "dimensions" (cm); fee: cents
+    # maximum: bags over it are not allowed on board
+Penalty = namedtuple("Penalty", ["name", "measure", "limit", "maximum", "fee"])
+# Unit of each measure
+UNITS = {"weight": "kg", "dimensions": "cm"}
+
+PENALTIES = (
+    Penalty("overweight", "weight", 23, 32, cents(120)),
+    Penalty("oversize", "dimensions", 158, 292, cents(120)),
+)
+
+# The prices compiled into a (program, class, bag ordinal) array of cents, with "Free" as 0;
+# every ordinal from EXTRA_BAG to MAX_BAGS - 1 holds the extra bag price
+def compile_fee_table(prices):
+    table = np.zeros((len(prices), 3, MAX_BAGS), dtype=np.int64)
+    for program in sorted(prices):
+        for ticket_class, fees in enumerate(prices[program]):
+            fees = [0 if fee == "Free" else cents(fee) for fee in fees]
+            table[program, ticket_class] = fees[:EXTRA_BAG] + [fees[EXTRA_BAG]] * (MAX_BAGS - EXTRA_BAG)
+    return table
+
+FEE_TABLE = compile_fee_table(LUGGAGE_PRICES)
+
+# The result of price_bags()
+    # fees: cents, one per bag; totals: cents, one per passenger
+    # accepted: whether each bag is within every penalty's maximum (refused bags are still priced)
+BagPrices = namedtuple("BagPrices", ["fees", "totals", "accepted"])
+
+# Returns the ordinal (0 for the 1st bag) of each bag among the bags of its passenger
+    # owners: the passenger of each bag; a passenger's bags are numbered in the order they appear
+def bag_ordinals(owners, passengers):
+    order = np.argsort(owners, kind="stable")
+    counts = np.bincount(owners, minlength=passengers)
+    starts = np.cumsum(counts) - counts
+    ordinals = np.empty(len(owners), dtype=np.intp)
+    ordinals[order] = np.arange(len(owners)) - starts[owners[order]]
+    return ordinals
+
+# Returns the fee (cents) of each bag
+    # programs, classes, ordinals, weights (kg), dimensions (cm): one value per bag
+def bag_fees(programs, classes, ordinals, weights, dimensions):
+    fees = FEE_TABLE[programs, classes, np.minimum(ordinals, MAX_BAGS - 1)]
+    measures = {"weight": np.asarray(weights), "dimensions": np.asarray(dimensions)}
+    for penalty in PENALTIES:
+        fees = fees + penalty.fee * (measures[penalty.measure] > penalty.limit)
+    return fees
+
+# Prices the bags of many passengers at once
+    # owners: the passenger (0 to len(loyalty_programs) - 1) of each bag, in drop order
+    # weights (kg), dimensions (cm): one value per bag
+    # loyalty_programs: 0 (none) to 3 (gold); classes: 0 Economy, 1 Business, 2 First; one per passenger
+    # Returns a BagPrices
+def price_bags(owners, weights, dimensions, loyalty_programs, classes):
+    owners = np.asarray(owners, dtype=np.intp)
+    weights = np.asarray(weights)
+    dimensions = np.asarray(dimensions)
+    loyalty_programs = np.asarray(loyalty_programs, dtype=np.intp)
+    classes = np.asarray(classes, dtype=np.intp)
+    passengers = len(loyalty_programs)
+    if len(owners) == 0:
+        return BagPrices(np.zeros(0, dtype=np.int64), np.zeros(passengers, dtype=np.int64), np.ones(0, dtype=bool))
+
+    ordinals = bag_ordinals(owners, passengers)
+    fees = bag_fees(loyalty_programs[owners], classes[owners], ordinals, weights, dimensions)
+    totals = np.bincount(owners, weights=fees, minlength=passengers).astype(np.int64)
+    measures = {"weight": weights, "dimensions": dimensions}
+    accepted = np.ones(len(owners), dtype=bool)
+    for penalty in PENALTIES:
+        accepted &= measures[penalty.measure] <= penalty.maximum
+    return BagPrices(fees, totals, accepted)
@@ -0,0 +1,201 @@
+# Timing and counters for Air Ontario
+# Named timers around each stage of a session (board generation, colour coding, rendering, quoting,
+# luggage pricing, checkout, boarding pass...) and counters (bookings, reprompts...). Timings are
+# aggregated into latency histograms that can be dumped as Prometheus text or JSON when the program
+# exits. When metrics are off (the default), a timer is a shared object that does nothing, so the
+# instrumented code costs one function call per stage.
+#
+# Turning metrics on:
+#   AIR_ONTARIO_METRICS=prometheus python air_ontario.py      (or json; written to stderr at exit)
+#   AIR_ONTARIO_METRICS_FILE=metrics.prom                     (write the dump to a file instead)
+#   python air_ontario.py --metrics json                      (same as the environment variable)
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+PREFIX = "air_ontario"
+# Histogram of the stage timers
+STAGE_SECONDS = "stage_seconds"
+FORMATS = ("prometheus", "json")
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket (+Inf) is implicit
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+enabled = False
+_lock = threading.Lock()
+# (name, labels) -> value, for counters; (name, labels) -> Histogram, for histograms
+_counters = {}
+_histograms = {}
+_dump_registered = False
+
+# Counts, sum and bucket counts of observed durations
+class Histogram:
+    __slots__ = ("count", "sum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    # Returns the value under which a fraction of the observations fall (the bucket's upper bound)
+    def quantile(self, fraction):
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.buckets):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+# Returns the key of a metric
+def metric_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+# Adds to a counter
+def count(name, amount=1, **labels):
+    if enabled:
+        key = metric_key(name, labels)
+        with _lock:
+            _counters[key] = _counters.get(key, 0) + amount
+
+# Records a duration in a histogram
+def observe(name, seconds, **labels):
+    if enabled:
+        key = metric_key(name, labels)
+        with _lock:
+            histogram = _histograms.get(key)
+            if histogram is None:
+                histogram = _histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+# Times a block of code
+class Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(STAGE_SECONDS, time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+# Does nothing; returned by timer() when metrics are off
+class NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_TIMER = NullTimer()
+
+# Returns a context manager that times a stage:  with metrics.timer("quoting"): ...
+def timer(stage):
+    return Timer(stage) if enabled else NULL_TIMER
+
+# Decorator timing every call of a function as a stage
+def timed(stage):
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with Timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# Forgets every metric recorded so far
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+# Returns every metric as a dict (the JSON dump)
+def snapshot():
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = [{"name": name, "labels": dict(labels), "count": histogram.count, "sum": histogram.sum,
+                       "p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99),
+                       "buckets": dict(zip([str(bound) for bound in BUCKETS] + ["+Inf"], histogram.buckets))}
+                      for (name, labels), histogram in sorted(_histograms.items())]
+    return {"counters": counters, "histograms": histograms}
+
+# Formats labels the Prometheus way: {stage="quoting"}
+def prometheus_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+# Returns every metric in the Prometheus text exposition format
+def prometheus_text():
+    lines = []
+    with _lock:
+        for name in sorted({name for name, _ in _counters}):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            for (metric, labels), value in sorted(_counters.items()):
+                if metric == name:
+                    lines.append(f"{PREFIX}_{name}_total{prometheus_labels(labels)} {value}")
+        for name in sorted({name for name, _ in _histograms}):
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for (metric, labels), histogram in sorted(_histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip([str(bound) for bound in BUCKETS] + ["+Inf"], histogram.buckets):
+                    cumulative += bucket
+                    lines.append(f"{PREFIX}_{name}_bucket{prometheus_labels(labels, le=bound)} {cumulative}")
+                lines.append(f"{PREFIX}_{name}_sum{prometheus_labels(labels)} {histogram.sum}")
+                lines.append(f"{PREFIX}_{name}_count{prometheus_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+# Returns every metric as JSON
+def json_text():
+    return json.dumps(snapshot(), indent=2) + "\n"
+
+# Writes every metric to a file (stderr by default)
+def dump(format="prometheus", path=None):
+    text = prometheus_text() if format == "prometheus" else json_text()
+    if path is None:
+        sys.stderr.write(text)
+    else:
+        with open(path, "w") as file:
+            file.write(text)
+
+# Turns metrics on; with a format, they are dumped at exit (to `path`, or stderr)
+def enable(format=None, path=None):
+    global enabled, _dump_registered
+    if format is not None and format not in FORMATS:
+        raise ValueError(f"Unknown metrics format: {format!r} (use {' or '.join(FORMATS)})")
+    enabled = True
+    if format is not None and not _dump_registered:
+        atexit.register(dump, format, path)
+        _dump_registered = True
+
+# Turns metrics off (what was recorded is kept)
+def disable():
+    global enabled
+    enabled = False
+
+# Metrics can be turned on from the environment, before anything is timed
+if os.environ.get("AIR_ONTARIO_METRICS"):
+    enable(os.environ["AIR_ONTARIO_METRICS"], os.environ.get("AIR_ONTARIO_METRICS_FILE"))
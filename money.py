@@ -0,0 +1,36 @@
+# Money for Air Ontario
+# Every amount is an integer number of cents: a Python int for one amount, an int64 NumPy array for
+# many. Amounts are only added, multiplied by whole numbers or scaled by exact fractions with an
+# explicit rounding rule, and they are turned into text only when they are displayed.
+from decimal import Decimal
+
+# Rounding rules for the cents lost when an amount is scaled
+ROUND_HALF_UP = "half_up"
+ROUND_HALF_EVEN = "half_even"
+
+# Returns the cents of a dollar amount written as a literal (e.g. 534.02 or "534.02")
+def cents(dollars):
+    amount = Decimal(str(dollars)) * 100
+    if amount != amount.to_integral_value():
+        raise ValueError(f"Not a whole number of cents: {dollars!r}")
+    return int(amount)
+
+# Returns amount * numerator / denominator, rounded to a whole cent
+    # amount: cents (an int or an integer array); the result has the same type
+def scale(amount, numerator, denominator, rounding=ROUND_HALF_EVEN):
+    quotient, remainder = divmod(amount * numerator, denominator)
+    twice = remainder * 2
+    if rounding == ROUND_HALF_UP:
+        up = twice >= denominator
+    elif rounding == ROUND_HALF_EVEN:
+        up = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    else:
+        raise ValueError(f"Unknown rounding: {rounding!r}")
+    return quotient + up
+
+# Formats cents as dollars with two decimals, e.g. 53402 -> "534.02" (the same text as format(x, ".2f"))
+def format_cents(amount):
+    amount = int(amount)
+    sign = "-" if amount < 0 else ""
+    dollars, rest = divmod(abs(amount), 100)
+    return f"{sign}{dollars}.{rest:02d}"
@@ -0,0 +1,198 @@
+# Headless quotes for Air Ontario
+# Prices many itineraries in one vectorized pass, with the same rules as the interactive checkout:
+# distance-based fare, round-trip doubling, passenger count, luggage, carrier surcharges, 13% HST
+# and the fixed airport fees. Every amount is in integer cents (see money.py).
+from collections import namedtuple
+from fractions import Fraction
+
+import numpy as np
+
+import metrics
+from luggage import MAX_BAGS, MIN_DIMENSIONS, MIN_WEIGHT, PENALTIES, UNITS, price_bags
+from money import ROUND_HALF_UP, cents, scale
+from routes import NO_FARE, route_graph
+
+ROUND_TRIP = 1
+ONE_WAY = 2
+
+# A charge added to every booking
+    # line_item: the LINE_ITEMS entry it fills
+    # amount: cents, for a fixed charge; rate: a fraction of the sum of the `base` line items, rounded
+    # to a cent with `rounding`
+Charge = namedtuple("Charge", ["line_item", "amount", "rate", "base", "rounding"], defaults=[0, None, (), None])
+
+# Charges added to every booking, in the order they are computed
+CHARGES = (
+    Charge("carrier_surcharges", amount=cents("534.02")),
+    Charge("hst", rate=Fraction(13, 100), base=("base_fare", "luggage", "carrier_surcharges"), rounding=ROUND_HALF_UP),
+    Charge("security_fee", amount=cents("25.64")),
+    Charge("passenger_service_fee", amount=cents("3.13")),
+    Charge("airport_improvement_fee", amount=cents("35.42")),
+    Charge("user_development_fee", amount=cents("3.27")),
+)
+# Line items added up into the subtotal (the amount HST is charged on) and into the grand total
+SUBTOTAL_ITEMS = ("base_fare", "luggage", "carrier_surcharges")
+TOTAL_ITEMS = ("base_fare", "luggage") + tuple(charge.line_item for charge in CHARGES)
+
+# Columns of the itinerary table passed to quote_batch()
+ITINERARY_COLUMNS = ["origin", "destination", "trip_type", "ticket_option", "passengers", "loyalty_program", "bags"]
+# Columns of the table returned by quote_batch()
+LINE_ITEMS = ["fare", "base_fare", "luggage", "carrier_surcharges", "subtotal", "hst", "security_fee",
+              "passenger_service_fee", "airport_improvement_fee", "user_development_fee", "grand_total"]
+
+# Returns the cabin class index (0 Economy, 1 Business, 2 First) of each ticket option (1 to 6)
+def ticket_classes(ticket_options):
+    return (np.asarray(ticket_options) - 1) // 2
+
+# Returns whether the bags of one itinerary are a list of (weight, dimensions) pairs
+def is_bag_list(itinerary_bags):
+    try:
+        measures = np.array(list(itinerary_bags), dtype=float)
+    except (TypeError, ValueError):
+        return False
+    return measures.size == 0 or (measures.ndim == 2 and measures.shape[1] == 2)
+
+# Returns the bags of every itinerary as one row per bag: (owners, weights kg, dimensions cm)
+    # owners: the itinerary (row) of each bag
+    # Raises ValueError on the first itinerary whose bags are not a list of (weight, dimensions) pairs
+def flatten_bags(bags):
+    try:
+        counts = np.fromiter((len(itinerary_bags) for itinerary_bags in bags), dtype=np.int64, count=len(bags))
+        flat = [bag for itinerary_bags in bags for bag in itinerary_bags]
+        measures = np.array(flat, dtype=float) if flat else np.zeros((0, 2))
+        valid = measures.ndim == 2 and measures.shape[1] == 2
+    except (TypeError, ValueError):
+        valid = False
+    if not valid:
+        # Only the slow path looks for the itinerary to blame
+        for row, itinerary_bags in enumerate(bags):
+            if not is_bag_list(itinerary_bags):
+                raise ValueError(f"Row {row}: bags must be a list of (weight kg, dimensions cm) pairs, "
+                                 f"got {itinerary_bags!r}")
+        raise ValueError("bags must be lists of (weight kg, dimensions cm) pairs")
+    return np.repeat(np.arange(len(bags)), counts), measures[:, 0], measures[:, 1]
+
+# Returns the luggage cost (cents) of each itinerary
+    # owners, weights (kg), dimensions (cm): one value per bag (see flatten_bags and luggage.py for the rules)
+    # Raises ValueError on the first bag over a penalty's maximum, which cannot be checked at any price
+@metrics.timed("luggage_pricing")
+def luggage_costs(owners, weights, dimensions, loyalty_programs, classes):
+    if len(owners) == 0:
+        return np.zeros(len(loyalty_programs), dtype=np.int64)
+    prices = price_bags(owners, weights, dimensions, loyalty_programs, classes)
+    if not prices.accepted.all():
+        bag = int(np.argmin(prices.accepted))
+        maximums = " and ".join(f"{penalty.maximum} {UNITS[penalty.measure]}" for penalty in PENALTIES)
+        raise ValueError(f"Row {owners[bag]}: bag of {weights[bag]:g} kg and {dimensions[bag]:g} cm is not accepted "
+                         f"(at most {maximums})")
+    return prices.totals
+
+# Returns the one-way or round-trip fare (cents, per passenger) of each itinerary
+    # origins, destinations: airport positions in the fare matrix (see validate_itineraries)
+    # Note: connecting options are priced on the shortest connecting route (see routes.py)
+def itinerary_fares(fare_matrix, origins, destinations, trip_types, ticket_options):
+    fares = route_graph(fare_matrix).fare_table(origins, destinations)
+    fares = fares[np.arange(len(fares)), np.asarray(ticket_options) - 1]
+    unavailable = fares == NO_FARE
+    if unavailable.any():
+        row = int(np.argmax(unavailable))
+        raise ValueError(f"Row {row}: no connecting route from {fare_matrix.names[origins[row]]} "
+                         f"to {fare_matrix.names[destinations[row]]}")
+    # Since it's a roundtrip, assuming simplest scenario, price stays the same each way
+    return np.where(np.asarray(trip_types) == ROUND_TRIP, fares * 2, fares)
+
+# Checks the itinerary columns and raises ValueError on the first invalid one
+    # Returns the positions of the origin and destination airports in the fare matrix, and the bags
+    # as returned by flatten_bags
+def validate_itineraries(fare_matrix, origins, destinations, trip_types, ticket_options, passengers, loyalty_programs,
+                         bags):
+    checks = [("trip_type", trip_types, 1, 2), ("ticket_option", ticket_options, 1, 6),
+              ("passengers", passengers, 1, 9), ("loyalty_program", loyalty_programs, 0, 3)]
+    for name, values, min_value, max_value in checks:
+        invalid = (values < min_value) | (values > max_value)
+        if invalid.any():
+            row = int(np.argmax(invalid))
+            raise ValueError(f"Row {row}: {name} must be between {min_value} and {max_value}, got {values[row]}")
+
+    positions = []
+    for name, airports in (("origin", origins), ("destination", destinations)):
+        airport_positions = np.array([fare_matrix.index.get(airport, -1) for airport in airports], dtype=np.intp)
+        unknown = airport_positions < 0
+        if unknown.any():
+            row = int(np.argmax(unknown))
+            raise ValueError(f"Row {row}: unknown {name} airport {airports[row]!r}")
+        positions.append(airport_positions)
+    same = positions[0] == positions[1]
+    if same.any():
+        row = int(np.argmax(same))
+        raise ValueError(f"Row {row}: origin and destination are the same airport ({origins[row]})")
+
+    owners, weights, dimensions = flatten_bags(bags)
+    counts = np.bincount(owners, minlength=len(bags))
+    if (counts > MAX_BAGS).any():
+        row = int(np.argmax(counts > MAX_BAGS))
+        raise ValueError(f"Row {row}: bags must be between 0 and {MAX_BAGS}, got {counts[row]}")
+    for name, values, minimum, unit in (("weight", weights, MIN_WEIGHT, "kg"),
+                                        ("dimensions", dimensions, MIN_DIMENSIONS, "cm")):
+        # Written so that NaN is rejected too
+        invalid = ~(values >= minimum)
+        if invalid.any():
+            bag = int(np.argmax(invalid))
+            raise ValueError(f"Row {owners[bag]}: bag {name} must be at least {minimum} {unit}, got {values[bag]:g}")
+    return positions[0], positions[1], (owners, weights, dimensions)
+
+# Prices every itinerary of a table in one pass
+    # itineraries: a table with the ITINERARY_COLUMNS columns (a pandas DataFrame or a dict of sequences)
+    #   origin, destination: city names as used by the booking menu (e.g. "REGINA")
+    #   trip_type: 1 (round trip) or 2 (one-way); ticket_option: 1 to 6, in the order of the booking menu
+    #   passengers: 1 to 9; loyalty_program: 0 (none) to 3 (gold)
+    #   bags: list of (weight kg, dimensions cm) pairs
+    # Returns a dict mapping each of LINE_ITEMS to an array of cents with one value per itinerary
+@metrics.timed("pricing")
+def quote_batch(itineraries, fare_matrix=None):
+    if fare_matrix is None:
+        from air_ontario import get_fare_matrix
+        fare_matrix = get_fare_matrix()
+
+    missing = [column for column in ITINERARY_COLUMNS if column not in itineraries]
+    if missing:
+        raise ValueError(f"Missing itinerary columns: {', '.join(missing)}")
+    rows = len(itineraries["origin"])
+    for column in ITINERARY_COLUMNS:
+        if len(itineraries[column]) != rows:
+            raise ValueError(f"Column {column} has {len(itineraries[column])} rows, the origin column has {rows}")
+
+    trip_types = np.asarray(itineraries["trip_type"], dtype=np.int64)
+    ticket_options = np.asarray(itineraries["ticket_option"], dtype=np.int64)
+    passengers = np.asarray(itineraries["passengers"], dtype=np.int64)
+    loyalty_programs = np.asarray(itineraries["loyalty_program"], dtype=np.int64)
+    bags = list(itineraries["bags"])
+    origins, destinations, (owners, weights, dimensions) = validate_itineraries(
+        fare_matrix, list(itineraries["origin"]), list(itineraries["destination"]), trip_types, ticket_options,
+        passengers, loyalty_programs, bags)
+
+    count = len(trip_types)
+    fares = itinerary_fares(fare_matrix, origins, destinations, trip_types, ticket_options)
+    line_items = {
+        "fare": fares,
+        "base_fare": fares * passengers,
+        "luggage": luggage_costs(owners, weights, dimensions, loyalty_programs, ticket_classes(ticket_options)),
+    }
+    for charge in CHARGES:
+        if charge.rate is None:
+            line_items[charge.line_item] = np.full(count, charge.amount, dtype=np.int64)
+        else:
+            base = sum(line_items[item] for item in charge.base)
+            line_items[charge.line_item] = scale(base, charge.rate.numerator, charge.rate.denominator, charge.rounding)
+    line_items["subtotal"] = sum(line_items[item] for item in SUBTOTAL_ITEMS)
+    line_items["grand_total"] = sum(line_items[item] for item in TOTAL_ITEMS)
+    return {item: line_items[item] for item in LINE_ITEMS}
+
+# Prices a single itinerary; returns a dict mapping each of LINE_ITEMS to cents
+def quote(origin, destination, trip_type, ticket_option, passengers, loyalty_program=0, bags=(), fare_matrix=None):
+    line_items = quote_batch({
+        "origin": [origin], "destination": [destination], "trip_type": [trip_type],
+        "ticket_option": [ticket_option], "passengers": [passengers],
+        "loyalty_program": [loyalty_program], "bags": [list(bags)],
+    }, fare_matrix)
+    return {name: int(values[0]) for name, values in line_items.items()}
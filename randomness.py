@@ -0,0 +1,40 @@
+# Shared random generator for Air Ontario
+# Every random value of the program (board columns, schedules, the flight, terminal, times, gate and
+# seat of a boarding pass) is drawn from one NumPy Generator. It is seeded from the operating system
+# by default, so every run is different; a seed makes a run reproducible, e.g. to compare benchmarks.
+#
+#   AIR_ONTARIO_SEED=42 python air_ontario.py        (or python air_ontario.py --seed 42)
+#   with randomness.seeded(42): board = generate_departures_board(1000)
+#
+# Note: booking record locators (ledger.py) are identifiers, not workload, and always come from secrets
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+_generator = np.random.default_rng()
+
+# Returns the generator to use: `rng` if one is passed in, otherwise the shared generator
+def get_rng(rng=None):
+    return _generator if rng is None else rng
+
+# Reseeds the shared generator (None: from the operating system)
+def seed(value=None):
+    global _generator
+    _generator = np.random.default_rng(value)
+
+# Context manager: inside the block, the shared generator is a new generator seeded with `value`
+    # Note: the previous generator (and its state) is restored at the end of the block
+@contextmanager
+def seeded(value):
+    global _generator
+    previous = _generator
+    _generator = np.random.default_rng(value)
+    try:
+        yield _generator
+    finally:
+        _generator = previous
+
+# The seed can be set from the environment, before anything random is drawn
+if os.environ.get("AIR_ONTARIO_SEED"):
+    seed(int(os.environ["AIR_ONTARIO_SEED"]))
@@ -0,0 +1,106 @@
+# Board renderers for Air Ontario
+# Every renderer writes a FlightBoard to a file-like object and is picked by name at runtime:
+#   fancy  the colour coded tabulate fancy_grid table of the kiosk (measures every cell, slow on big boards)
+#   fixed  fixed-width, colour coded columns; the widths come from the board's lookup tables, and the
+#          whole board is written with a single write
+#   csv    comma separated values, streamed row by row
+#   jsonl  one JSON object per row, streamed row by row
+# The machine formats (csv, jsonl) have no colours and are written in chunks of rows taken from the
+# board's columns, so the rows of a large board are never all held in memory at once.
+import csv
+import json
+
+import metrics
+from flight_board import (ARRIVALS, CAROUSELS, GATE_LETTERS, MINUTES_PER_DAY, STATUSES, TERMINALS,
+                          format_gate, format_time)
+from live_board import BOLD, END, SEPARATOR, STATUS_COLORS
+
+# Rows converted to text at a time by the streaming renderers
+CHUNK_ROWS = 4096
+
+# Field names of the machine formats: the board kind ("arrivals" or "departures"), then one per column
+    # Note: time is the ETA (arrivals) or ETD (departures); bay is the carousel or the gate
+FIELDS = ["board", "destination", "code", "flight", "time", "terminal", "bay", "status"]
+
+# Yields the board in chunks of CHUNK_ROWS rows (views of its columns)
+def chunks(board):
+    for start in range(0, len(board), CHUNK_ROWS):
+        yield board.take(slice(start, start + CHUNK_ROWS))
+
+# Yields every row of a board as a list of display values, preceded by the board kind
+def machine_rows(board):
+    for chunk in chunks(board):
+        for row in chunk.rows():
+            yield [board.kind] + row
+
+# Writes the board as the kiosk's colour coded fancy_grid table
+def render_fancy(board, out, header=True):
+    import air_ontario
+    from tabulate import tabulate
+    rows = list(board.rows())
+    with metrics.timer("color_coding"):
+        air_ontario.color_code(rows)
+    out.write(tabulate(rows, headers=air_ontario.bold(board.headers()), tablefmt="fancy_grid",
+                       numalign="center", stralign="center") + "\n")
+
+# Writes the board as fixed-width, colour coded columns, in a single write
+    # header: whether to write the header line and the rule under it
+def render_fixed(board, out, header=True):
+    widths = board.column_widths()
+    city_width, code_width, flight_width, time_width, terminal_width, bay_width, status_width = widths
+    lines = []
+    if header:
+        headers = SEPARATOR.join(text.ljust(width) for text, width in zip(board.headers(), widths))
+        lines += [BOLD + headers + END, "─" * len(headers)]
+
+    # Every value a column can take is padded once; a row is then a few lookups and one join
+    names = [name.ljust(city_width) for name in board.city_names]
+    codes = [code.ljust(code_width) for code in board.city_codes]
+    times = [format_time(minute).ljust(time_width) for minute in range(MINUTES_PER_DAY)]
+    terminals = [terminal.ljust(terminal_width) for terminal in TERMINALS]
+    if board.kind == ARRIVALS:
+        bays = [str(carousel).ljust(bay_width) for carousel in range(CAROUSELS[1])]
+    else:
+        bays = [format_gate(gate).ljust(bay_width) for gate in range(len(GATE_LETTERS) * 100)]
+    # Each status starts its row with its colour
+    statuses = [(STATUS_COLORS[status], name.ljust(status_width) + END) for status, name in enumerate(STATUSES)]
+    for chunk in chunks(board):
+        columns = zip(chunk.city.tolist(), chunk.airline.tolist(), chunk.flight_number.tolist(), chunk.time.tolist(),
+                      chunk.terminal.tolist(), chunk.bay.tolist(), chunk.status.tolist())
+        for city, airline, number, time, terminal, bay, status in columns:
+            color, status_text = statuses[status]
+            lines.append(color + SEPARATOR.join([
+                names[city], codes[city], f"{board.airline_codes[airline]}{number}".ljust(flight_width),
+                times[time], terminals[terminal], bays[bay], status_text]))
+    lines.append("")
+    out.write("\n".join(lines))
+
+# Streams the board as CSV
+    # header: whether to write the FIELDS line first
+def render_csv(board, out, header=True):
+    writer = csv.writer(out, lineterminator="\n")
+    if header:
+        writer.writerow(FIELDS)
+    writer.writerows(machine_rows(board))
+
+# Streams the board as JSON lines (the header argument is ignored: every line holds its field names)
+def render_jsonl(board, out, header=True):
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    for row in machine_rows(board):
+        out.write(encode(dict(zip(FIELDS, row))) + "\n")
+
+RENDERERS = {
+    "fancy": render_fancy,
+    "fixed": render_fixed,
+    "csv": render_csv,
+    "jsonl": render_jsonl,
+}
+# Renderers meant for other programs (no titles, banner or colours around the boards)
+MACHINE_FORMATS = ("csv", "jsonl")
+
+# Returns the renderer with a name
+def get_renderer(name):
+    try:
+        return RENDERERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown renderer: {name!r} (use one of {', '.join(RENDERERS)})") from None
@@ -0,0 +1,231 @@
+# Booking replay runner for Air Ontario
+# Replays recorded booking sessions through the full booking flow (air_ontario.book_flight) without a
+# console: each session's answers come from a ScriptedInput (an input provider, see
+# air_ontario.get_input_provider) and the output goes to a NullSink. Sessions are run in parallel by
+# worker processes, each with its own booking ledger, and the runner reports sessions per second, the
+# latency of each step (answer given -> next prompt shown) and the answers that had to be asked again.
+#
+# Transcripts are JSON lines, one session per line:
+#   {"id": 0, "now": "2026-10-18T09:30:00", "answers": ["Ada", "Lovelace", "2", "hamilton", ...]}
+# `now` (optional) is the time the session is replayed at, so recorded dates stay valid.
+#
+# Usage:
+#   python replay.py --generate 1000 --output sessions.jsonl --invalid-rate 0.05
+#   python replay.py sessions.jsonl --workers 4
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import air_ontario
+import metrics
+
+# Sessions given to a worker at a time
+CHUNK_SIZE = 50
+
+# Discards everything written to it (a file-like object for print)
+class NullSink:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+# Input provider answering from a list of answers, like someone typing them at the console
+    # output: file the prompts are written to (discarded by default)
+    # Note: the time between an answer and the next prompt is recorded in `latencies`
+class ScriptedInput:
+    def __init__(self, answers, output=None):
+        self.answers = list(answers)
+        self.position = 0
+        self.output = output if output is not None else NullSink()
+        self.latencies = []
+        self.answered = None
+
+    def __call__(self, prompt=""):
+        now = time.perf_counter()
+        if self.answered is not None:
+            self.latencies.append(now - self.answered)
+        self.output.write(prompt)
+        if self.position == len(self.answers):
+            raise EOFError("The transcript has no more answers")
+        answer = self.answers[self.position]
+        self.position += 1
+        self.answered = time.perf_counter()
+        return answer
+
+    # Records the latency of the last answer (the flow has finished)
+    def finish(self):
+        if self.answered is not None:
+            self.latencies.append(time.perf_counter() - self.answered)
+            self.answered = None
+
+# Returns the transcripts of a JSONL file
+def load_transcripts(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+# Writes transcripts to a JSONL file
+def write_transcripts(path, transcripts):
+    with open(path, "w") as file:
+        for transcript in transcripts:
+            file.write(json.dumps(transcript) + "\n")
+
+# Returns one complete one-way booking as (answer, invalid answer) pairs; the invalid answer (None
+# when every answer is accepted) is one the flow rejects and asks again
+def booking_answers(rng, now):
+    origin, destination = rng.sample(air_ontario.valid_service_cities, 2)
+    departure = (now + timedelta(days=rng.randint(2, 300))).strftime("%m/%d/%y")
+    package = rng.randint(1, 6)
+    # Connecting packages (even options) are only offered when there is a connecting route
+    if package % 2 == 0 and air_ontario.get_route_graph().route(origin.upper(), destination.upper()) is None:
+        package -= 1
+    bags = rng.randint(0, 3)
+    answers = [("Ada", None), ("Lovelace", None), ("2", "3"), (origin, "Atlantis"), (destination, origin),
+               (departure, "13/45/27"), ("1", "0"), (str(package), "7"), (str(rng.randint(1, 9)), "ten"),
+               (str(rng.randint(0, 3)), "4"), (str(bags), "-1")]
+    for _ in range(bags):
+        answers += [(str(rng.randint(5, 32)), "33"), (str(rng.randint(50, 292)), "300")]
+    return answers + [("Y", "maybe")]
+
+# Returns the answers of one complete one-way booking
+    # invalid_rate: chance of giving an invalid answer first, for each answer that can be invalid
+def random_transcript(rng, now=None, invalid_rate=0.0):
+    now = now or datetime.now()
+    answers = []
+    for answer, invalid in booking_answers(rng, now):
+        if invalid is not None and rng.random() < invalid_rate:
+            answers.append(invalid)
+        answers.append(answer)
+    return answers
+
+# Returns `count` random transcripts, replayed at the current time
+def generate_transcripts(count, seed=None, invalid_rate=0.0):
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    return [{"id": number, "now": now.isoformat(), "answers": random_transcript(rng, now, invalid_rate)}
+            for number in range(count)]
+
+_worker_ledger = None
+
+# Opens the booking ledger of a worker process (one file per process, in `ledger_dir`)
+def init_worker(ledger_dir):
+    global _worker_ledger
+    from ledger import BookingLedger
+    _worker_ledger = BookingLedger(os.path.join(ledger_dir, f"bookings-{os.getpid()}.db"))
+    # Reprompts are counted by the booking flow's metrics (by check)
+    metrics.enable()
+
+# Replays one transcript; returns (step latencies, error message or None)
+def replay_session(transcript, ledger):
+    read = ScriptedInput(transcript["answers"])
+    options = {"ledger": ledger}
+    if transcript.get("now"):
+        now = datetime.fromisoformat(transcript["now"])
+        options["now"] = lambda: now
+    try:
+        session = air_ontario.book_flight(read, NullSink(), **options)
+    except Exception as error:
+        return read.latencies, f"session {transcript.get('id')}: {type(error).__name__}: {error}"
+    if session.error is not None:
+        error = session.error
+        return read.latencies, f"session {transcript.get('id')}: {type(error).__name__}: {error}"
+    read.finish()
+    return read.latencies, None
+
+# Replays a list of transcripts in a worker; returns a dict of results
+def replay_chunk(transcripts):
+    metrics.reset()
+    latencies, errors = [], []
+    for transcript in transcripts:
+        session_latencies, error = replay_session(transcript, _worker_ledger)
+        latencies += session_latencies
+        if error is not None:
+            errors.append(error)
+    reprompts = {counter["labels"]["check"]: counter["value"]
+                 for counter in metrics.snapshot()["counters"] if counter["name"] == "reprompts"}
+    return {"sessions": len(transcripts), "latencies": latencies, "errors": errors, "reprompts": reprompts}
+
+# Replays every transcript across worker processes; returns (elapsed seconds, merged results)
+    # workers: processes (default: one per CPU); 1 replays in this process
+    # ledger_dir: where the workers' ledgers are written (default: a temporary directory)
+def replay(transcripts, workers=None, ledger_dir=None, chunk_size=CHUNK_SIZE):
+    temporary = None
+    if ledger_dir is None:
+        temporary = tempfile.TemporaryDirectory()
+        ledger_dir = temporary.name
+    chunks = [transcripts[i:i + chunk_size] for i in range(0, len(transcripts), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    try:
+        if workers == 1:
+            init_worker(ledger_dir)
+            results = [replay_chunk(chunk) for chunk in chunks]
+            _worker_ledger.close()
+        else:
+            # Load the fare matrix once, so the workers find it in the cache
+            air_ontario.get_fare_matrix()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(ledger_dir,)) as executor:
+                results = list(executor.map(replay_chunk, chunks))
+        elapsed = time.perf_counter() - start
+    finally:
+        if temporary is not None:
+            temporary.cleanup()
+
+    merged = {"sessions": 0, "latencies": [], "errors": [], "reprompts": {}}
+    for result in results:
+        merged["sessions"] += result["sessions"]
+        merged["latencies"] += result["latencies"]
+        merged["errors"] += result["errors"]
+        for check, value in result["reprompts"].items():
+            merged["reprompts"][check] = merged["reprompts"].get(check, 0) + value
+    return elapsed, merged
+
+# Returns a percentile of a list of values
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Air Ontario booking replay runner")
+    parser.add_argument("transcripts", nargs="?", help="JSONL file of recorded sessions")
+    parser.add_argument("--generate", type=int, metavar="SESSIONS", help="generate random sessions instead")
+    parser.add_argument("--output", help="with --generate, write the sessions to this file instead of replaying them")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="with --generate, chance of an invalid answer")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--ledger-dir", help="keep the replayed bookings in this directory (default: discard them)")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        transcripts = generate_transcripts(args.generate, args.seed, args.invalid_rate)
+        if args.output:
+            write_transcripts(args.output, transcripts)
+            print(f"{len(transcripts)} sessions written to {args.output}")
+            return
+    elif args.transcripts:
+        transcripts = load_transcripts(args.transcripts)
+    else:
+        parser.error("give a transcripts file or --generate")
+
+    elapsed, results = replay(transcripts, args.workers, args.ledger_dir)
+    latencies, errors = results["latencies"], results["errors"]
+    completed = results["sessions"] - len(errors)
+    print(f"{results['sessions']} sessions, {completed} completed, {len(errors)} failed, {len(latencies)} steps")
+    print(f"sessions/s: {completed / elapsed:,.1f}")
+    if latencies:
+        print(f"step latency: p50 {statistics.median(latencies) * 1000:.3f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.3f} ms, max {max(latencies) * 1000:.3f} ms")
+    reprompts = results["reprompts"]
+    details = ", ".join(f"{check} {value}" for check, value in sorted(reprompts.items()))
+    print(f"reprompts: {sum(reprompts.values())}" + (f" ({details})" if details else ""))
+    for error in errors[:10]:
+        print(error)
+
+if __name__ == "__main__":
+    main()
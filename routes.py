@@ -0,0 +1,193 @@
+# Connecting routes for Air Ontario
+# A route graph over the airports of a FareMatrix, weighted by the same geodesic distances used for
+# pricing. One-stop routes are ranked over every airport with a single vectorized pass over two
+# rows of the distance matrix; two-stop routes go through a set of hubs, whose hub-to-hub distances
+# are precomputed when the graph is built. Answers are cached, so a repeated query is a dict lookup.
+# A route may not be more than MAX_DETOUR times as long as the direct flight, so a connection never
+# backtracks, and its fare is capped at the connecting share of the direct fare.
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from fare_matrix import PACKAGES, fares_from_distance, fares_from_scalar_distance
+
+# Airports used as the middle stops of two-stop routes (when no hubs are given)
+DEFAULT_HUB_COUNT = 32
+# Routes answered from the cache before the least recently used ones are dropped
+DEFAULT_CACHE_SIZE = 4096
+# Routes returned by default
+DEFAULT_ROUTE_COUNT = 3
+# Longest route allowed, as a multiple of the direct distance
+MAX_DETOUR = 1.5
+# Fare of a connecting option when there is no connecting route
+NO_FARE = -1
+
+# Positions of the direct and connecting ticket options in a row of fares
+DIRECT_OPTIONS = [i for i, (package, _) in enumerate(PACKAGES) if package == "Direct"]
+CONNECTING_OPTIONS = [i for i, (package, _) in enumerate(PACKAGES) if package == "Connecting"]
+
+# A route: the airports flown through (origin first, destination last) and the total distance (km)
+class Route(namedtuple("Route", ["stops", "distance_km"])):
+    __slots__ = ()
+
+    # Airports where the passenger connects
+    @property
+    def via(self):
+        return self.stops[1:-1]
+
+    def __str__(self):
+        return " -> ".join(self.stops)
+
+# Connecting routes between the airports of a fare matrix
+class RouteGraph:
+    # hubs: airport names allowed as the middle stops of two-stop routes (default: the most central airports)
+    # max_leg_km: longest leg flown (default: no limit); longer legs are not part of the graph
+    # max_detour: longest route, as a multiple of the direct distance (None: no limit)
+    def __init__(self, fare_matrix, hubs=None, hub_count=DEFAULT_HUB_COUNT, max_leg_km=None,
+                 max_detour=MAX_DETOUR, cache_size=DEFAULT_CACHE_SIZE):
+        self.fare_matrix = fare_matrix
+        self.names = fare_matrix.names
+        self.distances = fare_matrix.distances
+        self.max_leg_km = max_leg_km
+        self.max_detour = max_detour
+        if hubs is None:
+            self.hubs = self.central_airports(hub_count)
+        else:
+            self.hubs = np.array([fare_matrix.position(hub) for hub in hubs], dtype=np.intp)
+        # Hub to hub legs, computed once
+        self.hub_legs = self.legs(self.distances[np.ix_(self.hubs, self.hubs)])
+        np.fill_diagonal(self.hub_legs, np.inf)
+        # Answers of routes(), by (origin, destination, count, max_stops)
+        self.cached_routes = lru_cache(maxsize=cache_size)(self.find_routes)
+
+    def __len__(self):
+        return len(self.names)
+
+    # Returns the distances with the legs that cannot be flown set to infinity
+    def legs(self, distances):
+        legs = np.array(distances, dtype=np.float64)
+        if self.max_leg_km is not None:
+            legs[legs > self.max_leg_km] = np.inf
+        return legs
+
+    # Returns the positions of the `count` airports closest to all others (on average)
+    def central_airports(self, count):
+        count = min(count, len(self.names))
+        if self.max_leg_km is None:
+            total = np.asarray(self.distances).sum(axis=1)
+        else:
+            # With a range limit, the best hubs are the ones most airports can reach
+            total = -(np.asarray(self.distances) <= self.max_leg_km).sum(axis=1)
+        return np.sort(np.argpartition(total, count - 1)[:count]) if count else np.array([], dtype=np.intp)
+
+    # Returns the legs from an airport to every airport (the matrix is symmetric, so this also
+    # gives the legs from every airport to it)
+    def legs_from(self, position):
+        legs = self.legs(self.distances[position])
+        legs[position] = np.inf
+        return legs
+
+    # Returns the indexes of the `count` smallest finite totals, smallest first
+    @staticmethod
+    def best(totals, count):
+        count = min(count, np.isfinite(totals).sum())
+        if count == 0:
+            return np.array([], dtype=np.intp)
+        best = np.argpartition(totals, count - 1)[:count]
+        return best[np.argsort(totals[best], kind="stable")]
+
+    # Returns the shortest one-stop routes no longer than `limit` km, as (distance, (via,)) pairs of positions
+    def one_stop(self, origin, destination, from_origin, to_destination, count, limit):
+        totals = from_origin + to_destination
+        totals[[origin, destination]] = np.inf
+        totals[totals > limit] = np.inf
+        return [(float(totals[via]), (int(via),)) for via in self.best(totals, count)]
+
+    # Returns the shortest two-stop routes through the hubs no longer than `limit` km, as
+    # (distance, (via, via)) pairs of positions
+    def two_stop(self, origin, destination, from_origin, to_destination, count, limit):
+        hubs = self.hubs
+        totals = from_origin[hubs][:, None] + self.hub_legs + to_destination[hubs][None, :]
+        # Neither stop may be the origin or the destination
+        endpoints = np.isin(hubs, (origin, destination))
+        totals[endpoints, :] = np.inf
+        totals[:, endpoints] = np.inf
+        totals[totals > limit] = np.inf
+        hub_count = len(hubs)
+        return [(float(totals.flat[flat]), (int(hubs[flat // hub_count]), int(hubs[flat % hub_count])))
+                for flat in self.best(totals.ravel(), count)]
+
+    # Finds the shortest connecting routes (uncached); see routes()
+    def find_routes(self, origin, destination, count, max_stops):
+        origin_position = self.fare_matrix.position(origin)
+        destination_position = self.fare_matrix.position(destination)
+        if origin_position == destination_position:
+            return ()
+        from_origin = self.legs_from(origin_position)
+        to_destination = self.legs_from(destination_position)
+        limit = np.inf
+        if self.max_detour is not None:
+            limit = float(self.distances[origin_position, destination_position]) * self.max_detour
+
+        found = self.one_stop(origin_position, destination_position, from_origin, to_destination, count, limit)
+        if max_stops >= 2 and len(self.hubs) > 1:
+            found += self.two_stop(origin_position, destination_position, from_origin, to_destination, count, limit)
+        found.sort(key=lambda route: route[0])
+        return tuple(Route((origin, *(self.names[via] for via in stops), destination), distance)
+                     for distance, stops in found[:count])
+
+    # Returns the `count` shortest connecting routes with one or two stops (up to max_stops), shortest first
+    # Note: routes longer than max_detour times the direct distance are never returned
+    def routes(self, origin, destination, count=DEFAULT_ROUTE_COUNT, max_stops=2):
+        return self.cached_routes(origin, destination, count, max_stops)
+
+    # Returns the shortest connecting route, or None if there is none
+    def route(self, origin, destination):
+        routes = self.routes(origin, destination, 1)
+        return routes[0] if routes else None
+
+    # Returns the distance (km) of the shortest connecting route (infinity if there is none)
+    def connecting_distance(self, origin, destination):
+        route = self.route(origin, destination)
+        return route.distance_km if route is not None else float("inf")
+
+    # Returns the one-way fare (cents) of every ticket option (in PACKAGES order) between two airports
+    # Direct fares are priced on the direct distance, connecting fares on the distance of the shortest
+    # connecting route, capped at the connecting share of the direct fare (NO_FARE when there is no
+    # connecting route)
+    def fares(self, origin, destination):
+        fares = self.fare_matrix.fares(origin, destination)
+        distance = self.connecting_distance(origin, destination)
+        if np.isfinite(distance):
+            connecting = fares_from_scalar_distance(distance)
+            for option in CONNECTING_OPTIONS:
+                fares[option] = min(fares[option], connecting[option])
+        else:
+            for option in CONNECTING_OPTIONS:
+                fares[option] = NO_FARE
+        return fares
+
+    # Returns a (len(origins), 6) array of one-way fares (cents) for arrays of airport positions, like fares()
+    def fare_table(self, origins, destinations):
+        origins, destinations = np.asarray(origins), np.asarray(destinations)
+        table = self.fare_matrix.fare_table(origins, destinations)
+        # Each distinct pair is routed once (and usually comes from the cache)
+        pairs, inverse = np.unique(np.stack([origins, destinations]), axis=1, return_inverse=True)
+        distances = np.array([self.connecting_distance(self.names[origin], self.names[destination])
+                              for origin, destination in pairs.T], dtype=np.float64)
+        routed = np.isfinite(distances)
+        connecting = fares_from_distance(np.where(routed, distances, 0))[np.ravel(inverse)][:, CONNECTING_OPTIONS]
+        # Capped at the connecting share of the direct fare
+        connecting = np.minimum(connecting, table[:, CONNECTING_OPTIONS])
+        connecting[~routed[np.ravel(inverse)]] = NO_FARE
+        table[:, CONNECTING_OPTIONS] = connecting
+        return table
+
+# Returns the route graph of a fare matrix, building it the first time
+    # Note: the graph is kept on the matrix, so it is dropped together with the matrix
+def route_graph(fare_matrix):
+    graph = fare_matrix.route_graph
+    if graph is None:
+        graph = fare_matrix.route_graph = RouteGraph(fare_matrix)
+    return graph
@@ -0,0 +1,133 @@
+# Flight schedules for Air Ontario
+# A schedule holds the arrivals (or departures) of one or more days. ETA/ETD are stored as integer
+# minutes since midnight of the first day, in an int32 array kept sorted, so a time window is two
+# binary searches and a slice. Each terminal also keeps its own sorted copy of the times, and the
+# status (which changes during the day) is filtered on the window only. The binary searches use
+# bisect on plain lists of the times, which is several times faster than np.searchsorted for a
+# single value.
+#
+# Example: departures in the next 90 minutes from terminal T2
+#   schedule.next(now, 90, terminal="T2")
+# Example: delayed arrivals after 18:00 on the 5th of January
+#   schedule.window("01/05/27 18:00", "01/06/27", status="Delayed")
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+import flight_board
+from flight_board import MINUTES_PER_DAY, STATUSES, TERMINALS
+
+# Date formats accepted by the queries (the booking menu's MM/DD/YY, with an optional time)
+DATE_FORMAT = "%m/%d/%y"
+DATE_TIME_FORMAT = "%m/%d/%y %H:%M"
+
+# Returns the datetime of a "MM/DD/YY" or "MM/DD/YY HH:MM" string (strptime is slow, so the last
+# strings parsed are cached)
+@lru_cache(maxsize=1024)
+def parse_text(text):
+    try:
+        return datetime.strptime(text, DATE_TIME_FORMAT)
+    except ValueError:
+        return datetime.strptime(text, DATE_FORMAT)
+
+# Returns a datetime for a datetime, a date (midnight) or a "MM/DD/YY" / "MM/DD/YY HH:MM" string
+def parse_when(when):
+    if isinstance(when, datetime):
+        return when
+    if isinstance(when, date):
+        return datetime(when.year, when.month, when.day)
+    return parse_text(when)
+
+# Returns the code of a terminal ("T2" or 1) or a status ("Delayed" or 1)
+def lookup_code(value, names, kind):
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    try:
+        return names.index(value)
+    except ValueError:
+        raise ValueError(f"Unknown {kind}: {value!r}") from None
+
+# The flights of a board over one or more days, sorted by time
+class Schedule:
+    # board: a FlightBoard; day: the day of each row (0 is start_date)
+    def __init__(self, board, start_date, day):
+        self.start_date = parse_when(start_date).replace(hour=0, minute=0, second=0, microsecond=0)
+        minutes = np.asarray(day, dtype=np.int32) * MINUTES_PER_DAY + board.time.astype(np.int32)
+        order = np.argsort(minutes, kind="stable")
+        self.board = board.take(order)
+        self.minutes = minutes[order]
+        self.days = int(self.minutes[-1] // MINUTES_PER_DAY) + 1 if len(self.minutes) else 0
+        # Time index: the sorted times as a list, for bisect
+        self.minute_index = self.minutes.tolist()
+        # Terminal index: the rows of each terminal and their (sorted) times
+        self.terminal_rows = [np.flatnonzero(self.board.terminal == terminal) for terminal in range(len(TERMINALS))]
+        self.terminal_index = [self.minutes[rows].tolist() for rows in self.terminal_rows]
+
+    def __len__(self):
+        return len(self.minutes)
+
+    @property
+    def kind(self):
+        return self.board.kind
+
+    # Returns a time as minutes since midnight of the first day (schedule minutes are returned as is)
+    def minute(self, when):
+        if isinstance(when, (int, np.integer)):
+            return int(when)
+        delta = parse_when(when) - self.start_date
+        return delta.days * MINUTES_PER_DAY + delta.seconds // 60
+
+    # Returns the date and time of a schedule minute
+    def when(self, minute):
+        return self.start_date + timedelta(minutes=int(minute))
+
+    # Returns the rows (sorted by time) scheduled from `start` up to, but not including, `end`
+        # start, end: datetimes, dates, "MM/DD/YY [HH:MM]" strings or schedule minutes; None for no bound
+        # terminal: "T1" to "T3" (or its index); status: one of STATUSES (or its code)
+    def window(self, start=None, end=None, terminal=None, status=None):
+        terminal = lookup_code(terminal, TERMINALS, "terminal")
+        status = lookup_code(status, STATUSES, "status")
+        if terminal is None:
+            rows, minutes = None, self.minute_index
+        else:
+            rows, minutes = self.terminal_rows[terminal], self.terminal_index[terminal]
+
+        first = 0 if start is None else bisect_left(minutes, self.minute(start))
+        last = len(minutes) if end is None else bisect_left(minutes, self.minute(end))
+        if rows is None:
+            rows = np.arange(first, max(first, last))
+        else:
+            rows = rows[first:last]
+        if status is not None:
+            rows = rows[self.board.status[rows] == status]
+        return rows
+
+    # Returns the rows scheduled in the `minutes` minutes after `now`
+    def next(self, now, minutes, terminal=None, status=None):
+        start = self.minute(now)
+        return self.window(start, start + minutes, terminal, status)
+
+    # Returns the rows scheduled at or after a time
+    def after(self, when, terminal=None, status=None):
+        return self.window(when, None, terminal, status)
+
+    # Returns the rows of a whole day
+    def on(self, day, terminal=None, status=None):
+        start = self.minute(parse_when(day).replace(hour=0, minute=0))
+        return self.window(start, start + MINUTES_PER_DAY, terminal, status)
+
+    # Returns the rows as a FlightBoard (e.g. to display them)
+    def view(self, rows):
+        return self.board.take(rows)
+
+# Generates a schedule of `per_day` flights a day for `days` days
+    # destinations: list of [city name, airport code] pairs; airline_codes: flight prefixes
+    # per_day: flights per day (default: one per destination); destinations are sampled
+def generate_schedule(kind, destinations, airline_codes, start_date, days=1, per_day=None, rng=None):
+    if per_day is None:
+        per_day = len(destinations)
+    board = flight_board.generate_board(kind, destinations, airline_codes, size=per_day * days, rng=rng)
+    day = np.repeat(np.arange(days, dtype=np.int32), per_day)
+    return Schedule(board, start_date, day)
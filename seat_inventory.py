@@ -0,0 +1,192 @@
+# Seat inventory for Air Ontario
+# Every flight has 180 seats (rows 1 to 30, seats A to F). The seats taken on a flight are kept as
+# a single 180-bit integer (bit = (row - 1) * 6 + seat letter), so a flight costs a few dozen
+# bytes and finding a free seat, or a block of adjacent free seats, is a handful of bit operations.
+# Flights with no bookings are not stored at all.
+import threading
+
+ROWS = 30
+SEATS_PER_ROW = 6
+SEAT_LETTERS = "ABCDEF"
+# Seats A-C and D-F are on either side of the aisle
+AISLE_AFTER = 3
+SEAT_COUNT = ROWS * SEATS_PER_ROW
+
+# Rows of each cabin (inclusive)
+CABINS = {
+    "First": (1, 2),
+    "Business": (3, 7),
+    "Economy": (8, 30),
+}
+
+# Number of locks shared by all flights (a lock per flight would cost more than the seat map)
+LOCK_STRIPES = 64
+
+# Returns the bits of every seat in a range of rows (inclusive)
+def rows_mask(first_row, last_row):
+    return ((1 << ((last_row - first_row + 1) * SEATS_PER_ROW)) - 1) << ((first_row - 1) * SEATS_PER_ROW)
+
+CABIN_MASKS = {cabin: rows_mask(*rows) for cabin, rows in CABINS.items()}
+
+# Returns the bits where a block of `size` adjacent seats can start without leaving its row
+    # same_side: the block must also stay on one side of the aisle
+def block_starts(size, same_side=False):
+    mask = 0
+    for bit in range(SEAT_COUNT):
+        column = bit % SEATS_PER_ROW
+        if same_side:
+            side_end = AISLE_AFTER if column < AISLE_AFTER else SEATS_PER_ROW
+            fits = column + size <= side_end
+        else:
+            fits = column + size <= SEATS_PER_ROW
+        if fits:
+            mask |= 1 << bit
+    return mask
+
+# Block starts for every block size that fits in a row (index = size)
+ROW_BLOCK_STARTS = [0] + [block_starts(size) for size in range(1, SEATS_PER_ROW + 1)]
+SIDE_BLOCK_STARTS = [0] + [block_starts(size, same_side=True) for size in range(1, AISLE_AFTER + 1)]
+
+# Returns the seat label (e.g. "12C") of a bit
+def seat_label(bit):
+    return f"{bit // SEATS_PER_ROW + 1}{SEAT_LETTERS[bit % SEATS_PER_ROW]}"
+
+# Returns the bit of a seat label
+def seat_bit(label):
+    row, letter = int(label[:-1]), label[-1].upper()
+    if not 1 <= row <= ROWS or letter not in SEAT_LETTERS:
+        raise ValueError(f"Unknown seat: {label!r}")
+    return (row - 1) * SEATS_PER_ROW + SEAT_LETTERS.index(letter)
+
+# Returns the labels of every bit set in a mask, front to back
+def mask_labels(mask):
+    labels = []
+    while mask:
+        bit = mask & -mask
+        labels.append(seat_label(bit.bit_length() - 1))
+        mask ^= bit
+    return labels
+
+# Returns seat labels grouped by row, e.g. ["10A", "10B", "10C", "11A"] -> "10A-C, 11A"
+def format_seats(labels):
+    rows = {}
+    for label in labels:
+        rows.setdefault(int(label[:-1]), []).append(label[-1])
+    groups = []
+    for row, letters in rows.items():
+        letters = sorted(letters)
+        contiguous = "".join(letters) in SEAT_LETTERS
+        if len(letters) > 1 and contiguous:
+            groups.append(f"{row}{letters[0]}-{letters[-1]}")
+        else:
+            groups.extend(f"{row}{letter}" for letter in letters)
+    return ", ".join(groups)
+
+# Returns the bits where `size` adjacent free seats start
+def free_runs(free, size):
+    runs = free
+    for shift in range(1, size):
+        runs &= free >> shift
+    return runs
+
+# Picks `size` free seats out of `free`, as close together as possible; returns their mask, or 0
+def pick_block(free, size):
+    if size <= 0 or free.bit_count() < size:
+        return 0
+    # 1. Adjacent seats on the same side of the aisle, then anywhere in one row
+    for starts in (SIDE_BLOCK_STARTS, ROW_BLOCK_STARTS):
+        if size < len(starts):
+            runs = free_runs(free, size) & starts[size]
+            if runs:
+                start = (runs & -runs).bit_length() - 1
+                return ((1 << size) - 1) << start
+    # 2. The fewest consecutive rows holding enough free seats
+    row_mask = (1 << SEATS_PER_ROW) - 1
+    free_per_row = [((free >> (row * SEATS_PER_ROW)) & row_mask).bit_count() for row in range(ROWS)]
+    for row_count in range(2, ROWS + 1):
+        for first in range(ROWS - row_count + 1):
+            if sum(free_per_row[first:first + row_count]) >= size:
+                window = free & rows_mask(first + 1, first + row_count)
+                return lowest_bits(window, size)
+    return 0
+
+# Returns a mask of the `count` lowest bits set in mask
+def lowest_bits(mask, count):
+    picked = 0
+    for _ in range(count):
+        bit = mask & -mask
+        picked |= bit
+        mask ^= bit
+    return picked
+
+# Seat maps of many flights
+class SeatInventory:
+    def __init__(self):
+        # Flight key -> taken seats (flights without bookings have no entry)
+        self.taken = {}
+        self.locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    # Returns the lock guarding a flight
+    def lock(self, flight):
+        return self.locks[hash(flight) % LOCK_STRIPES]
+
+    # Returns the free seats of a cabin on a flight, as a mask
+    def free_mask(self, flight, cabin):
+        try:
+            cabin_mask = CABIN_MASKS[cabin]
+        except KeyError:
+            raise ValueError(f"Unknown cabin: {cabin!r}") from None
+        return cabin_mask & ~self.taken.get(flight, 0)
+
+    # Returns the number of free seats in a cabin
+    def available(self, flight, cabin):
+        return self.free_mask(flight, cabin).bit_count()
+
+    # Returns whether a cabin is full
+    def is_full(self, flight, cabin):
+        return self.free_mask(flight, cabin) == 0
+
+    # Returns whether a seat is taken
+    def is_taken(self, flight, seat):
+        return bool(self.taken.get(flight, 0) >> seat_bit(seat) & 1)
+
+    # Takes one free seat in a cabin; returns its label, or None if the cabin is full
+    def allocate(self, flight, cabin):
+        seats = self.allocate_block(flight, cabin, 1)
+        return seats[0] if seats else None
+
+    # Takes `count` free seats in a cabin, next to each other when possible
+    # Returns their labels, or None (and takes nothing) if the cabin has fewer free seats
+    def allocate_block(self, flight, cabin, count):
+        with self.lock(flight):
+            picked = pick_block(self.free_mask(flight, cabin), count)
+            if not picked:
+                return None
+            self.taken[flight] = self.taken.get(flight, 0) | picked
+        return mask_labels(picked)
+
+    # Takes a specific seat; returns False if it was already taken
+    def reserve(self, flight, seat):
+        bit = 1 << seat_bit(seat)
+        with self.lock(flight):
+            taken = self.taken.get(flight, 0)
+            if taken & bit:
+                return False
+            self.taken[flight] = taken | bit
+        return True
+
+    # Frees seats (releasing a free seat does nothing)
+    def release(self, flight, *seats):
+        mask = 0
+        for seat in seats:
+            mask |= 1 << seat_bit(seat)
+        with self.lock(flight):
+            taken = self.taken.get(flight, 0) & ~mask
+            if taken:
+                self.taken[flight] = taken
+            else:
+                self.taken.pop(flight, None)
+
+    # Returns the labels of the taken seats of a flight
+    def taken_seats(self, flight):
+        return mask_labels(self.taken.get(flight, 0))
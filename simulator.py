@@ -0,0 +1,227 @@
+# Day-of-operations simulator for Air Ontario
+# Simulates the flights of the service cities over one or more days. Each aircraft flies a rotation
+# of legs a day, and every leg goes through the status lifecycle of the boards (Ontime -> Delayed ->
+# Departed -> Arrived, or Canceled). A leg that arrives late delays the next leg of the same aircraft
+# when the turnaround slack cannot absorb it, so delays propagate along the rotation.
+#
+# Only aircraft rotations carry delays from one flight to the next. Passenger connections are not
+# modelled: no flight is held for connecting passengers, and missed connections are not counted.
+#
+# Rotations never share aircraft, so the fleet is split into shards that are simulated in parallel
+# by a ProcessPoolExecutor. Each shard has its own seed (spawned from the simulation seed), so the
+# results depend on the seed and the number of shards only, never on the number of workers.
+#
+# Usage:
+#   python simulator.py --days 7 --flights 10000 --seed 1
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from flight_board import ARRIVALS, ARRIVED, CANCELED, DELAYED, DEPARTED, ONTIME
+
+# Schedule
+LEGS_PER_AIRCRAFT = 5
+FIRST_DEPARTURE = (6 * 60, 8 * 60)
+MIN_TURNAROUND = 40
+MAX_TURNAROUND_SLACK = 45
+# Block time: taxi time plus the distance at cruise speed
+TAXI_MINUTES = 30
+CRUISE_KMH = 800
+
+# Disruptions
+PRIMARY_DELAY_CHANCE = 0.2
+PRIMARY_DELAY_MEAN = 30
+AIRBORNE_VARIATION = 6
+MAX_EARLY_ARRIVAL = 15
+CANCEL_CHANCE = 0.01
+# Flights delayed more than this (minutes) are canceled
+MAX_DELAY = 240
+# A flight is on time when it arrives less than this late (the usual A15 measure)
+ON_TIME_MINUTES = 15
+# Minutes before the scheduled departure when a delay or a cancellation is announced
+NOTICE_MINUTES = 60
+
+DEFAULT_SHARDS = 16
+
+# Columns of a simulation, one value per flight
+COLUMNS = ["day", "aircraft", "leg", "origin", "destination", "scheduled_departure", "scheduled_arrival",
+           "primary_delay", "departure_delay", "arrival_delay", "canceled"]
+
+# Returns the block time (minutes) between every pair of airports
+def block_minutes(distances):
+    return np.rint(TAXI_MINUTES + np.asarray(distances) / CRUISE_KMH * 60).astype(np.int32)
+
+# Simulates the rotations of `aircraft` aircraft for `days` days; returns a dict of COLUMNS arrays
+    # blocks: block time matrix; first_aircraft: number of the first aircraft of the shard
+def simulate_shard(blocks, aircraft, days, seed, first_aircraft=0):
+    rng = np.random.default_rng(seed)
+    airports = len(blocks)
+    rows = days * aircraft
+    shape = (rows, LEGS_PER_AIRCRAFT)
+    origin = np.empty(shape, dtype=np.int16)
+    destination = np.empty(shape, dtype=np.int16)
+    scheduled_departure = np.empty(shape, dtype=np.int32)
+    scheduled_arrival = np.empty(shape, dtype=np.int32)
+    primary_delay = np.empty(shape, dtype=np.int32)
+    departure_delay = np.empty(shape, dtype=np.int32)
+    arrival_delay = np.empty(shape, dtype=np.int32)
+    canceled = np.empty(shape, dtype=bool)
+
+    # Every aircraft is simulated one leg at a time, all aircraft (and days) at once
+    for leg in range(LEGS_PER_AIRCRAFT):
+        if leg == 0:
+            origin[:, 0] = rng.integers(0, airports, rows)
+            scheduled_departure[:, 0] = rng.integers(*FIRST_DEPARTURE, rows)
+            propagated = np.zeros(rows, dtype=np.int32)
+        else:
+            origin[:, leg] = destination[:, leg - 1]
+            slack = rng.integers(0, MAX_TURNAROUND_SLACK + 1, rows)
+            scheduled_departure[:, leg] = scheduled_arrival[:, leg - 1] + MIN_TURNAROUND + slack
+            # The late arrival of the previous leg eats the slack first; a canceled leg is covered
+            # by a spare aircraft, so it does not delay the next one
+            propagated = np.where(canceled[:, leg - 1], 0, np.maximum(arrival_delay[:, leg - 1] - slack, 0))
+        destination[:, leg] = (origin[:, leg] + rng.integers(1, airports, rows)) % airports
+        scheduled_arrival[:, leg] = scheduled_departure[:, leg] + blocks[origin[:, leg], destination[:, leg]]
+
+        primary = np.where(rng.random(rows) < PRIMARY_DELAY_CHANCE,
+                           np.rint(rng.exponential(PRIMARY_DELAY_MEAN, rows)), 0).astype(np.int32)
+        delay = np.maximum(primary, propagated)
+        airborne = np.rint(rng.normal(0, AIRBORNE_VARIATION, rows)).astype(np.int32)
+        primary_delay[:, leg] = primary
+        departure_delay[:, leg] = delay
+        arrival_delay[:, leg] = np.maximum(delay + airborne, -MAX_EARLY_ARRIVAL)
+        canceled[:, leg] = (rng.random(rows) < CANCEL_CHANCE) | (delay > MAX_DELAY)
+
+    day = np.repeat(np.arange(days, dtype=np.int16), aircraft)
+    aircraft_number = np.tile(np.arange(first_aircraft, first_aircraft + aircraft, dtype=np.int32), days)
+    return {
+        "day": np.repeat(day, LEGS_PER_AIRCRAFT),
+        "aircraft": np.repeat(aircraft_number, LEGS_PER_AIRCRAFT),
+        "leg": np.tile(np.arange(LEGS_PER_AIRCRAFT, dtype=np.int8), rows),
+        "origin": origin.ravel(),
+        "destination": destination.ravel(),
+        "scheduled_departure": scheduled_departure.ravel(),
+        "scheduled_arrival": scheduled_arrival.ravel(),
+        "primary_delay": primary_delay.ravel(),
+        "departure_delay": departure_delay.ravel(),
+        "arrival_delay": arrival_delay.ravel(),
+        "canceled": canceled.ravel(),
+    }
+
+# Runs simulate_shard with its arguments packed in a tuple (for ProcessPoolExecutor.map)
+def run_shard(arguments):
+    return simulate_shard(*arguments)
+
+# The flights of a simulation, column by column
+class Simulation:
+    def __init__(self, names, days, columns):
+        self.names = names
+        self.days = days
+        for column in COLUMNS:
+            setattr(self, column, columns[column])
+
+    def __len__(self):
+        return len(self.day)
+
+    # Returns the statuses (flight_board codes) of the flights of a day at a minute of that day
+        # kind: flight_board.DEPARTURES (Departed once in the air) or ARRIVALS (Arrived once landed)
+    def statuses_at(self, day, minute, kind=ARRIVALS):
+        flights = self.day == day
+        departure = self.scheduled_departure[flights]
+        notice = departure - NOTICE_MINUTES
+        delayed = self.departure_delay[flights] >= ON_TIME_MINUTES
+        statuses = np.full(len(departure), ONTIME, dtype=np.int8)
+        statuses[delayed & (minute >= notice)] = DELAYED
+        statuses[minute >= departure + self.departure_delay[flights]] = DEPARTED
+        if kind == ARRIVALS:
+            statuses[minute >= self.scheduled_arrival[flights] + self.arrival_delay[flights]] = ARRIVED
+        statuses[self.canceled[flights] & (minute >= notice)] = CANCELED
+        return statuses
+
+    # Returns the aggregate statistics of the flights selected by a mask (all flights by default)
+    def stats(self, selected=None):
+        if selected is None:
+            selected = np.ones(len(self), dtype=bool)
+        flights = int(selected.sum())
+        operated = selected & ~self.canceled
+        operated_count = int(operated.sum())
+        on_time = int((operated & (self.arrival_delay < ON_TIME_MINUTES)).sum())
+        departure_delay = np.maximum(self.departure_delay[operated], 0)
+        # Delay minutes beyond the flight's own (primary) delay came from the previous leg
+        propagated = departure_delay - np.minimum(self.primary_delay[operated], departure_delay)
+        return {
+            "flights": flights,
+            "on_time": on_time,
+            "delayed": operated_count - on_time,
+            "canceled": flights - operated_count,
+            "on_time_rate": on_time / flights if flights else 0.0,
+            "delay_rate": (operated_count - on_time) / flights if flights else 0.0,
+            "cancel_rate": (flights - operated_count) / flights if flights else 0.0,
+            "mean_departure_delay": float(departure_delay.mean()) if operated_count else 0.0,
+            "p90_departure_delay": float(np.percentile(departure_delay, 90)) if operated_count else 0.0,
+            "propagated_delay_share": float(propagated.sum() / departure_delay.sum()) if departure_delay.sum() else 0.0,
+        }
+
+    # Returns the statistics of each day
+    def daily_stats(self):
+        return [self.stats(self.day == day) for day in range(self.days)]
+
+# Simulates `days` days of about `daily_flights` flights between the airports of a fare matrix
+    # seed: the same seed (and number of shards) always gives the same flights
+    # workers: processes used (default: one per CPU); 1 runs every shard in this process
+def simulate(days=7, daily_flights=10000, seed=None, workers=None, shards=DEFAULT_SHARDS, fare_matrix=None):
+    if fare_matrix is None:
+        from air_ontario import get_fare_matrix
+        fare_matrix = get_fare_matrix()
+    blocks = block_minutes(fare_matrix.distances)
+    fleet = -(-daily_flights // LEGS_PER_AIRCRAFT)
+    if fleet <= 0:
+        # No aircraft, no flights (and nothing to split into shards)
+        return Simulation(fare_matrix.names, days, simulate_shard(blocks, 0, days, seed))
+    shard_sizes = [len(part) for part in np.array_split(np.arange(fleet), min(shards, fleet))]
+    seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+    first_aircraft = np.cumsum([0] + shard_sizes[:-1])
+    arguments = [(blocks, size, days, shard_seed, int(first))
+                 for size, shard_seed, first in zip(shard_sizes, seeds, first_aircraft)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(arguments) == 1:
+        results = [run_shard(argument) for argument in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(arguments))) as executor:
+            results = list(executor.map(run_shard, arguments))
+    columns = {column: np.concatenate([result[column] for result in results]) for column in COLUMNS}
+    return Simulation(fare_matrix.names, days, columns)
+
+# Returns the statistics as table rows
+def stats_rows(label, stats):
+    return [label, f"{stats['flights']:,}", f"{stats['on_time_rate']:.1%}", f"{stats['delay_rate']:.1%}",
+            f"{stats['cancel_rate']:.1%}", f"{stats['mean_departure_delay']:.1f}",
+            f"{stats['p90_departure_delay']:.0f}", f"{stats['propagated_delay_share']:.1%}"]
+
+def main(argv=None):
+    import time
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="Air Ontario day-of-operations simulator")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--flights", type=int, default=10000, help="flights per day")
+    parser.add_argument("--seed", type=int, help="random seed (default: a new simulation each run)")
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    simulation = simulate(args.days, args.flights, args.seed, args.workers, args.shards)
+    elapsed = time.perf_counter() - start
+
+    headers = ["Day", "Flights", "On time", "Delayed", "Canceled", "Avg delay (min)", "P90 delay", "Propagated"]
+    rows = [stats_rows(day + 1, stats) for day, stats in enumerate(simulation.daily_stats())]
+    rows.append(stats_rows("All", simulation.stats()))
+    print(tabulate(rows, headers=headers, tablefmt="fancy_grid", numalign="center", stralign="center"))
+    print(f"{len(simulation):,} flights simulated in {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    main()